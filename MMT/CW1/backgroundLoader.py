@@ -0,0 +1,111 @@
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from plotCore import get_existing_path
+from stageTrace import stage
+
+# Setting this environment variable to 0 runs every load in the foreground, as it was before
+PREFETCH_ENV = 'PLOT_PREFETCH'
+
+# Worker threads; the parsers are pure Python, so more threads only contend for the GIL
+DEFAULT_WORKERS = 2
+
+
+class BackgroundLoader:
+    """
+    Parses files and evaluates equations on background threads while the interactive
+    prompts continue.
+
+    The main thread spends that time blocked in input(), which releases the GIL, so a
+    pure-Python parser runs on a worker thread at full speed. Plotting then waits only
+    for the work that is left, timed as a 'wait' stage when tracing is on. Identical
+    requests (same function and arguments) share one task.
+    """
+
+    def __init__(self, max_workers=DEFAULT_WORKERS, enabled=None):
+        """
+        Parameters:
+            max_workers (int): Number of worker threads.
+            enabled (bool): Run tasks in the background; None reads PLOT_PREFETCH
+                (default on).
+        """
+        if enabled is None:
+            enabled = os.environ.get(PREFETCH_ENV, '1') != '0'
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix='prefetch') if enabled else None
+        self._tasks = {}
+
+    def submit(self, func, *args):
+        """
+        Starts func(*args) in the background, or returns the task already started for
+        the same call unless that one failed.
+
+        Returns:
+            concurrent.futures.Future: The task.
+        """
+        key = (func, args)
+        future = self._tasks.get(key)
+        if future is not None and not (future.done() and future.exception() is not None):
+            return future
+        if self._executor is None:
+            future = Future()
+            try:
+                future.set_result(func(*args))
+            except Exception as e:
+                future.set_exception(e)
+        else:
+            future = self._executor.submit(func, *args)
+        self._tasks[key] = future
+        return future
+
+    def wait(self, future, source=None):
+        """
+        Returns a task's result (raising its exception), timing any wait as a stage.
+
+        Parameters:
+            future (concurrent.futures.Future): Task from submit.
+            source (str): File or equation name recorded with the wait.
+        """
+        if future.done():
+            return future.result()
+        with stage('wait', source):
+            return future.result()
+
+    def forget(self):
+        """Drops finished tasks, so the next request reloads the file (e.g. in a new round)."""
+        self._tasks = {key: future for key, future in self._tasks.items() if not future.done()}
+
+    def close(self):
+        """Cancels tasks that have not started and stops the worker threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._tasks = {}
+
+
+def wait_for_file(loader, future, filename, load, prompt, min_points=1):
+    """
+    Waits for a background file load. If the file turned out to be empty or malformed,
+    says so and asks for another path, which is then loaded while waiting.
+
+    Parameters:
+        loader (BackgroundLoader): The loader the task was submitted to.
+        future (concurrent.futures.Future): The load task.
+        filename (str): Path being loaded.
+        load (callable): Parser, returning arrays with the x values first.
+        prompt (str): Prompt asking for another path.
+        min_points (int): Fewest valid rows accepted.
+
+    Returns:
+        str: The path finally loaded.
+        tuple: The parser's result.
+    """
+    while True:
+        try:
+            result = loader.wait(future, filename)
+            if len(result[0]) >= min_points:
+                return filename, result
+            print(f"No valid data found in '{filename}'. Please check the file and try again.")
+        except Exception as e:
+            print(f"An error occurred while loading the file: {e}")
+            print("Please ensure the file is in the correct format and try again.")
+        filename = get_existing_path(prompt)
+        future = loader.submit(load, filename)
@@ -0,0 +1,261 @@
+import argparse
+import json
+import os
+import time
+
+from plotCore import Pipeline, evaluate_pipelines
+from stageTrace import add_events, enable as enable_trace, enabled, stage, take_events
+
+# Formats savefig is asked to write; anything else is rejected before rendering
+OUTPUT_FORMATS = ['.png', '.svg', '.pdf']
+
+# Source types a plot job can use; 'spectrum' plots the spectrum of a time-domain file
+JOB_SOURCE_TYPES = ['text', 'spectrum', 'equation', 'simulation', 'raw']
+
+
+def _use_agg():
+    """Selects the non-interactive Agg backend; must run before pyplot is imported."""
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def source_pipeline(source, kind, grid=None):
+    """
+    Builds the plotCore pipeline of one job source, before normalization.
+
+    Parameters:
+        source (dict): Job source, see job_curves.
+        kind (str): 'fft' or 'time'.
+        grid (Pipeline): Pipeline whose x values equations without a 'range' follow.
+
+    Returns:
+        Pipeline: The source's pipeline.
+    """
+    if source['type'] not in JOB_SOURCE_TYPES:
+        raise ValueError(f"Unknown source type '{source['type']}'. Use one of {JOB_SOURCE_TYPES}.")
+    if source['type'] == 'spectrum':
+        return Pipeline({'type': 'text', 'path': source['path'], 'format': 'time'}).then(
+            'spectrum', window=source.get('window', 'hann'), segment_len=source.get('segment_len'))
+    if source['type'] == 'text':
+        return Pipeline({'type': 'text', 'path': source['path'], 'format': kind})
+    if source['type'] == 'raw':
+        return Pipeline({'type': 'raw', 'path': source['path'], 'domain': 'dB' if kind == 'fft' else None})
+
+    if source['type'] == 'equation':
+        core = {'type': 'equation', 'model': source.get('model', 'S2' if kind == 'fft' else 'V_o')}
+    else:
+        core = {'type': 'simulation', 'model': source.get('model', 'convolution')}
+    if 'range' in source:
+        core['range'] = tuple(source['range'][:3])
+    elif grid is not None:
+        # Same rule as the interactive tools: follow the text file's own grid
+        core['grid'] = grid
+    return Pipeline(core)
+
+
+def job_curves(job, cache=None):
+    """
+    Loads and evaluates every source of a plot job.
+
+    A job is a dict with:
+        'kind' (str): 'fft' (normalized magnitude vs. frequency) or 'time'.
+        'sources' (list of dict): Each has 'type' ('text', 'spectrum', 'equation',
+            'simulation' or 'raw'), 'path' for file sources, 'model' ('S2', 'V_o' or
+            'H' for equations, 'convolution' for simulations) and optional 'range'
+            [min, max, num_points] for equations and simulations, and an optional
+            'label'.
+        'scale' (str): 'dB' or 'linear' (FFT jobs only).
+    See render_job for the keys that only affect drawing.
+
+    Parameters:
+        job (dict): The plot job.
+        cache (dict): Optional plotCore evaluation cache shared between jobs, so each
+            distinct file is loaded once and each distinct equation/grid pair is
+            evaluated once.
+
+    Returns:
+        list of dict: One curve per source, with 'source', 'label', 'x' and 'y' (FFT
+            curves are already normalized and in the job's scale).
+    """
+    kind = job.get('kind', 'fft')
+    scale = job.get('scale', 'dB')
+
+    grid = None
+    for source in job['sources']:
+        if source['type'] not in ('equation', 'simulation'):
+            grid = source_pipeline(source, kind)
+            break
+
+    pipelines = [source_pipeline(source, kind, grid) for source in job['sources']]
+    if kind == 'fft':
+        pipelines = [pipeline.then('normalize', scale=scale) for pipeline in pipelines]
+    traces = evaluate_pipelines(pipelines, cache)
+
+    curves = []
+    for i, (source, trace) in enumerate(zip(job['sources'], traces)):
+        if 'path' in source:
+            default_label = source['path']
+        else:
+            default_label = f"{'Simulation' if source['type'] == 'simulation' else 'Equation'} {i + 1}"
+        curves.append({'source': source, 'label': source.get('label', default_label),
+                       'x': trace['x'], 'y': trace['y']})
+    return curves
+
+
+def draw_job(ax, job, curves):
+    """
+    Draws the curves of a plot job on a matplotlib Axes.
+
+    Parameters:
+        ax (matplotlib.axes.Axes): Axes to draw on.
+        job (dict): The plot job; 'log_x' (bool), 'x_range' and 'y_range' ([min, max]),
+            'title', 'xlabel' and 'ylabel' are optional.
+        curves (list of dict): Output of job_curves.
+    """
+    kind = job.get('kind', 'fft')
+    linear_scale = job.get('scale', 'dB') == 'linear'
+    for curve in curves:
+        is_equation = curve['source']['type'] in ('equation', 'simulation')
+        style = {'linewidth': 2.5, 'linestyle': '--'} if is_equation and kind == 'time' else {}
+        ax.plot(curve['x'], curve['y'], label=curve['label'], **style)
+
+    if job.get('log_x'):
+        ax.set_xscale('log')
+    if job.get('x_range'):
+        ax.set_xlim(job['x_range'])
+    if job.get('y_range'):
+        ax.set_ylim(job['y_range'])
+    if kind == 'fft':
+        ax.set_xlabel(job.get('xlabel', "Frequency (Hz)"))
+        ax.set_ylabel(job.get('ylabel', "Normalized Magnitude" + (" (linear)" if linear_scale else " (dB)")))
+        ax.set_title(job.get('title', "Combined Normalized FFT Plots"))
+    else:
+        ax.set_xlabel(job.get('xlabel', "Time (s)"))
+        ax.set_ylabel(job.get('ylabel', "Vₒ(t) [V]"))
+        ax.set_title(job.get('title', "Combined Time-Domain Plots"))
+    ax.grid(True, which="both", ls="--")
+    ax.legend()
+
+
+def render_job(job, curves=None):
+    """
+    Renders one plot job to an image file with the Agg backend.
+
+    On top of the keys described in job_curves and draw_job, a job has:
+        'output' (str): Output path; the extension selects PNG, SVG or PDF.
+        'figsize' ([width, height] in inches) and 'dpi' (int), both optional.
+
+    Parameters:
+        job (dict): The plot job.
+        curves (list of dict): Precomputed output of job_curves, or None to load and
+            evaluate the sources here.
+
+    Returns:
+        dict: 'output', 'seconds' and 'error' (None on success).
+    """
+    start = time.perf_counter()
+    try:
+        _use_agg()
+        import matplotlib.pyplot as plt
+
+        output = job['output']
+        if os.path.splitext(output)[1].lower() not in OUTPUT_FORMATS:
+            raise ValueError(f"Unsupported output format for '{output}'. Use one of {OUTPUT_FORMATS}.")
+        if curves is None:
+            curves = job_curves(job)
+
+        with stage('render', output, input_bytes=sum(c['x'].nbytes + c['y'].nbytes for c in curves)):
+            fig = plt.figure(figsize=tuple(job.get('figsize', (10, 6))))
+            draw_job(fig.gca(), job, curves)
+
+            out_dir = os.path.dirname(output)
+            if out_dir:
+                os.makedirs(out_dir, exist_ok=True)
+            fig.savefig(output, dpi=job.get('dpi', 100))
+            plt.close(fig)
+        error = None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return {'output': job.get('output'), 'seconds': time.perf_counter() - start, 'error': error}
+
+
+def _init_worker():
+    _use_agg()
+    # A forked worker starts with a copy of the parent's trace events; drop them
+    take_events()
+
+
+def _render_job_args(args):
+    result = render_job(*args)
+    if enabled():
+        # Stages timed in a worker travel back with the result
+        result['trace_events'] = take_events()
+    return result
+
+
+def render_jobs(jobs, processes=None, curves_list=None):
+    """
+    Renders a list of plot jobs on a pool of worker processes.
+
+    Parameters:
+        jobs (list of dict): Plot jobs, see render_job.
+        processes (int): Number of worker processes; None uses every CPU, 1 renders in
+            this process without a pool.
+        curves_list (list): Optional precomputed curves per job (see job_curves), so
+            workers only draw and save.
+
+    Returns:
+        list of dict: One result per job (see render_job), in input order.
+    """
+    if curves_list is None:
+        curves_list = [None] * len(jobs)
+    if processes == 1 or len(jobs) <= 1:
+        return [render_job(job, curves) for job, curves in zip(jobs, curves_list)]
+    from multiprocessing import Pool
+
+    with Pool(processes=processes, initializer=_init_worker) as pool:
+        results = pool.map(_render_job_args, list(zip(jobs, curves_list)), chunksize=1)
+    for result in results:
+        add_events(result.pop('trace_events', []))
+    return results
+
+
+def print_render_report(results, wall_seconds):
+    """
+    Prints the per-job render time and any failures.
+
+    Parameters:
+        results (list of dict): Output of render_jobs.
+        wall_seconds (float): Total wall time of the batch.
+    """
+    print(f"\n{'Output':<50} {'Time (s)':>10}  Status")
+    for result in results:
+        status = "ok" if result['error'] is None else result['error']
+        print(f"{str(result['output'])[-50:]:<50} {result['seconds']:>10.3f}  {status}")
+    failed = sum(result['error'] is not None for result in results)
+    print(f"\nRendered {len(results) - failed}/{len(results)} figures in {wall_seconds:.2f} s wall time.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render plot jobs to image files without a display.")
+    parser.add_argument('jobs', help="JSON file holding a list of plot jobs")
+    parser.add_argument('-p', '--processes', type=int, default=None,
+                        help="number of worker processes (default: one per CPU)")
+    parser.add_argument('--trace', metavar='FILE', help="time each stage and write a Chrome trace to FILE")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="also record each stage's peak memory (implies --trace trace.json if not given)")
+    args = parser.parse_args()
+    if args.trace or args.trace_memory:
+        enable_trace(args.trace or 'trace.json', memory=args.trace_memory)
+
+    with open(args.jobs, 'r') as f:
+        jobs = json.load(f)
+    start = time.perf_counter()
+    results = render_jobs(jobs, args.processes)
+    print_render_report(results, time.perf_counter() - start)
+    if any(result['error'] is not None for result in results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
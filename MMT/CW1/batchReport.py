@@ -0,0 +1,338 @@
+import argparse
+import csv
+import fnmatch
+import json
+import os
+import time
+
+import numpy as np
+
+from compareTheory import error_metrics
+from fitParameters import FIT_MODELS, fit_trace, load_fit_data
+from normalizeTraces import normalize_traces
+from spectralFeatures import extract_features
+from stageTrace import enable as enable_trace, stage
+
+# Model parameters the exports are compared against, unless the mapping gives others
+DEFAULT_PARAMS = {
+    'S2': {'m': 1e-3, 'scale': 1.0},
+    'V_o': {'rate': 10000.0, 'm': 1e-3},
+    'H': {'rate': 10000.0},
+}
+
+# Unit of the error columns per model; S2 is compared as magnitudes normalized to their maxima
+ERROR_UNITS = {'S2': 'dB', 'V_o': 'V', 'H': '1/s'}
+
+DEFAULT_OUTPUT_DIR = 'report'
+SUMMARY_FILE = 'summary.csv'
+STATE_FILE = 'report_state.json'
+THUMBNAIL_DIR = 'thumbnails'
+
+# Starting points of the fits giving the V_o and H features
+DEFAULT_STARTS = 4
+
+SUMMARY_COLUMNS = ['file', 'model', 'status', 'points', 'unit', 'rms_error', 'max_abs_error', 'max_error_at']
+
+
+def load_mapping(filename):
+    """
+    Reads the file-to-model mapping from a JSON or TOML file (chosen by extension).
+
+    Keys are glob patterns matched against file names in the directory, tried in
+    file order; values are a model name ('S2', 'V_o' or 'H') or a table with 'model'
+    and optional 'params' overriding DEFAULT_PARAMS, e.g.
+        {"fft_*.txt": "S2", "impulse_*.txt": {"model": "H", "params": {"rate": 9500}}}
+
+    Returns:
+        list of tuple: (pattern, model, params) in file order.
+    """
+    if os.path.splitext(filename)[1].lower() == '.toml':
+        import tomllib
+        with open(filename, 'rb') as f:
+            raw = tomllib.load(f)
+    else:
+        with open(filename, 'r') as f:
+            raw = json.load(f)
+
+    mapping = []
+    for pattern, entry in raw.items():
+        if isinstance(entry, str):
+            entry = {'model': entry}
+        model = entry.get('model')
+        if model not in DEFAULT_PARAMS:
+            raise ValueError(f"Mapping '{pattern}' names unknown model '{model}'. Use one of {list(DEFAULT_PARAMS)}.")
+        params = dict(DEFAULT_PARAMS[model], **entry.get('params', {}))
+        unknown = set(params) - set(DEFAULT_PARAMS[model])
+        if unknown:
+            raise ValueError(f"Mapping '{pattern}' gives unknown {model} parameter(s) {sorted(unknown)}.")
+        mapping.append((pattern, model, params))
+    return mapping
+
+
+def match_files(directory, mapping):
+    """
+    Pairs each file in directory with the first mapping entry whose pattern matches
+    its name.
+
+    Returns:
+        list of tuple: (path, model, params), sorted by path.
+        list of str: Files no pattern matched.
+    """
+    matched = []
+    unmatched = []
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if not os.path.isfile(path):
+            continue
+        for pattern, model, params in mapping:
+            if fnmatch.fnmatch(name, pattern):
+                matched.append((path, model, params))
+                break
+        else:
+            unmatched.append(path)
+    return matched, unmatched
+
+
+def _first_null(features):
+    nulls = features['nulls']
+    return nulls[0, 0] if len(nulls) else np.nan
+
+
+def _theory(model, x, params):
+    return FIT_MODELS[model]['model'](x, [params[name] for name in FIT_MODELS[model]['params']])
+
+
+def compare_file(path, model, params, thumbnail=None, starts=DEFAULT_STARTS, order=1):
+    """
+    Compares one export with its model: error metrics on the measured samples plus a
+    few features of both. Errors are returned, not raised, so one bad file does not
+    stop a batch.
+
+    S2 exports are compared as magnitudes normalized to their maxima, in dB, and
+    their features are the -3 dB frequency and first null (see spectralFeatures).
+    V_o and H are compared directly, and their features are the parameters fitted to
+    the export (see fitParameters), next to the ones compared against.
+
+    Parameters:
+        path (str): Export to compare.
+        model (str): 'S2', 'V_o' or 'H'.
+        params (dict): Model parameters, see DEFAULT_PARAMS.
+        thumbnail (str): Image file for a small plot of both curves, or None.
+        starts (int): Starting points of the V_o and H fits.
+        order (int): Neighbours compared on each side when finding S2 nulls.
+
+    Returns:
+        dict: One summary row: SUMMARY_COLUMNS, a column per feature and '<feature>_theory'
+            for the model's value, 'thumbnail' and 'seconds'.
+    """
+    start = time.perf_counter()
+    row = {'file': path, 'model': model, 'unit': ERROR_UNITS[model]}
+    try:
+        x, y = load_fit_data(model, path)
+        if len(x) < 3:
+            raise ValueError(f"No valid data found in '{path}'.")
+        with stage('compute', f"compare: {path}", input_bytes=x.nbytes + y.nbytes):
+            theory = _theory(model, x, params)
+            features = []
+            if model == 'S2':
+                (y, theory), _ = normalize_traces([y, theory], 'linear', 'dB')
+                measured_features = extract_features(x, y, order)
+                theory_features = extract_features(x, theory)
+                features.append(('f_3dB_Hz', measured_features['f_high'], theory_features['f_high']))
+                features.append(('first_null_Hz', _first_null(measured_features), _first_null(theory_features)))
+            else:
+                fit = fit_trace(model, x, y, starts=starts, processes=1)
+                for name, value in zip(fit['names'], fit['params']):
+                    features.append((name, value, params[name]))
+            metrics = error_metrics(x, y, theory)
+
+        row.update({'status': 'ok', 'points': len(x), 'rms_error': metrics['rms'],
+                    'max_abs_error': metrics['max_abs'], 'max_error_at': metrics['max_abs_at']})
+        for name, measured, expected in features:
+            row[name] = float(measured)
+            row[name + '_theory'] = float(expected)
+        if thumbnail:
+            plot_thumbnail(model, x, y, theory, path, thumbnail)
+            row['thumbnail'] = thumbnail
+    except Exception as e:
+        row['status'] = f"{type(e).__name__}: {e}"
+    row['seconds'] = time.perf_counter() - start
+    return row
+
+
+def plot_thumbnail(model, x, measured, theory, path, output):
+    """Writes a small plot of an export and its model with the Agg backend."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    with stage('render', output):
+        fig = plt.figure(figsize=(4, 2.5))
+        ax = fig.gca()
+        ax.plot(x, measured, linewidth=1.0, label="Measured")
+        ax.plot(x, theory, linewidth=1.5, linestyle='--', label=model)
+        if model == 'S2' and x[0] > 0:
+            ax.set_xscale('log')
+        ax.set_title(os.path.basename(path), fontsize=8)
+        ax.tick_params(labelsize=6)
+        ax.grid(True, which="both", ls="--", linewidth=0.5)
+        ax.legend(fontsize=6)
+        fig.tight_layout()
+        out_dir = os.path.dirname(output)
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+        fig.savefig(output, dpi=80)
+        plt.close(fig)
+
+
+def _compare_file_args(args):
+    return compare_file(*args)
+
+
+def _file_signature(path, model, params, starts, order):
+    """What a cached row depends on: the file's size and modification time, and the settings."""
+    stat = os.stat(path)
+    return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'model': model, 'params': params,
+            'starts': starts, 'order': order}
+
+
+def build_report(directory, mapping, output_dir=DEFAULT_OUTPUT_DIR, processes=None, starts=DEFAULT_STARTS,
+                 order=1, force=False):
+    """
+    Compares every mapped export in a directory with its model and writes the summary
+    table and thumbnails to output_dir.
+
+    Successful rows are kept in output_dir between runs, together with each file's
+    size and modification time; only new, changed or previously failed files (or
+    files whose mapping entry changed) are compared again, on a pool of worker
+    processes.
+
+    Parameters:
+        directory (str): Directory of exports.
+        mapping (list of tuple): Output of load_mapping.
+        output_dir (str): Directory for the summary, thumbnails and saved rows.
+        processes (int): Number of worker processes; None uses every CPU, 1 works in
+            this process without a pool.
+        starts (int): Starting points of the V_o and H fits.
+        order (int): Neighbours compared on each side when finding S2 nulls.
+        force (bool): Compare every file again.
+
+    Returns:
+        list of dict: Summary rows, sorted by file.
+        int: Number of files compared in this run.
+        list of str: Files no mapping entry matched.
+    """
+    matched, unmatched = match_files(directory, mapping)
+    state_path = os.path.join(output_dir, STATE_FILE)
+    state = {}
+    if not force and os.path.exists(state_path):
+        with open(state_path, 'r') as f:
+            state = json.load(f)
+
+    rows = {}
+    todo = []
+    signatures = {}
+    for path, model, params in matched:
+        signature = _file_signature(path, model, params, starts, order)
+        signatures[path] = signature
+        cached = state.get(path)
+        if cached is not None and cached['signature'] == signature and \
+                (not cached['row'].get('thumbnail') or os.path.exists(cached['row']['thumbnail'])):
+            rows[path] = cached['row']
+            continue
+        stem = os.path.splitext(os.path.basename(path))[0]
+        thumbnail = os.path.join(output_dir, THUMBNAIL_DIR, stem + '.png')
+        todo.append((path, model, params, thumbnail, starts, order))
+
+    if processes == 1 or len(todo) <= 1:
+        results = [_compare_file_args(args) for args in todo]
+    else:
+        from multiprocessing import Pool
+
+        with Pool(processes=processes) as pool:
+            results = pool.map(_compare_file_args, todo, chunksize=1)
+    for row in results:
+        rows[row['file']] = row
+
+    # Files that were removed or are no longer mapped drop out of the saved state, and
+    # failures are not saved, so they are retried on the next run
+    os.makedirs(output_dir, exist_ok=True)
+    new_state = {path: {'signature': signatures[path], 'row': rows[path]}
+                 for path in signatures if rows[path]['status'] == 'ok'}
+    with open(state_path, 'w') as f:
+        json.dump(new_state, f, indent=1)
+
+    ordered = [rows[path] for path in sorted(rows)]
+    write_summary(os.path.join(output_dir, SUMMARY_FILE), ordered)
+    return ordered, len(todo), unmatched
+
+
+def write_summary(filename, rows):
+    """Writes the summary rows to CSV, with one column per feature that any row has."""
+    columns = list(SUMMARY_COLUMNS)
+    for row in rows:
+        columns.extend(key for key in row if key not in columns and key not in ('thumbnail', 'seconds'))
+    columns += ['thumbnail', 'seconds']
+    with open(filename, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=columns, restval='')
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({key: repr(value) if isinstance(value, float) else value for key, value in row.items()})
+
+
+def print_report(rows, compared, unmatched, wall_seconds):
+    """Prints one line per export and a summary of the run."""
+    print(f"\n{'File':<40} {'Model':>5} {'Points':>8} {'RMS error':>14} {'Max |error|':>14}  Status")
+    for row in rows:
+        if row['status'] != 'ok':
+            print(f"{row['file'][-40:]:<40} {row['model']:>5} {'':>8} {'':>14} {'':>14}  {row['status']}")
+            continue
+        print(f"{row['file'][-40:]:<40} {row['model']:>5} {row['points']:>8} "
+              f"{row['rms_error']:>10.4g} {row['unit']:<3} {row['max_abs_error']:>10.4g} {row['unit']:<3}  ok")
+    failed = sum(row['status'] != 'ok' for row in rows)
+    print(f"\nCompared {compared} new, changed or failed file(s), reused {len(rows) - compared}; "
+          f"{len(rows) - failed}/{len(rows)} ok in {wall_seconds:.2f} s wall time.")
+    if unmatched:
+        print(f"[INFO] {len(unmatched)} file(s) matched no mapping entry and were skipped.")
+
+
+def run_report(args):
+    """
+    Builds and prints a report as parsed options ask (see main and plotCli).
+
+    Returns:
+        list of dict: Summary rows.
+    """
+    mapping_file = args.mapping or os.path.join(args.directory, 'models.json')
+    start = time.perf_counter()
+    rows, compared, unmatched = build_report(args.directory, load_mapping(mapping_file), args.output,
+                                             args.processes, args.starts, args.order, args.force)
+    unmatched = [path for path in unmatched if not os.path.samefile(path, mapping_file)]
+    print_report(rows, compared, unmatched, time.perf_counter() - start)
+    print(f"Summary written to '{os.path.join(args.output, SUMMARY_FILE)}'.")
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compare a directory of LTspice exports with their theoretical models.")
+    parser.add_argument('directory', help="directory of exports")
+    parser.add_argument('--mapping', metavar='FILE',
+                        help="JSON or TOML file mapping file name patterns to models (default: DIRECTORY/models.json)")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT_DIR, help="directory for the summary and thumbnails")
+    parser.add_argument('--starts', type=int, default=DEFAULT_STARTS, help="starting points of the V_o and H fits")
+    parser.add_argument('--order', type=int, default=1, help="neighbours compared on each side for S2 nulls")
+    parser.add_argument('--force', action='store_true', help="compare every file again, not only changed ones")
+    parser.add_argument('-p', '--processes', type=int, default=None,
+                        help="number of worker processes (default: one per CPU)")
+    parser.add_argument('--trace', metavar='FILE', help="time each stage and write a Chrome trace to FILE")
+    args = parser.parse_args(argv)
+    if args.trace:
+        enable_trace(args.trace)
+    rows = run_report(args)
+    if any(row['status'] != 'ok' for row in rows):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from generateExports import write_fft_export, write_transient_export
+from plotCore import (H_theoretical, S2_equation, V_o_theoretical, load_fft_export, load_time_export,
+                      simulate_convolution)
+
+# Fixed seed so every run benchmarks the same synthetic data
+SEED = 12345
+
+# Input sizes (points) covered by default: 10^3 to 10^7
+SIZES = [10 ** k for k in range(3, 8)]
+
+# A stage slower or larger than the baseline by more than this fraction is a regression
+REGRESSION_THRESHOLD = 0.25
+
+# Fewest timed runs per measurement; a single run cannot tell noise from a slow-down
+MIN_REPEAT = 3
+
+# A slow-down or memory growth smaller than these absolute amounts is never flagged,
+# however large the ratio (small stages are dominated by timer and allocator noise)
+MIN_FLAG_SECONDS = 0.02
+MIN_FLAG_BYTES = 4 * 2 ** 20
+
+# plotCli runs timed by --cli-startup as whole processes; '{fft}' and '{csv}' stand for
+# a small FFT export and an output file in a temporary directory
+CLI_RUNS = {
+    'help': ['--help'],
+    'load': ['load', '--text', '{fft}'],
+    'export': ['export', '--text', '{fft}', '--output', '{csv}'],
+}
+CLI_EXPORT_ROWS = 1000
+
+DEFAULT_OUTPUT_DIR = 'benchResults'
+BASELINE_FILE = 'baseline.json'
+
+
+def render_trace(x, y):
+    """Plots one trace the way the tools do (with LOD decimation) and renders it to PNG."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from lodLines import plot_line
+
+    fig = plt.figure(figsize=(10, 6))
+    plot_line(fig.gca(), x, y)
+    fig.savefig(io.BytesIO(), format='png', dpi=100)
+    plt.close(fig)
+
+
+def _setup_fft_file(n, rng, tmpdir):
+    path = os.path.join(tmpdir, f"fft_{n}.txt")
+    if not os.path.exists(path):
+        write_fft_export(path, n, seed=SEED)
+    return path
+
+
+def _setup_time_file(n, rng, tmpdir):
+    path = os.path.join(tmpdir, f"time_{n}.txt")
+    if not os.path.exists(path):
+        write_transient_export(path, n, seed=SEED)
+    return path
+
+
+def _run_S2(freqs):
+    return S2_equation(2 * np.pi * freqs)
+
+
+# Stage name -> (setup(n, rng, tmpdir) returning the argument, run(argument), largest n).
+# np.convolve is quadratic in n, so it stops well short of the parsers and kernels.
+STAGES = {
+    'parse_fft_text': (_setup_fft_file, load_fft_export, 10 ** 7),
+    'parse_time_text': (_setup_time_file, load_time_export, 10 ** 7),
+    'S2_equation': (lambda n, rng, tmpdir: np.logspace(-3, 4, n), _run_S2, 10 ** 7),
+    'V_o_theoretical': (lambda n, rng, tmpdir: np.linspace(-1e-3, 5e-3, n), V_o_theoretical, 10 ** 7),
+    'H_theoretical': (lambda n, rng, tmpdir: np.linspace(0.0, 5e-3, n), H_theoretical, 10 ** 7),
+    'convolve_simulation': (lambda n, rng, tmpdir: np.arange(n) * (3e-3 / n), simulate_convolution, 10 ** 5),
+    'render': (lambda n, rng, tmpdir: (np.linspace(0.0, 1.0, n), rng.normal(size=n)),
+               lambda xy: render_trace(*xy), 10 ** 7),
+}
+
+
+def time_stage(run, arg, repeat):
+    """
+    Times a stage over at least MIN_REPEAT runs.
+
+    Returns:
+        float: Median seconds.
+        float: Fastest run in seconds.
+        float: Slowest run in seconds.
+    """
+    timings = []
+    for _ in range(max(repeat, MIN_REPEAT)):
+        gc.collect()
+        start = time.perf_counter()
+        run(arg)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings)), min(timings), max(timings)
+
+
+def peak_memory(run, arg):
+    """
+    Measures the peak traced allocation of one run (NumPy reports its buffers to
+    tracemalloc). Run separately from the timing, since tracing slows Python code.
+
+    Returns:
+        int: Peak bytes allocated above the starting point.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run(arg)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def git_commit():
+    """Returns the short commit hash of the working tree, with '-dirty' if it has changes."""
+    repo = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True, cwd=repo).stdout.strip()
+        dirty = subprocess.run(['git', 'diff', '--quiet', 'HEAD'], capture_output=True, cwd=repo).returncode != 0
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return commit + ('-dirty' if dirty else '')
+
+
+def run_suite(sizes=SIZES, stages=None, repeat=3, data_dir=None):
+    """
+    Runs the benchmark stages over the input sizes.
+
+    Parameters:
+        sizes (list of int): Input sizes in points.
+        stages (list of str): Stage names (keys of STAGES), or None for all.
+        repeat (int): Timed runs per measurement (at least MIN_REPEAT); the median is
+            kept along with the fastest and slowest run.
+        data_dir (str): Directory for the synthetic input files, or None for a
+            temporary one.
+
+    Returns:
+        dict: 'commit', 'timestamp', 'python', 'numpy' and 'results', a list of
+            {'stage', 'n', 'seconds', 'seconds_min', 'seconds_max', 'peak_bytes'}.
+    """
+    stages = list(STAGES) if stages is None else stages
+    results = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        data_dir = data_dir or tmpdir
+        for name in stages:
+            setup, run, max_n = STAGES[name]
+            # One untimed run so imports and first-call setup are not charged to the smallest size
+            run(setup(min(sizes), np.random.default_rng(SEED), data_dir))
+            for n in sizes:
+                if n > max_n:
+                    continue
+                arg = setup(n, np.random.default_rng(SEED), data_dir)
+                seconds, fastest, slowest = time_stage(run, arg, repeat)
+                peak = peak_memory(run, arg)
+                results.append({'stage': name, 'n': n, 'seconds': seconds, 'seconds_min': fastest,
+                                'seconds_max': slowest, 'peak_bytes': peak})
+                print(f"{name:<22} n={n:<10d} {seconds * 1e3:>12.3f} ms {peak / 2 ** 20:>10.2f} MB peak")
+    return {'commit': git_commit(), 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(), 'numpy': np.__version__, 'results': results}
+
+
+def cli_startup(repeat=5):
+    """
+    Times plotCli runs as separate processes, from interpreter launch to exit, which is
+    what the startup budget is about; --startup-time inside plotCli cannot see the
+    interpreter starting.
+
+    Parameters:
+        repeat (int): Runs per command (at least MIN_REPEAT); the median is kept.
+
+    Returns:
+        list of dict: {'command', 'seconds'} per entry of CLI_RUNS.
+    """
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'plotCli.py')
+    results = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = {'fft': os.path.join(tmpdir, 'fft.txt'), 'csv': os.path.join(tmpdir, 'out.csv')}
+        write_fft_export(paths['fft'], CLI_EXPORT_ROWS, seed=SEED)
+        for name, arguments in CLI_RUNS.items():
+            command = [sys.executable, script] + [arg.format(**paths) for arg in arguments]
+            timings = []
+            for _ in range(max(repeat, MIN_REPEAT)):
+                start = time.perf_counter()
+                subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+                timings.append(time.perf_counter() - start)
+            results.append({'command': name, 'seconds': float(np.median(timings))})
+    return results
+
+
+def print_cli_startup(results):
+    """Prints the plotCli process times against its startup budget."""
+    from plotCli import STARTUP_BUDGET_MS
+
+    print(f"plotCli process wall time (interpreter launch to exit), budget {STARTUP_BUDGET_MS:.0f} ms:")
+    for result in results:
+        ms = result['seconds'] * 1e3
+        status = "within" if ms <= STARTUP_BUDGET_MS else "OVER"
+        print(f"  {result['command']:<8} {ms:>8.1f} ms  {status}")
+
+
+def compare(run, baseline, threshold=REGRESSION_THRESHOLD):
+    """
+    Compares a run against a baseline run.
+
+    A stage is slower only if its median exceeds the baseline median by more than
+    threshold, its fastest run is slower than the baseline's slowest run (so the two
+    spreads do not overlap) and the difference is at least MIN_FLAG_SECONDS. Memory
+    growth must exceed threshold and MIN_FLAG_BYTES.
+
+    Parameters:
+        run (dict): Output of run_suite.
+        baseline (dict): A stored run_suite output.
+        threshold (float): Allowed relative increase in time or peak memory.
+
+    Returns:
+        list of dict: One row per stage/size present in both, with 'stage', 'n',
+            'time_ratio', 'memory_ratio' and 'regression' (bool).
+    """
+    reference = {(r['stage'], r['n']): r for r in baseline['results']}
+    rows = []
+    for result in run['results']:
+        base = reference.get((result['stage'], result['n']))
+        if base is None:
+            continue
+        time_ratio = result['seconds'] / base['seconds'] if base['seconds'] > 0 else 1.0
+        memory_ratio = result['peak_bytes'] / base['peak_bytes'] if base['peak_bytes'] > 0 else 1.0
+        # Baselines saved before the spread was recorded only have the one timing
+        slower = (time_ratio > 1 + threshold
+                  and result.get('seconds_min', result['seconds']) > base.get('seconds_max', base['seconds'])
+                  and result['seconds'] - base['seconds'] >= MIN_FLAG_SECONDS)
+        larger = (memory_ratio > 1 + threshold
+                  and result['peak_bytes'] - base['peak_bytes'] >= MIN_FLAG_BYTES)
+        rows.append({'stage': result['stage'], 'n': result['n'], 'time_ratio': time_ratio,
+                     'memory_ratio': memory_ratio, 'regression': slower or larger})
+    return rows
+
+
+def print_comparison(rows, baseline_commit):
+    """Prints the time and memory ratios against the baseline and marks regressions."""
+    print(f"\nCompared with baseline {baseline_commit}:")
+    print(f"{'Stage':<22} {'n':>10} {'Time':>8} {'Memory':>8}")
+    for row in rows:
+        flag = "  REGRESSION" if row['regression'] else ""
+        print(f"{row['stage']:<22} {row['n']:>10d} {row['time_ratio']:>7.2f}x {row['memory_ratio']:>7.2f}x{flag}")
+    regressions = sum(row['regression'] for row in rows)
+    print(f"\n{regressions} regression(s) beyond the threshold." if regressions else "\nNo regressions.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the parsers, equation kernels, convolution and rendering.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help="input sizes in points")
+    parser.add_argument('--stages', nargs='+', choices=list(STAGES), help="stages to run (default: all)")
+    parser.add_argument('--repeat', type=int, default=3, help=f"timed runs per measurement (at least {MIN_REPEAT}), median kept")
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR,
+                        help="directory for the per-commit JSON results and the baseline")
+    parser.add_argument('--data-dir', help="keep the synthetic input files here to reuse them between runs")
+    parser.add_argument('--baseline', help=f"baseline JSON (default: {BASELINE_FILE} in the output directory)")
+    parser.add_argument('--save-baseline', action='store_true', help="store this run as the new baseline")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="relative slow-down or memory growth flagged as a regression")
+    parser.add_argument('--cli-startup', action='store_true',
+                        help="only time plotCli --help, load and export runs as whole processes")
+    args = parser.parse_args()
+
+    if args.cli_startup:
+        print_cli_startup(cli_startup(args.repeat))
+        return
+
+    if args.data_dir:
+        os.makedirs(args.data_dir, exist_ok=True)
+    run = run_suite(sorted(args.sizes), args.stages, args.repeat, args.data_dir)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    result_path = os.path.join(args.output_dir, f"{run['commit']}.json")
+    with open(result_path, 'w') as f:
+        json.dump(run, f, indent=1)
+    print(f"\nResults written to '{result_path}'.")
+
+    baseline_path = args.baseline or os.path.join(args.output_dir, BASELINE_FILE)
+    if args.save_baseline:
+        with open(os.path.join(args.output_dir, BASELINE_FILE), 'w') as f:
+            json.dump(run, f, indent=1)
+        print("Saved as the new baseline.")
+    elif os.path.exists(baseline_path):
+        with open(baseline_path, 'r') as f:
+            baseline = json.load(f)
+        rows = compare(run, baseline, args.threshold)
+        print_comparison(rows, baseline.get('commit', 'unknown'))
+        if any(row['regression'] for row in rows):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
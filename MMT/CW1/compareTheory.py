@@ -0,0 +1,187 @@
+import numpy as np
+
+
+def interp_sorted(x, xp, fp):
+    """
+    Linearly interpolates one or more traces sampled on a sorted grid onto new points.
+
+    A single searchsorted pass locates every point of x in xp, and the resulting
+    indices/weights are reused for every row of fp. Points outside xp are clamped
+    to the end values, matching np.interp.
+
+    Parameters:
+        x (np.ndarray): Points to evaluate at (any order).
+        xp (np.ndarray): Sorted (ascending) sample positions of the traces.
+        fp (np.ndarray): Trace values, shape (len(xp),) or (num_traces, len(xp)).
+
+    Returns:
+        np.ndarray: Interpolated values, shape (len(x),) or (num_traces, len(x)).
+    """
+    x = np.asarray(x, dtype=float)
+    xp = np.asarray(xp, dtype=float)
+    fp = np.asarray(fp)
+    if len(xp) == 1:
+        return np.broadcast_to(fp[..., :1], fp.shape[:-1] + x.shape).copy()
+
+    idx = np.searchsorted(xp, x, side='right') - 1
+    np.clip(idx, 0, len(xp) - 2, out=idx)
+    x0 = xp[idx]
+    dx = xp[idx + 1] - x0
+    # Repeated sample times (LTspice writes these at breakpoints) give dx == 0
+    w = np.divide(x - x0, dx, out=np.zeros_like(x), where=dx != 0)
+    np.clip(w, 0.0, 1.0, out=w)
+
+    f0 = fp[..., idx]
+    return f0 + w * (fp[..., idx + 1] - f0)
+
+
+def theory_on_samples(x, model, model_x=None):
+    """
+    Evaluates a theoretical curve at the measured sample positions.
+
+    Parameters:
+        x (np.ndarray): Measured sample positions (times or frequencies).
+        model (callable or np.ndarray): Either a function evaluated directly at x,
+            or precomputed values sampled at model_x.
+        model_x (np.ndarray): Sorted sample positions of a precomputed model. Only
+            used when model is an array.
+
+    Returns:
+        np.ndarray: Theoretical values at x.
+    """
+    if callable(model):
+        return model(np.asarray(x, dtype=float))
+    if model_x is None:
+        raise ValueError("model_x is required when the model is given as an array.")
+    return interp_sorted(x, model_x, model)
+
+
+def error_metrics(x, measured, theory, region_edges=None):
+    """
+    Computes how far a measured trace is from its theoretical counterpart.
+
+    Parameters:
+        x (np.ndarray): Sample positions shared by both traces.
+        measured (np.ndarray): Measured values (e.g. LTspice V_o(t)).
+        theory (np.ndarray): Theoretical values at the same positions.
+        region_edges (list of float): Optional sorted edges splitting x into regions,
+            e.g. the breakpoints of a piecewise equation.
+
+    Returns:
+        dict: 'rms', 'max_abs', 'max_abs_at', 'count' and, if region_edges is given,
+            'regions' (a list of dicts with 'start', 'end', 'rms', 'max_abs', 'count').
+    """
+    return batch_error_metrics([(x, measured, theory)], region_edges)[0]
+
+
+def batch_error_metrics(pairs, region_edges=None):
+    """
+    Computes error metrics for many measured/theory pairs in one vectorized pass.
+
+    All pairs are concatenated once and reduced per pair (and per region) with
+    bincount/reduceat, so the cost does not depend on how many pairs are given.
+    Samples whose error is not finite (e.g. NaN in the measured data) are left out
+    of every metric and of the counts; a pair or region without finite errors gets
+    NaN metrics.
+
+    Parameters:
+        pairs (list of tuple): (x, measured, theory) tuples. Lengths may differ
+            between pairs but must match within a pair.
+        region_edges (list of float): Optional sorted region edges, see error_metrics.
+
+    Returns:
+        list of dict: One metrics dict per pair, in input order.
+    """
+    if not pairs:
+        return []
+
+    lengths = np.array([len(p[1]) for p in pairs])
+    for (x, measured, theory), n in zip(pairs, lengths):
+        if len(x) != n or len(theory) != n:
+            raise ValueError("x, measured and theory must have the same length within each pair.")
+
+    x_all = np.concatenate([np.asarray(p[0], dtype=float) for p in pairs])
+    err = np.concatenate([np.asarray(p[1], dtype=float) for p in pairs])
+    err -= np.concatenate([np.asarray(p[2], dtype=float) for p in pairs])
+    finite = np.isfinite(err)
+    abs_err = np.where(finite, np.abs(err), -np.inf)
+    err = np.where(finite, err * err, 0.0)  # squared errors, 0 where not finite
+
+    num_pairs = len(pairs)
+    pair_ids = np.repeat(np.arange(num_pairs), lengths)
+    counts = np.bincount(pair_ids, weights=finite, minlength=num_pairs)
+    sum_sq = np.bincount(pair_ids, weights=err, minlength=num_pairs)
+
+    max_abs = np.full(num_pairs, np.nan)
+    max_at = np.full(num_pairs, np.nan)
+    nonempty = lengths > 0
+    if nonempty.any():
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))[nonempty]
+        max_abs[nonempty] = np.maximum.reduceat(abs_err, starts)
+        # First position in each pair where its maximum is reached
+        is_max = finite & (abs_err == max_abs[pair_ids])
+        first = np.full(num_pairs, len(abs_err))
+        np.minimum.at(first, pair_ids[is_max], np.flatnonzero(is_max))
+        found = first < len(abs_err)
+        max_at[found] = x_all[first[found]]
+        max_abs[~found] = np.nan
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rms = np.sqrt(sum_sq / counts)
+
+    results = []
+    for k in range(num_pairs):
+        results.append({
+            'rms': float(rms[k]),
+            'max_abs': float(max_abs[k]),
+            'max_abs_at': float(max_at[k]),
+            'count': int(counts[k]),
+        })
+
+    if region_edges is not None:
+        edges = np.asarray(region_edges, dtype=float)
+        num_regions = len(edges) + 1
+        keys = pair_ids * num_regions + np.searchsorted(edges, x_all, side='right')
+        size = num_pairs * num_regions
+        reg_count = np.bincount(keys, weights=finite, minlength=size).astype(int)
+        reg_sum_sq = np.bincount(keys, weights=err, minlength=size)
+        reg_max = np.full(size, -np.inf)
+        np.maximum.at(reg_max, keys, abs_err)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            reg_rms = np.sqrt(reg_sum_sq / reg_count)
+
+        bounds = np.concatenate(([-np.inf], edges, [np.inf]))
+        for k in range(num_pairs):
+            regions = []
+            for r in range(num_regions):
+                key = k * num_regions + r
+                regions.append({
+                    'start': float(bounds[r]),
+                    'end': float(bounds[r + 1]),
+                    'rms': float(reg_rms[key]) if reg_count[key] else float('nan'),
+                    'max_abs': float(reg_max[key]) if reg_count[key] else float('nan'),
+                    'count': int(reg_count[key]),
+                })
+            results[k]['regions'] = regions
+
+    return results
+
+
+def print_error_table(labels, metrics, unit=""):
+    """
+    Prints a summary table of error metrics, one row per compared trace.
+
+    Parameters:
+        labels (list of str): Name of each compared trace.
+        metrics (list of dict): Output of batch_error_metrics, in the same order.
+        unit (str): Unit appended to the error columns.
+    """
+    suffix = f" [{unit}]" if unit else ""
+    print(f"\n{'Trace':<30} {'RMS error' + suffix:>18} {'Max |error|' + suffix:>18} {'at':>14} {'Points':>8}")
+    for label, m in zip(labels, metrics):
+        print(f"{label[:30]:<30} {m['rms']:>18.6g} {m['max_abs']:>18.6g} {m['max_abs_at']:>14.6g} {m['count']:>8}")
+        for reg in m.get('regions', []):
+            if reg['count'] == 0:
+                continue
+            span = f"[{reg['start']:.3g}, {reg['end']:.3g})"
+            print(f"  {span:<28} {reg['rms']:>18.6g} {reg['max_abs']:>18.6g} {'':>14} {reg['count']:>8}")
@@ -0,0 +1,230 @@
+import hashlib
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+# Default cap on resident dataset memory; overridden by the PLOT_MEMORY_BUDGET_MB environment variable
+DEFAULT_BUDGET_MB = 2048
+
+
+def memory_budget_bytes():
+    """
+    Returns the configured memory budget for loaded datasets.
+
+    Returns:
+        int: Budget in bytes.
+    """
+    try:
+        budget_mb = float(os.environ.get('PLOT_MEMORY_BUDGET_MB', DEFAULT_BUDGET_MB))
+    except ValueError:
+        budget_mb = DEFAULT_BUDGET_MB
+    return int(budget_mb * 1024 * 1024)
+
+
+def content_hash(arrays):
+    """
+    Hashes the arrays of a dataset, so identical data loaded twice is recognized.
+
+    Parameters:
+        arrays (dict): Field name -> np.ndarray.
+
+    Returns:
+        str: Hex digest over the field names, dtypes, shapes and contents.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for key in sorted(arrays):
+        array = np.ascontiguousarray(arrays[key])
+        digest.update(f"{key}:{array.dtype.str}:{array.shape};".encode())
+        digest.update(memoryview(array).cast('B'))
+    return digest.hexdigest()
+
+
+def format_bytes(num_bytes):
+    """Formats a byte count as B, kB, MB or GB."""
+    for unit in ['B', 'kB', 'MB']:
+        if num_bytes < 1024:
+            return f"{num_bytes:.0f} {unit}" if unit == 'B' else f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.2f} GB"
+
+
+def _resident(array):
+    """Tells whether an array holds its own memory (as opposed to a memory-mapped file)."""
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return False
+        array = array.base if isinstance(array.base, np.ndarray) else None
+    return True
+
+
+class DatasetRegistry:
+    """
+    Memory-budgeted list of loaded datasets, indexed like the old loaded_data_list.
+
+    Datasets with identical arrays (by content hash) share one set of arrays, so loading
+    the same data twice costs its memory once. When the arrays held in memory exceed
+    the budget, the least recently used datasets fall back to memory-mapped views of
+    their on-disk copies; the operating system then pages them in only when they are
+    plotted again.
+    """
+
+    def __init__(self, budget_bytes=None):
+        """
+        Parameters:
+            budget_bytes (int): Memory cap in bytes, or None for memory_budget_bytes().
+        """
+        self.budget_bytes = memory_budget_bytes() if budget_bytes is None else budget_bytes
+        self._entries = []
+        self._hashes = []
+        # content hash -> {'arrays': {...}, 'paths': {...}, 'members': [indices]}, oldest use first
+        self._groups = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        # Listing the datasets does not count as using them
+        return iter(self._entries)
+
+    def __getitem__(self, idx):
+        entry = self._entries[idx]
+        self._groups.move_to_end(self._hashes[idx])
+        return entry
+
+    def find(self, digest, filename=None):
+        """
+        Looks up a dataset by content hash.
+
+        Parameters:
+            digest (str): Content hash, see content_hash.
+            filename (str): If given, only a dataset with this filename matches.
+
+        Returns:
+            int: Index of the matching dataset, or None.
+        """
+        group = self._groups.get(digest)
+        if group is None:
+            return None
+        for idx in group['members']:
+            if filename is None or self._entries[idx].get('filename') == filename:
+                return idx
+        return None
+
+    def paths(self, digest):
+        """Returns the on-disk .npy paths of a content hash, or None if it is unknown."""
+        group = self._groups.get(digest)
+        return None if group is None else group['paths']
+
+    def add(self, entry, digest, paths):
+        """
+        Adds a dataset. If its content hash is known, the entry's arrays are replaced by
+        the shared ones so the new copy can be freed.
+
+        Parameters:
+            entry (dict): Dataset; its np.ndarray fields are the arrays.
+            digest (str): Content hash of the arrays.
+            paths (dict): Field name -> .npy file holding that array on disk.
+
+        Returns:
+            int: Index of the new dataset.
+        """
+        self._entries.append(None)
+        self._hashes.append(None)
+        self._attach(len(self._entries) - 1, entry, digest, paths)
+        return len(self._entries) - 1
+
+    def replace(self, idx, entry, digest, paths):
+        """
+        Swaps the dataset at an index for a new one, e.g. after its source file changed.
+        The index stays valid; arrays no other dataset shares are released.
+
+        Parameters:
+            idx (int): Index of the dataset to replace.
+            entry, digest, paths: As for add.
+        """
+        old = self._hashes[idx]
+        group = self._groups[old]
+        group['members'].remove(idx)
+        if not group['members']:
+            del self._groups[old]
+        self._attach(idx, entry, digest, paths)
+
+    def _attach(self, idx, entry, digest, paths):
+        group = self._groups.get(digest)
+        if group is None:
+            arrays = {key: value for key, value in entry.items() if isinstance(value, np.ndarray)}
+            group = {'arrays': arrays, 'paths': dict(paths), 'members': []}
+            self._groups[digest] = group
+        else:
+            entry.update(group['arrays'])
+            self._groups.move_to_end(digest)
+        group['members'].append(idx)
+        self._entries[idx] = entry
+        self._hashes[idx] = digest
+        self.enforce_budget(keep=digest)
+
+    def usage_order(self):
+        """Returns the content hashes of the datasets, least recently used first."""
+        return list(self._groups)
+
+    def resident_bytes(self):
+        """
+        Returns the memory held by dataset arrays (memory-mapped arrays not counted).
+
+        Returns:
+            int: Bytes.
+        """
+        return sum(array.nbytes for group in self._groups.values()
+                   for array in group['arrays'].values() if _resident(array))
+
+    def dataset_bytes(self, idx):
+        """
+        Returns the size of one dataset's arrays and whether they are held in memory.
+
+        Returns:
+            int: Bytes.
+            bool: True if resident, False if memory-mapped from disk.
+        """
+        arrays = self._groups[self._hashes[idx]]['arrays'].values()
+        return sum(array.nbytes for array in arrays), any(_resident(array) for array in arrays)
+
+    def evict(self, digest):
+        """
+        Swaps the arrays of a content hash for memory-mapped views of their on-disk copies.
+
+        Parameters:
+            digest (str): Content hash.
+
+        Returns:
+            int: Bytes of resident arrays that were swapped out (0 without an on-disk copy).
+        """
+        group = self._groups[digest]
+        freed = sum(group['arrays'][key].nbytes for key in group['paths']
+                    if key in group['arrays'] and _resident(group['arrays'][key]))
+        mapped = {key: np.load(path, mmap_mode='r') for key, path in group['paths'].items()}
+        group['arrays'].update(mapped)
+        for idx in group['members']:
+            self._entries[idx].update(mapped)
+        return freed
+
+    def enforce_budget(self, keep=None):
+        """
+        Evicts least recently used datasets until the resident arrays fit the budget.
+
+        Parameters:
+            keep (str): Content hash never to evict (the dataset just added or used).
+        """
+        resident = self.resident_bytes()
+        for digest, group in list(self._groups.items()):
+            if resident <= self.budget_bytes:
+                break
+            # Only arrays with an on-disk copy can be swapped for a memory map
+            if digest == keep or not group['paths']:
+                continue
+            resident -= self.evict(digest)
+
+    def footprint_line(self):
+        """One-line summary of the resident memory against the budget."""
+        return (f"{format_bytes(self.resident_bytes())} resident of the "
+                f"{format_bytes(self.budget_bytes)} budget")
@@ -0,0 +1,186 @@
+from lodLines import DecimatedLine, use_decimation
+
+
+class FigureManager:
+    """
+    Keeps figures, axes and line artists alive across plot-again iterations.
+
+    Lines are keyed by plot slot (their position in the pass) and updated in place
+    with set_data, so the same dataset plotted twice gets two lines; axes limits, scale,
+    labels and legend are only touched when they change. When nothing but the data
+    changed, the new lines are blitted over a cached background instead of redrawing
+    the whole figure. Figures the user closed are recreated on the next pass.
+    """
+
+    def __init__(self, figsize=(10, 6)):
+        """
+        Parameters:
+            figsize (tuple): Size of newly created figures in inches.
+        """
+        self.figsize = figsize
+        self.entries = {}
+        self.used_figures = set()
+
+    def _entry(self, fig_key):
+        # pyplot (and its GUI backend) is only imported once a figure is actually needed
+        import matplotlib.pyplot as plt
+
+        entry = self.entries.get(fig_key)
+        if entry is None or not plt.fignum_exists(entry['fig'].number):
+            fig = plt.figure(figsize=self.figsize)
+            ax = fig.gca()
+            ax.grid(True, which="both", ls="--")
+            entry = {'fig': fig, 'ax': ax, 'lines': {}, 'used_lines': set(),
+                     'layout': None, 'background': None, 'shown': False}
+            # A resized canvas invalidates the cached background
+            fig.canvas.mpl_connect('resize_event', lambda event: entry.update(background=None))
+            self.entries[fig_key] = entry
+        return entry
+
+    def begin(self):
+        """Starts a new plot pass; figures and lines not used in it are dropped by show()."""
+        self.used_figures = set()
+        for entry in self.entries.values():
+            entry['used_lines'] = set()
+
+    def set_line(self, fig_key, line_key, x, y, **style):
+        """
+        Creates or updates the line of one plot slot in a figure.
+
+        Parameters:
+            fig_key (hashable): Figure to draw in.
+            line_key (hashable): Identifies the plot slot within the figure, e.g.
+                (source type, position in the plotted list).
+            x (np.ndarray): x values.
+            y (np.ndarray): y values.
+            **style: Line2D properties such as label, linewidth and linestyle.
+        """
+        entry = self._entry(fig_key)
+        self.used_figures.add(fig_key)
+        entry['used_lines'].add(line_key)
+
+        line = entry['lines'].get(line_key)
+        decimate = use_decimation(x)
+        if line is not None and isinstance(line, DecimatedLine) != decimate:
+            line.remove()
+            line = None
+
+        if line is None:
+            if decimate:
+                line = DecimatedLine(entry['ax'], x, y, **style)
+            else:
+                line, = entry['ax'].plot(x, y, **style)
+            entry['lines'][line_key] = line
+        elif decimate:
+            line.set_data(x, y)
+            line.line.update(style)
+        else:
+            line.set_data(x, y)
+            line.update(style)
+
+    def finish(self, fig_key, xlabel, ylabel, title, log_x=False, xlim=None, ylim=None):
+        """
+        Applies axis settings to a figure and redraws it, blitting when only data changed.
+
+        Parameters:
+            fig_key (hashable): Figure to finish.
+            xlabel, ylabel, title (str): Axis labels and title.
+            log_x (bool): Use a logarithmic x-axis.
+            xlim, ylim (tuple): (min, max) limits, or None to autoscale.
+        """
+        entry = self._entry(fig_key)
+        self.used_figures.add(fig_key)
+        ax = entry['ax']
+
+        # Drop lines of slots that were not plotted in this pass
+        for key in list(entry['lines']):
+            if key not in entry['used_lines']:
+                entry['lines'].pop(key).remove()
+
+        scale = 'log' if log_x else 'linear'
+        if ax.get_xscale() != scale:
+            ax.set_xscale(scale)
+        if ax.get_xlabel() != xlabel:
+            ax.set_xlabel(xlabel)
+        if ax.get_ylabel() != ylabel:
+            ax.set_ylabel(ylabel)
+        if ax.get_title() != title:
+            ax.set_title(title)
+
+        ax.set_autoscale_on(True)
+        ax.relim()
+        ax.autoscale_view()
+        if xlim is not None:
+            ax.set_xlim(xlim)
+        if ylim is not None:
+            ax.set_ylim(ylim)
+
+        labels = tuple(self._line2d(line).get_label() for line in entry['lines'].values())
+        layout = (scale, tuple(ax.get_xlim()), tuple(ax.get_ylim()), xlabel, ylabel, title, labels)
+        full_redraw = layout != entry['layout']
+        if full_redraw and (entry['layout'] is None or labels != entry['layout'][-1]):
+            ax.legend()
+        entry['layout'] = layout
+        self._refresh(entry, full_redraw)
+
+    @staticmethod
+    def _line2d(line):
+        return line.line if isinstance(line, DecimatedLine) else line
+
+    def _refresh(self, entry, full_redraw):
+        fig = entry['fig']
+        ax = entry['ax']
+        canvas = fig.canvas
+        lines = [self._line2d(line) for line in entry['lines'].values()]
+
+        if not getattr(canvas, 'supports_blit', False):
+            canvas.draw_idle()
+            return
+
+        if full_redraw or entry['background'] is None:
+            # Draw everything except the data lines once and keep it as the blit background
+            for line in lines:
+                line.set_visible(False)
+            canvas.draw()
+            entry['background'] = canvas.copy_from_bbox(ax.bbox)
+            for line in lines:
+                line.set_visible(True)
+        else:
+            canvas.restore_region(entry['background'])
+
+        for line in lines:
+            ax.draw_artist(line)
+        canvas.blit(ax.bbox)
+        # The blit above already brought the canvas up to date
+        fig.stale = False
+
+    def show(self):
+        """
+        Closes figures not used in this pass and shows the rest without blocking, so the
+        windows stay open (and are reused) while the prompts continue.
+        """
+        import matplotlib.pyplot as plt
+
+        for fig_key in list(self.entries):
+            if fig_key not in self.used_figures:
+                plt.close(self.entries.pop(fig_key)['fig'])
+        plt.ion()
+        if not all(entry['shown'] for entry in self.entries.values()):
+            plt.show(block=False)
+        for entry in self.entries.values():
+            entry['shown'] = True
+            entry['fig'].canvas.flush_events()
+
+    def show_and_close(self):
+        """
+        Leaves interactive mode and blocks on the open figures so they can still be
+        inspected or saved before exit, then closes them.
+        """
+        import matplotlib.pyplot as plt
+
+        plt.ioff()
+        if self.entries:
+            plt.show()
+        for entry in self.entries.values():
+            plt.close(entry['fig'])
+        self.entries = {}
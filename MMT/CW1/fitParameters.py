@@ -0,0 +1,409 @@
+import argparse
+import os
+
+import numpy as np
+
+from plotCore import S2_equation, V_o_theoretical, load_fft_export, load_time_export
+from stageTrace import enable as enable_trace, stage
+
+# Seed of the random multi-start initializations, so repeated fits agree
+SEED = 12345
+
+# Starts are drawn log-uniformly within this factor of the initial guess
+DEFAULT_SPREAD = 10.0
+
+DEFAULT_STARTS = 8
+
+
+def _S2_parts(f, m):
+    """Real and imaginary parts of S_2(2πf) and their derivatives with respect to m."""
+    omega = 2 * np.pi * f
+    S = S2_equation(omega, m)
+    d_real = 2 * np.cos(2 * m * omega) - 0.5 * np.cos(m * omega)
+    d_imag = -2 * np.sin(2 * m * omega) + 0.5 * np.sin(m * omega)
+    return S, d_real, d_imag
+
+
+def S2_model(f, p):
+    """scale * |S_2(2πf)| for p = (m, scale)."""
+    m, scale = p
+    return scale * np.abs(S2_equation(2 * np.pi * f, m))
+
+
+def S2_jacobian(f, p):
+    """Derivatives of S2_model with respect to (m, scale), one row per frequency."""
+    m, scale = p
+    S, d_real, d_imag = _S2_parts(f, m)
+    mag = np.abs(S)
+    d_mag = np.divide(S.real * d_real + S.imag * d_imag, mag, out=np.zeros_like(mag), where=mag > 0)
+    return np.column_stack((scale * d_mag, mag))
+
+
+def V_o_model(t, p):
+    """V_o(t) for p = (rate, m)."""
+    rate, m = p
+    return V_o_theoretical(t, rate, m)
+
+
+def V_o_jacobian(t, p):
+    """
+    Derivatives of V_o_model with respect to (rate, m), for sorted t.
+
+    Within each piece of the equation they are analytic. V_o also jumps by +0.5 at
+    t = m and by -1 at t = 2m, where the input steps; moving a jump past a sample
+    changes it at a rate of jump / spacing, which is added at the first sample after
+    each jump so the fit can move them.
+    """
+    rate, m = p
+    J = np.zeros((len(t), 2))
+    e0 = np.exp(-rate * np.maximum(t, 0.0))
+
+    piece = (t >= 0) & (t < m)
+    J[piece, 0] = -0.5 * t[piece] * e0[piece]
+
+    piece = (t >= m) & (t < 2 * m)
+    tp = t[piece]
+    e1 = np.exp(-rate * (tp - m))
+    J[piece, 0] = -0.5 * (tp - m) * e1 - 0.5 * tp * e0[piece]
+    J[piece, 1] = 0.5 * rate * e1
+
+    piece = t >= 2 * m
+    tp = t[piece]
+    e1 = np.exp(-rate * (tp - m))
+    e2 = np.exp(-rate * (tp - 2 * m))
+    J[piece, 0] = -0.5 * tp * e0[piece] - 0.5 * (tp - m) * e1 + (tp - 2 * m) * e2
+    J[piece, 1] = 0.5 * rate * e1 - 2 * rate * e2
+
+    # (position, d position / d m, jump)
+    for edge, d_edge, jump in ((m, 1.0, 0.5), (2 * m, 2.0, -1.0)):
+        i = np.searchsorted(t, edge)
+        if 0 < i < len(t) and t[i] > t[i - 1]:
+            J[i, 1] -= jump * d_edge / (t[i] - t[i - 1])
+    return J
+
+
+def H_model(t, p):
+    """-rate e^{-rate t}, the part of H(t) after the delta, for p = (rate,)."""
+    (rate,) = p
+    return -rate * np.exp(-rate * t)
+
+
+def H_jacobian(t, p):
+    """Derivative of H_model with respect to rate."""
+    (rate,) = p
+    return (-(1 - rate * t) * np.exp(-rate * t))[:, None]
+
+
+def _S2_initial(x, y, m=1e-3):
+    # The scale enters linearly, so its best value for a given m is a projection
+    shape = np.abs(S2_equation(2 * np.pi * x, m))
+    return [m, (y @ shape) / max(shape @ shape, 1e-300)]
+
+
+def _V_o_initial(x, y, rate=10000.0, m=None):
+    if m is None:
+        # The steepest fall is where the input drops from 1 to 0, at t = 2m
+        i = np.argmin(np.diff(y))
+        m = 0.25 * (x[i] + x[i + 1]) if x[i + 1] > 0 else 1e-3
+    return [rate, m]
+
+
+def _H_initial(x, y, rate=10000.0):
+    return [rate]
+
+
+# Fittable models: parameter names, model and Jacobian functions of (x, p), initial guess
+# from the data (taking given parameter values as keywords), the parameters the
+# multi-start varies and the export kind they fit
+FIT_MODELS = {
+    'S2': {'params': ('m', 'scale'), 'model': S2_model, 'jacobian': S2_jacobian,
+           'initial': _S2_initial, 'vary': ('m',), 'kind': 'fft'},
+    'V_o': {'params': ('rate', 'm'), 'model': V_o_model, 'jacobian': V_o_jacobian,
+            'initial': _V_o_initial, 'vary': ('rate',), 'kind': 'time'},
+    'H': {'params': ('rate',), 'model': H_model, 'jacobian': H_jacobian,
+          'initial': _H_initial, 'vary': ('rate',), 'kind': 'time'},
+}
+
+
+def load_fit_data(model, filename):
+    """
+    Loads the samples a model is fitted to: linear magnitudes of an FFT export for S2,
+    a time export for V_o, and the samples after t = 0 of a time export for H.
+
+    Returns:
+        np.ndarray: x values.
+        np.ndarray: y values.
+    """
+    if FIT_MODELS[model]['kind'] == 'fft':
+        freqs, mags_dB, _ = load_fft_export(filename)
+        return freqs, 10 ** (mags_dB / 20)
+    times, values = load_time_export(filename)
+    if model == 'H':
+        # The delta at t = 0 is a sampling convention, not part of the decay
+        keep = times > 0
+        times, values = times[keep], values[keep]
+    return times, values
+
+
+def levenberg_marquardt(model, x, y, p0, max_iter=200, tol=1e-10):
+    """
+    Minimizes the sum of squared residuals y - f(x, p) from one starting point.
+
+    Steps are taken in log(p), which keeps every parameter positive and makes the
+    step sizes independent of the parameters' units; the damping is scaled by the
+    diagonal of JᵀJ (Marquardt's variant).
+
+    Parameters:
+        model (str): Key of FIT_MODELS.
+        x (np.ndarray): Sample positions.
+        y (np.ndarray): Measured values.
+        p0 (sequence of float): Positive starting parameters.
+        max_iter (int): Most Jacobian evaluations.
+        tol (float): Stop once a step lowers the cost by less than this fraction.
+
+    Returns:
+        dict: 'params', 'cost' (sum of squared residuals), 'iterations' and 'converged'.
+    """
+    func = FIT_MODELS[model]['model']
+    jacobian = FIT_MODELS[model]['jacobian']
+    p = np.asarray(p0, dtype=float)
+    u = np.log(p)
+    r = y - func(x, p)
+    cost = r @ r
+    damping = 1e-3
+    converged = False
+    iteration = 0
+    for iteration in range(1, max_iter + 1):
+        # d f / d log(p) = p * d f / d p
+        J = jacobian(x, p) * p
+        A = J.T @ J
+        g = J.T @ r
+        scale = np.where(np.diag(A) > 0, np.diag(A), 1.0)
+        while True:
+            try:
+                step = np.linalg.solve(A + damping * np.diag(scale), g)
+            except np.linalg.LinAlgError:
+                step = None
+            if step is not None:
+                with np.errstate(over='ignore', invalid='ignore'):
+                    p_new = np.exp(u + step)
+                    r_new = y - func(x, p_new)
+                    cost_new = r_new @ r_new
+                if np.isfinite(cost_new) and cost_new <= cost:
+                    break
+            damping *= 10
+            if damping > 1e12:
+                return {'params': p, 'cost': float(cost), 'iterations': iteration, 'converged': True}
+        decrease = cost - cost_new
+        u, p, r, cost = u + step, p_new, r_new, cost_new
+        damping = max(damping / 10, 1e-12)
+        if decrease <= tol * cost or np.max(np.abs(step)) < tol:
+            converged = True
+            break
+    return {'params': p, 'cost': float(cost), 'iterations': iteration, 'converged': converged}
+
+
+def _fit_start(args):
+    return levenberg_marquardt(*args)
+
+
+def fit_trace(model, x, y, starts=DEFAULT_STARTS, processes=None, spread=DEFAULT_SPREAD, initial=None):
+    """
+    Fits a model to a trace from several starting points and keeps the best fit.
+
+    The first start is the initial guess; the others draw the model's 'vary'
+    parameters log-uniformly within a factor of spread of it, since S2 and V_o
+    oscillate or decay in ways a single start can get stuck on.
+
+    Parameters:
+        model (str): Key of FIT_MODELS.
+        x (np.ndarray): Sample positions.
+        y (np.ndarray): Measured values.
+        starts (int): Number of starting points.
+        processes (int): Worker processes for the starts; None uses every CPU, 1 fits
+            in this process without a pool.
+        spread (float): Factor the starts range over.
+        initial (dict): Initial values of parameters, e.g. {'m': 2e-3}; the others
+            are guessed from the data or take the model's defaults.
+
+    Returns:
+        dict: 'model', 'names', 'params', 'stderr' (one standard error per parameter),
+            'rms' (residual), 'cost', 'points', 'starts' and 'converged' (starts that did).
+    """
+    spec = FIT_MODELS[model]
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if len(x) <= len(spec['params']):
+        raise ValueError(f"Fitting {model} needs more than {len(spec['params'])} points, got {len(x)}.")
+    initial = dict(initial or {})
+    unknown = set(initial) - set(spec['params'])
+    if unknown:
+        raise ValueError(f"Unknown {model} parameter(s) {sorted(unknown)}. Use {list(spec['params'])}.")
+    p0 = spec['initial'](x, y, **initial)
+
+    rng = np.random.default_rng(SEED)
+    start_points = [p0]
+    guess = dict(zip(spec['params'], p0))
+    for _ in range(starts - 1):
+        jitter = np.exp(rng.uniform(-np.log(spread), np.log(spread), len(spec['vary'])))
+        given = dict(initial, **{name: guess[name] * j for name, j in zip(spec['vary'], jitter)})
+        start_points.append(spec['initial'](x, y, **given))
+
+    args = [(model, x, y, p) for p in start_points]
+    with stage('compute', f"fit {model}", input_bytes=x.nbytes + y.nbytes):
+        if processes == 1 or len(args) <= 1:
+            fits = [_fit_start(a) for a in args]
+        else:
+            from multiprocessing import Pool
+
+            with Pool(processes=processes) as pool:
+                fits = pool.map(_fit_start, args, chunksize=1)
+    best = min(fits, key=lambda fit: fit['cost'])
+
+    # Covariance s² (JᵀJ)⁻¹ at the optimum, from the Jacobian in the parameters themselves;
+    # columns are scaled to unit norm first, as their units differ by many decades
+    params = best['params']
+    J = spec['jacobian'](x, params)
+    norms = np.linalg.norm(J, axis=0)
+    norms[norms == 0] = 1.0
+    Js = J / norms
+    dof = max(len(x) - len(params), 1)
+    s2 = best['cost'] / dof
+    cov = s2 * np.linalg.pinv(Js.T @ Js) / np.outer(norms, norms)
+    return {
+        'model': model,
+        'names': spec['params'],
+        'params': params,
+        'stderr': np.sqrt(np.clip(np.diag(cov), 0.0, None)),
+        'rms': float(np.sqrt(best['cost'] / len(x))),
+        'cost': best['cost'],
+        'points': len(x),
+        'starts': len(fits),
+        'converged': sum(fit['converged'] for fit in fits),
+    }
+
+
+def fitted_curve(result, x):
+    """Evaluates a fitted model at x in one vectorized call."""
+    return FIT_MODELS[result['model']]['model'](np.asarray(x, dtype=float), result['params'])
+
+
+def print_fit_report(result, label=""):
+    """
+    Prints fitted parameters with their standard errors.
+
+    Parameters:
+        result (dict): Output of fit_trace.
+        label (str): Name of the fitted trace.
+    """
+    title = f" to '{label}'" if label else ""
+    print(f"\n[INFO] Fit of {result['model']}{title}: {result['points']} points, "
+          f"{result['converged']}/{result['starts']} starts converged, RMS residual {result['rms']:.6g}")
+    print(f"{'Parameter':<12} {'Value':>16} {'Std. error':>16} {'Rel. error':>12}")
+    for name, value, err in zip(result['names'], result['params'], result['stderr']):
+        print(f"{name:<12} {value:>16.8g} {err:>16.4g} {err / abs(value):>11.2%}")
+
+
+def plot_fit(result, x, y, label, output=None):
+    """
+    Overlays the fitted curve on the measured trace.
+
+    Parameters:
+        result (dict): Output of fit_trace.
+        x (np.ndarray): Sample positions.
+        y (np.ndarray): Measured values.
+        label (str): Legend label of the measured trace.
+        output (str): Image file to write with the Agg backend, or None to show a window.
+    """
+    if output:
+        import matplotlib
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    fit = fitted_curve(result, x)
+    params = ", ".join(f"{name} = {value:.6g}" for name, value in zip(result['names'], result['params']))
+    is_fft = FIT_MODELS[result['model']]['kind'] == 'fft'
+    with stage('render', output or label):
+        fig = plt.figure(figsize=(10, 6))
+        ax = fig.gca()
+        if is_fft:
+            ax.semilogx(x, 20 * np.log10(y + 1e-30), label=label)
+            ax.semilogx(x, 20 * np.log10(fit + 1e-30), linewidth=2.5, linestyle='--', label=f"Fit: {params}")
+            ax.set_xlabel("Frequency (Hz)")
+            ax.set_ylabel("Magnitude (dB)")
+        else:
+            ax.plot(x, y, label=label)
+            ax.plot(x, fit, linewidth=2.5, linestyle='--', label=f"Fit: {params}")
+            ax.set_xlabel("Time (s)")
+            ax.set_ylabel("Vₒ(t) [V]" if result['model'] == 'V_o' else "H(t)")
+        ax.set_title(f"Fitted {result['model']} Model")
+        ax.grid(True, which="both", ls="--")
+        ax.legend()
+    if output:
+        out_dir = os.path.dirname(output)
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+        fig.savefig(output)
+        plt.close(fig)
+    else:
+        with stage('show'):
+            plt.show()
+
+
+def parse_initial(texts):
+    """
+    Parses NAME=VALUE initial values.
+
+    Parameters:
+        texts (list of str): E.g. ['m=0.002', 'rate=8000'].
+
+    Returns:
+        dict: Parameter name -> value.
+    """
+    initial = {}
+    for text in texts:
+        name, _, value = text.partition('=')
+        try:
+            initial[name.strip()] = float(value)
+        except ValueError:
+            raise ValueError(f"Expected NAME=VALUE for an initial value, got '{text}'.")
+    return initial
+
+
+def run_fit(args):
+    """
+    Loads, fits, reports and plots as parsed fit options ask (see main and plotCli).
+
+    Returns:
+        dict: Output of fit_trace.
+    """
+    x, y = load_fit_data(args.model, args.path)
+    result = fit_trace(args.model, x, y, starts=args.starts, processes=args.processes,
+                       initial=parse_initial(args.initial))
+    print_fit_report(result, args.path)
+    if not args.no_plot:
+        plot_fit(result, x, y, args.path, args.output)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Fit m, R/L or the decay rate of the theoretical models to a measured trace.")
+    parser.add_argument('path', help="LTspice export: FFT for S2, time/value for V_o and H")
+    parser.add_argument('--model', choices=list(FIT_MODELS), required=True, help="model to fit")
+    parser.add_argument('--initial', action='append', default=[], metavar='NAME=VALUE',
+                        help="initial value of a parameter, e.g. m=0.002 or rate=8000")
+    parser.add_argument('--starts', type=int, default=DEFAULT_STARTS, help="number of starting points")
+    parser.add_argument('-p', '--processes', type=int, default=None,
+                        help="worker processes for the starts (default: one per CPU)")
+    parser.add_argument('--output', metavar='FILE', help="write the overlay plot to FILE instead of showing it")
+    parser.add_argument('--no-plot', action='store_true', help="print the fit only")
+    parser.add_argument('--trace', metavar='FILE', help="time each stage and write a Chrome trace to FILE")
+    args = parser.parse_args(argv)
+    if args.trace:
+        enable_trace(args.trace)
+    run_fit(args)
+
+
+if __name__ == "__main__":
+    main()
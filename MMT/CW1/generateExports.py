@@ -0,0 +1,225 @@
+import argparse
+import bz2
+import gzip
+import lzma
+import os
+import time
+
+import numpy as np
+
+# Rows generated and formatted per block; memory use depends on this, not on the row count
+CHUNK_ROWS = 1 << 16
+
+SEED = 12345
+
+COMPRESSIONS = {'gz': gzip.open, 'bz2': bz2.open, 'xz': lzma.open}
+
+# Malformed lines of the kinds real exports and hand-edited files contain
+FFT_MALFORMED = ["garbage line", "1.00000000000000e+003\t(-3.01029995663981e+000dB)",
+                 "1.00000000000000e+003\t(dB,°)", "", "1.000000e+003"]
+TRANSIENT_MALFORMED = ["garbage line", "1.00000000000000e-003", "nan?\tinf?", "", "time\tV(vo)"]
+
+
+def open_output(path, compression=None, encoding='utf-8'):
+    """
+    Opens an export for writing as text, compressed if asked or if the extension says so.
+
+    Parameters:
+        path (str): Output path.
+        compression (str): 'gz', 'bz2', 'xz' or None to pick from the extension.
+        encoding (str): Text encoding.
+
+    Returns:
+        file: Writable text file object.
+    """
+    if compression is None:
+        extension = os.path.splitext(path)[1].lstrip('.').lower()
+        compression = extension if extension in COMPRESSIONS else None
+    if compression is None:
+        return open(path, 'w', encoding=encoding, newline='\n')
+    return COMPRESSIONS[compression](path, 'wt', encoding=encoding, newline='\n')
+
+
+def _format_block(fmt, columns):
+    """Formats equal-length columns row by row with one % operation."""
+    rows = np.column_stack(columns)
+    return (fmt * len(rows)) % tuple(rows.ravel())
+
+
+def _insert_malformed(block, rate, choices, rng):
+    """Replaces a random fraction of the lines of a block with malformed ones."""
+    lines = block.splitlines(keepends=True)
+    hits = np.flatnonzero(rng.random(len(lines)) < rate)
+    for idx in hits:
+        lines[idx] = choices[rng.integers(len(choices))] + "\n"
+    return ''.join(lines), len(hits)
+
+
+def _step_header(step, steps, param, value):
+    return f"Step Information: {param}={value:g}  (Run: {step + 1}/{steps})\n"
+
+
+def fft_blocks(num_rows, rng, f_start=0.1, f_stop=1e5, corner=1e3, malformed_rate=0.0):
+    """
+    Generates the data lines of one FFT/AC run in blocks of CHUNK_ROWS rows.
+
+    The response is a first-order low-pass with a corner frequency of corner, plus a
+    little noise, on a log-spaced frequency axis, written as LTspice does:
+    freq<TAB>(mag dB,phase°).
+
+    Parameters:
+        num_rows (int): Number of data rows.
+        rng (np.random.Generator): Random generator.
+        f_start, f_stop (float): First and last frequency in Hz.
+        corner (float): Corner frequency in Hz.
+        malformed_rate (float): Fraction of lines replaced with malformed ones.
+
+    Yields:
+        str: A block of lines.
+        int: Number of malformed lines in it.
+    """
+    log_ratio = np.log(f_stop / f_start) / max(num_rows - 1, 1)
+    for start in range(0, num_rows, CHUNK_ROWS):
+        idx = np.arange(start, min(start + CHUNK_ROWS, num_rows))
+        freqs = f_start * np.exp(idx * log_ratio)
+        mags = -10 * np.log10(1 + (freqs / corner) ** 2) + rng.normal(0, 0.05, len(idx))
+        phases = -np.degrees(np.arctan(freqs / corner))
+        block = _format_block("%.14e\t(%.14edB,%.14e°)\n", (freqs, mags, phases))
+        bad = 0
+        if malformed_rate > 0:
+            block, bad = _insert_malformed(block, malformed_rate, FFT_MALFORMED, rng)
+        yield block, bad
+
+
+def transient_blocks(num_rows, rng, t_stop=5e-3, tau=1e-4, malformed_rate=0.0):
+    """
+    Generates the data lines of one transient run in blocks of CHUNK_ROWS rows.
+
+    Time steps vary like LTspice's adaptive stepping: log-normally around the mean
+    step, with bursts of much smaller steps. Values are the steady-state response of a
+    first-order low-pass (time constant tau) to a 1 kHz square wave, plus a little noise.
+
+    Parameters:
+        num_rows (int): Number of data rows.
+        rng (np.random.Generator): Random generator.
+        t_stop (float): Approximate end time in seconds.
+        tau (float): Low-pass time constant in seconds.
+        malformed_rate (float): Fraction of lines replaced with malformed ones.
+
+    Yields:
+        str: A block of lines.
+        int: Number of malformed lines in it.
+    """
+    mean_dt = t_stop / max(num_rows - 1, 1)
+    half = 0.5e-3
+    # Periodic steady state of the low-pass: it swings between v_low and v_high
+    a = np.exp(-half / tau)
+    v_high = 1.0 / (1.0 + a)
+    v_low = a * v_high
+    t_last = 0.0
+    for start in range(0, num_rows, CHUNK_ROWS):
+        count = min(CHUNK_ROWS, num_rows - start)
+        dt = mean_dt * rng.lognormal(0.0, 0.5, count) / np.exp(0.125)
+        dt[rng.random(count) < 0.01] *= 1e-3
+        if start == 0:
+            dt[0] = 0.0
+        times = t_last + np.cumsum(dt)
+        t_last = times[-1]
+        phase = np.mod(times, 2 * half)
+        values = np.where(phase < half, 1.0 - (1.0 - v_low) * np.exp(-phase / tau),
+                          v_high * np.exp(-(phase - half) / tau))
+        block = _format_block("%.15e\t%.15e\n", (times, values + rng.normal(0, 1e-4, count)))
+        bad = 0
+        if malformed_rate > 0:
+            block, bad = _insert_malformed(block, malformed_rate, TRANSIENT_MALFORMED, rng)
+        yield block, bad
+
+
+def write_fft_export(path, num_rows, steps=1, malformed_rate=0.0, seed=SEED, compression=None,
+                     f_start=0.1, f_stop=1e5):
+    """
+    Writes an LTspice-style FFT/AC export with the 'Freq.' header.
+
+    Parameters:
+        path (str): Output path.
+        num_rows (int): Data rows per step.
+        steps (int): Number of .step runs; more than one adds 'Step Information' lines.
+        malformed_rate (float): Fraction of data lines replaced with malformed ones.
+        seed (int): Random seed.
+        compression (str): 'gz', 'bz2', 'xz' or None (see open_output).
+        f_start, f_stop (float): Frequency range in Hz.
+
+    Returns:
+        dict: 'rows' (valid data rows) and 'malformed' line counts.
+    """
+    rng = np.random.default_rng(seed)
+    rows = malformed = 0
+    with open_output(path, compression) as f:
+        f.write("Freq.\tV(n002)\n")
+        for step in range(steps):
+            corner = 1e3 * 2 ** step
+            if steps > 1:
+                f.write(_step_header(step, steps, 'C', 1e-6 / 2 ** step))
+            for block, bad in fft_blocks(num_rows, rng, f_start, f_stop, corner, malformed_rate):
+                f.write(block)
+                malformed += bad
+            rows += num_rows
+    # Malformed lines replaced data rows, so they are not counted as rows
+    return {'rows': rows - malformed, 'malformed': malformed}
+
+
+def write_transient_export(path, num_rows, steps=1, malformed_rate=0.0, seed=SEED, compression=None,
+                           t_stop=5e-3):
+    """
+    Writes a transient time/value export with variable time steps.
+
+    Parameters:
+        path (str): Output path.
+        num_rows (int): Data rows per step.
+        steps (int): Number of .step runs; more than one adds 'Step Information' lines.
+        malformed_rate (float): Fraction of data lines replaced with malformed ones.
+        seed (int): Random seed.
+        compression (str): 'gz', 'bz2', 'xz' or None (see open_output).
+        t_stop (float): Approximate end time in seconds.
+
+    Returns:
+        dict: 'rows' (valid data rows) and 'malformed' line counts.
+    """
+    rng = np.random.default_rng(seed)
+    rows = malformed = 0
+    with open_output(path, compression) as f:
+        f.write("time\tV(vo)\n")
+        for step in range(steps):
+            tau = 1e-4 * 2 ** step
+            if steps > 1:
+                f.write(_step_header(step, steps, 'R', 100.0 * 2 ** step))
+            for block, bad in transient_blocks(num_rows, rng, t_stop, tau, malformed_rate):
+                f.write(block)
+                malformed += bad
+            rows += num_rows
+    # Malformed lines replaced data rows, so they are not counted as rows
+    return {'rows': rows - malformed, 'malformed': malformed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic LTspice-style exports for scale testing.")
+    parser.add_argument('kind', choices=['fft', 'transient'], help="export type")
+    parser.add_argument('output', help="output path; a .gz/.bz2/.xz extension compresses it")
+    parser.add_argument('-n', '--rows', type=float, default=1e6, help="data rows per step, e.g. 1e8")
+    parser.add_argument('--steps', type=int, default=1, help="number of .step runs")
+    parser.add_argument('--malformed', type=float, default=0.0, help="fraction of malformed lines, e.g. 1e-4")
+    parser.add_argument('--compress', choices=list(COMPRESSIONS), help="compression (default: from extension)")
+    parser.add_argument('--seed', type=int, default=SEED, help="random seed")
+    args = parser.parse_args()
+
+    writer = write_fft_export if args.kind == 'fft' else write_transient_export
+    start = time.perf_counter()
+    stats = writer(args.output, int(args.rows), args.steps, args.malformed, args.seed, args.compress)
+    seconds = time.perf_counter() - start
+    size_mb = os.path.getsize(args.output) / 2 ** 20
+    print(f"Wrote {stats['rows']} rows ({stats['malformed']} malformed) to '{args.output}': "
+          f"{size_mb:.1f} MB in {seconds:.2f} s.")
+
+
+if __name__ == "__main__":
+    main()
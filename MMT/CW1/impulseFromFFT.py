@@ -0,0 +1,104 @@
+import numpy as np
+
+from compareTheory import interp_sorted
+from spectrumAnalysis import next_fast_len
+
+# Upper limit on the number of uniform frequency bins used for the inverse transform
+MAX_BINS = 1 << 20
+
+
+def complex_from_fft_data(mags_dB, phases_deg):
+    """
+    Rebuilds complex frequency samples from magnitude (dB) and phase (degrees).
+
+    Parameters:
+        mags_dB (np.ndarray): Magnitudes in dB.
+        phases_deg (np.ndarray): Phases in degrees.
+
+    Returns:
+        np.ndarray: Complex frequency response samples.
+    """
+    return 10 ** (np.asarray(mags_dB) / 20.0) * np.exp(1j * np.radians(phases_deg))
+
+
+def uniform_frequency_grid(freqs, num_bins=None):
+    """
+    Picks a uniform grid 0, df, 2*df, ... covering an (often log-spaced) FFT export.
+
+    By default df is the lowest non-zero frequency in the export, so the recovered h(t)
+    spans the longest time window the data supports, capped at MAX_BINS bins.
+
+    Parameters:
+        freqs (np.ndarray): Sorted export frequencies in Hz.
+        num_bins (int): Number of bins from DC to the highest frequency, or None.
+
+    Returns:
+        np.ndarray: Uniform frequency grid starting at DC.
+    """
+    f_max = freqs[-1]
+    if num_bins is None:
+        positive = freqs[freqs > 0]
+        if positive.size == 0:
+            raise ValueError("The export has no positive frequency to set the grid spacing from.")
+        f_low = positive[0]
+        num_bins = min(int(np.ceil(f_max / f_low)) + 1, MAX_BINS)
+    # An rfft of length next_fast_len(2 * (num_bins - 1)) keeps the inverse transform fast
+    num_bins = next_fast_len(2 * (max(num_bins, 2) - 1)) // 2 + 1
+    return np.linspace(0.0, f_max, num_bins)
+
+
+def resample_response(freqs, response, grid):
+    """
+    Interpolates a complex frequency response onto a new grid.
+
+    Magnitude and unwrapped phase are interpolated separately, which follows the
+    response far better than interpolating real and imaginary parts on a coarse,
+    log-spaced grid. DC is forced real, as it must be for a real h(t).
+
+    Parameters:
+        freqs (np.ndarray): Sorted frequencies of the response samples.
+        response (np.ndarray): Complex response samples.
+        grid (np.ndarray): Sorted target frequencies.
+
+    Returns:
+        np.ndarray: Complex response on grid.
+    """
+    magnitude = np.abs(response)
+    phase = np.unwrap(np.angle(response))
+    values = interp_sorted(grid, freqs, np.vstack((magnitude, phase)))
+    resampled = values[0] * np.exp(1j * values[1])
+    if grid[0] == 0:
+        resampled[0] = response[0].real if freqs[0] == 0 else np.abs(response[0]) * np.sign(response[0].real)
+    return resampled
+
+
+def impulse_from_fft(freqs, mags_dB, phases_deg, num_bins=None):
+    """
+    Recovers the impulse response h(t) from an FFT/AC export via a real inverse FFT.
+
+    Parameters:
+        freqs (np.ndarray): Export frequencies in Hz (uniform or not).
+        mags_dB (np.ndarray): Magnitudes in dB.
+        phases_deg (np.ndarray): Phases in degrees.
+        num_bins (int): Number of uniform bins from DC to the highest frequency, or None
+            to choose it from the export (see uniform_frequency_grid).
+
+    Returns:
+        np.ndarray: Time values in seconds, starting at 0.
+        np.ndarray: h(t) samples, scaled as a continuous-time impulse response.
+    """
+    freqs = np.asarray(freqs, dtype=float)
+    order = np.argsort(freqs, kind='stable')
+    freqs = freqs[order]
+    response = complex_from_fft_data(np.asarray(mags_dB)[order], np.asarray(phases_deg)[order])
+
+    grid = uniform_frequency_grid(freqs, num_bins)
+    uniform_response = resample_response(freqs, response, grid)
+    uniform_response[-1] = uniform_response[-1].real
+
+    n = 2 * (len(grid) - 1)
+    df = grid[1] - grid[0]
+    # h(t) = integral of H(f) e^{j 2 pi f t} df  ~  n * df * irfft(H)
+    h_t = np.fft.irfft(uniform_response, n=n) * (n * df)
+    times = np.arange(n) / (n * df)
+    return times, h_t
@@ -0,0 +1,137 @@
+import numpy as np
+
+# Traces with fewer points than this are plotted as-is
+LOD_THRESHOLD = 100000
+
+# Target number of plotted points per horizontal pixel
+POINTS_PER_PIXEL = 2
+
+
+def minmax_decimate(x, y, num_bins):
+    """
+    Reduces a trace to the minimum and maximum of each of num_bins equal-count bins.
+
+    Both extremes of every bin are kept, in the order they occur, so peaks and nulls
+    survive decimation and the line looks the same as the full trace at screen size.
+
+    Parameters:
+        x (np.ndarray): Sorted x values.
+        y (np.ndarray): y values.
+        num_bins (int): Number of bins.
+
+    Returns:
+        np.ndarray: Decimated x values (at most 2 * num_bins + 4 points).
+        np.ndarray: Decimated y values.
+    """
+    n = len(x)
+    if num_bins <= 0 or n // num_bins < 2:
+        return x, y
+    bin_size = n // num_bins
+
+    usable = bin_size * num_bins
+    y_bins = y[:usable].reshape(num_bins, bin_size)
+    offsets = np.arange(num_bins) * bin_size
+    idx_min = offsets + np.argmin(y_bins, axis=1)
+    idx_max = offsets + np.argmax(y_bins, axis=1)
+
+    idx = np.empty(2 * num_bins, dtype=np.intp)
+    idx[0::2] = np.minimum(idx_min, idx_max)
+    idx[1::2] = np.maximum(idx_min, idx_max)
+    # Keep the tail that does not fill a whole bin, and always start and end on the
+    # first and last samples so the x extent (and autoscaling) is unchanged
+    tail = []
+    if usable < n:
+        tail = usable + np.sort([np.argmin(y[usable:]), np.argmax(y[usable:])])
+    idx = np.concatenate(([0], idx, tail, [n - 1])).astype(np.intp)
+    return x[idx], y[idx]
+
+
+class DecimatedLine:
+    """
+    A Line2D that keeps its full-resolution data off to the side and re-decimates the
+    visible span whenever the x-limits change (zoom, pan or set_xlim).
+    """
+
+    def __init__(self, ax, x, y, points_per_pixel=POINTS_PER_PIXEL, **plot_kwargs):
+        """
+        Parameters:
+            ax (matplotlib.axes.Axes): Axes to draw on.
+            x (np.ndarray): Sorted x values.
+            y (np.ndarray): y values.
+            points_per_pixel (float): Target plotted points per horizontal pixel.
+            **plot_kwargs: Passed on to ax.plot.
+        """
+        self.ax = ax
+        self.x = np.asarray(x)
+        self.y = np.asarray(y)
+        self.points_per_pixel = points_per_pixel
+        self.line, = ax.plot(*self._visible_data(None), **plot_kwargs)
+        # A lambda is held strongly by the callback registry, which keeps self alive
+        self.cid = ax.callbacks.connect('xlim_changed', lambda event_ax: self.update())
+
+    def _visible_data(self, xlim):
+        if xlim is None:
+            lo, hi = 0, len(self.x)
+        else:
+            x_lo, x_hi = sorted(xlim)
+            # One extra sample each side so the line runs off the edges of the view
+            lo = max(int(np.searchsorted(self.x, x_lo, side='left')) - 1, 0)
+            hi = min(int(np.searchsorted(self.x, x_hi, side='right')) + 1, len(self.x))
+        width_px = max(self.ax.get_window_extent().width, 1.0)
+        num_bins = int(width_px * self.points_per_pixel / 2)
+        return minmax_decimate(self.x[lo:hi], self.y[lo:hi], num_bins)
+
+    def set_data(self, x, y):
+        """
+        Replaces the full-resolution data. The line shows the whole new trace until the
+        next x-limit change, so relim/autoscale see its full extent.
+
+        Parameters:
+            x (np.ndarray): Sorted x values.
+            y (np.ndarray): y values.
+        """
+        self.x = np.asarray(x)
+        self.y = np.asarray(y)
+        self.line.set_data(*self._visible_data(None))
+
+    def update(self):
+        """Re-decimates the currently visible span and schedules a redraw."""
+        self.line.set_data(*self._visible_data(self.ax.get_xlim()))
+        self.ax.figure.canvas.draw_idle()
+
+    def remove(self):
+        """Removes the line and disconnects the callback."""
+        self.ax.callbacks.disconnect(self.cid)
+        self.line.remove()
+
+
+def use_decimation(x):
+    """
+    Tells whether a trace is large and sorted enough to be plotted as a DecimatedLine.
+
+    Parameters:
+        x (np.ndarray): x values.
+
+    Returns:
+        bool: True if the trace should be decimated.
+    """
+    return len(x) >= LOD_THRESHOLD and bool(np.all(np.diff(x) >= 0))
+
+
+def plot_line(ax, x, y, **plot_kwargs):
+    """
+    Plots a trace, switching to a DecimatedLine for large, sorted traces.
+
+    Parameters:
+        ax (matplotlib.axes.Axes): Axes to draw on.
+        x (np.ndarray): x values.
+        y (np.ndarray): y values.
+        **plot_kwargs: Passed on to ax.plot.
+
+    Returns:
+        matplotlib.lines.Line2D: The plotted line.
+    """
+    if use_decimation(x):
+        return DecimatedLine(ax, x, y, **plot_kwargs).line
+    line, = ax.plot(x, y, **plot_kwargs)
+    return line
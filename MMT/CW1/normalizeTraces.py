@@ -0,0 +1,87 @@
+import numpy as np
+
+# Added before taking the log of a normalized linear magnitude, as the plotting tools do
+LOG_EPSILON = 1e-30
+
+# 10 ** (x / 20) == exp(x * DB_TO_NEPER)
+DB_TO_NEPER = np.log(10.0) / 20.0
+
+
+def _normalize_block(block, domain, scale, reference):
+    """
+    Normalizes a (num_traces, n) block in place.
+
+    reference is a (num_traces, 1) column of the values to normalize against, in the
+    block's domain. Rows whose linear reference is zero are set to zero (linear scale)
+    or log(epsilon) (dB scale), like the per-trace code they replace.
+    """
+    if domain == 'dB':
+        # A ratio in dB is a difference, so normalization is one subtraction
+        block -= reference
+        if scale == 'linear':
+            block *= DB_TO_NEPER
+            np.exp(block, out=block)
+        return
+    zero = reference[:, 0] == 0
+    reference = np.where(reference == 0, 1.0, reference)
+    block /= reference
+    block[zero] = 0.0
+    if scale == 'dB':
+        block += LOG_EPSILON
+        np.log10(block, out=block)
+        block *= 20.0
+
+
+def normalize_traces(traces, domains='dB', scale='dB', references=None):
+    """
+    Normalizes a set of magnitude traces to their maxima and converts them to a scale.
+
+    Each trace is normalized in the domain it is already in: dB traces by subtracting
+    their maximum, linear traces by dividing by it, so dB data never makes a round
+    trip through linear. Traces of equal length and domain are stacked into one 2D
+    array and normalized with a handful of in-place operations over the whole block;
+    that array is the only allocation, and the returned traces are its rows.
+
+    Parameters:
+        traces (list of np.ndarray): 1D magnitude traces (they are not modified).
+        domains (str or list of str): 'dB' or 'linear', for all traces or per trace.
+        scale (str): Output scale, 'dB' or 'linear'.
+        references (list): Per-trace value to normalize against (in the trace's domain),
+            or None for each trace's own maximum; None entries also use the maximum.
+
+    Returns:
+        list of np.ndarray: Normalized traces, in input order.
+        list of bool: True for traces whose linear reference was zero (left at zero).
+    """
+    num = len(traces)
+    if isinstance(domains, str):
+        domains = [domains] * num
+    if references is None:
+        references = [None] * num
+
+    groups = {}
+    for i, (trace, domain) in enumerate(zip(traces, domains)):
+        groups.setdefault((len(trace), domain), []).append(i)
+
+    out = [None] * num
+    zero = [False] * num
+    for (length, domain), members in groups.items():
+        if len(members) == 1:
+            block = np.array(traces[members[0]], dtype=float, ndmin=2)
+        else:
+            block = np.stack([traces[i] for i in members]).astype(float, copy=False)
+        if length == 0:
+            for row, i in enumerate(members):
+                out[i] = block[row]
+            continue
+        reference = block.max(axis=1, keepdims=True)
+        for row, i in enumerate(members):
+            if references[i] is not None:
+                reference[row, 0] = references[i]
+        if domain != 'dB':
+            for row, i in enumerate(members):
+                zero[i] = bool(reference[row, 0] == 0)
+        _normalize_block(block, domain, scale, reference)
+        for row, i in enumerate(members):
+            out[i] = block[row]
+    return out, zero
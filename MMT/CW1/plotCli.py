@@ -0,0 +1,284 @@
+import argparse
+import sys
+import time
+
+# Taken before anything heavy is imported (but after the interpreter started), for --startup-time
+_START = time.perf_counter()
+
+# Modules whose import dominates startup; --startup-time reports which ones were loaded
+HEAVY_MODULES = ['numpy', 'matplotlib', 'matplotlib.pyplot', 'pandas']
+
+# Startup budget for --help and for load/export of a small export, as process wall time
+# from interpreter launch to exit (benchSuite.py --cli-startup measures it). --help meets
+# it. load and export miss it (about 150-200 ms): importing numpy alone takes about
+# 100 ms, while plotCli itself imports only argparse before dispatch
+STARTUP_BUDGET_MS = 100.0
+
+# Time at which the command was dispatched, for --startup-time
+_dispatched = None
+
+
+class _AppendSource(argparse.Action):
+    """Collects --text/--spectrum/--equation/--simulation options into one ordered source list."""
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        sources = getattr(namespace, 'sources', None) or []
+        source_type = self.dest
+        if source_type in ('equation', 'simulation'):
+            sources.append({'type': source_type, 'model': values})
+        else:
+            sources.append({'type': source_type, 'path': values})
+        namespace.sources = sources
+
+
+def build_parser():
+    """
+    Builds the argument parser. Only argparse is needed here, so --help stays fast.
+
+    Returns:
+        argparse.ArgumentParser: The parser.
+    """
+    parser = argparse.ArgumentParser(
+        prog='plotCli',
+        description="Non-interactive front-end for the FFT, convolution and impulse-response plotting tools.")
+    parser.add_argument('--startup-time', action='store_true',
+                        help="print the time spent in plotCli before dispatch and to exit, "
+                             "and which heavy modules were imported")
+    parser.add_argument('--trace', metavar='FILE',
+                        help="time each pipeline stage, print a summary and write a Chrome trace to FILE")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="also record each stage's peak memory (implies --trace trace.json if not given)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    sources = argparse.ArgumentParser(add_help=False)
+    sources.add_argument('--text', action=_AppendSource, metavar='PATH',
+                         help="LTspice text export (FFT for --kind fft, time/value for --kind time)")
+    sources.add_argument('--spectrum', action=_AppendSource, metavar='PATH',
+                         help="time-domain export, plotted as its computed spectrum")
+    sources.add_argument('--equation', action=_AppendSource, metavar='MODEL', choices=['S2', 'V_o', 'H'],
+                         help="theoretical curve: S2, V_o or H")
+    sources.add_argument('--simulation', action=_AppendSource, metavar='MODEL', choices=['convolution'],
+                         help="simulated curve: convolution (V_o = S * H by np.convolve)")
+    sources.add_argument('--label', action='append', default=[],
+                         help="legend label, applied to the sources in the order given")
+    sources.add_argument('--kind', choices=['fft', 'time'], default='fft',
+                         help="frequency-domain (normalized magnitude) or time-domain plot")
+    sources.add_argument('--scale', choices=['dB', 'linear'], default='dB', help="FFT magnitude scale")
+
+    plot = commands.add_parser('plot', parents=[sources], help="plot sources on one figure")
+    plot.add_argument('--log-x', action='store_true', help="logarithmic x-axis")
+    plot.add_argument('--xlim', type=float, nargs=2, metavar=('MIN', 'MAX'), help="x-axis range")
+    plot.add_argument('--ylim', type=float, nargs=2, metavar=('MIN', 'MAX'), help="y-axis range")
+    plot.add_argument('--title', help="figure title")
+    plot.add_argument('--output', metavar='FILE',
+                      help="render to a PNG/SVG/PDF file with the Agg backend instead of opening a window")
+    plot.add_argument('--dpi', type=int, default=100, help="resolution of the rendered file")
+
+    commands.add_parser('load', parents=[sources], help="load sources and print a summary, without plotting")
+
+    export = commands.add_parser('export', parents=[sources], help="write the plotted curves to CSV")
+    export.add_argument('--output', metavar='FILE', required=True, help="CSV file to write")
+
+    render = commands.add_parser('render', help="render a JSON list of plot jobs (see batchRender.py)")
+    render.add_argument('spec', help="JSON file holding a list of plot jobs")
+    render.add_argument('-p', '--processes', type=int, default=None, help="number of worker processes")
+
+    spec = commands.add_parser('spec', help="run a declarative JSON/TOML plot spec (see plotSpec.py)")
+    spec.add_argument('spec', help="JSON or TOML plot spec")
+    spec.add_argument('-p', '--processes', type=int, default=None, help="number of worker processes")
+
+    fit = commands.add_parser('fit', help="fit model parameters to a measured trace (see fitParameters.py)")
+    fit.add_argument('path', help="LTspice export: FFT for S2, time/value for V_o and H")
+    fit.add_argument('--model', choices=['S2', 'V_o', 'H'], required=True,
+                     help="model to fit: S2 (m, scale), V_o (rate, m) or H (rate)")
+    fit.add_argument('--initial', action='append', default=[], metavar='NAME=VALUE',
+                     help="initial value of a parameter, e.g. m=0.002 or rate=8000")
+    fit.add_argument('--starts', type=int, default=8, help="number of starting points")
+    fit.add_argument('-p', '--processes', type=int, default=None, help="worker processes for the starts")
+    fit.add_argument('--output', metavar='FILE', help="write the overlay plot to FILE instead of showing it")
+    fit.add_argument('--no-plot', action='store_true', help="print the fit only")
+
+    features = commands.add_parser('features', help="extract peaks, nulls and -3 dB points (see spectralFeatures.py)")
+    features.add_argument('paths', nargs='*', help="FFT exports, or directories of them")
+    features.add_argument('--pattern', default='*.txt', help="files picked up in a directory")
+    features.add_argument('--equation', action='append', default=[], choices=['S2', 'pulse'],
+                          help="also analyse an equation curve")
+    features.add_argument('--range', type=float, nargs=3, metavar=('MIN', 'MAX', 'POINTS'),
+                          help="frequency grid of the equation curves")
+    features.add_argument('--order', type=int, default=1, help="neighbours compared on each side")
+    features.add_argument('--drop', type=float, default=3.0, help="bandwidth level below the peak in dB")
+    features.add_argument('--csv', default='features.csv', help="CSV file to write")
+    features.add_argument('--annotate', metavar='DIR', help="write a plot of each source with its features to DIR")
+    features.add_argument('-p', '--processes', type=int, default=None, help="number of worker processes")
+
+    report = commands.add_parser('report', help="compare a directory of exports with their models (see batchReport.py)")
+    report.add_argument('directory', help="directory of exports")
+    report.add_argument('--mapping', metavar='FILE',
+                        help="JSON or TOML file mapping file name patterns to models (default: DIRECTORY/models.json)")
+    report.add_argument('--output', default='report', help="directory for the summary and thumbnails")
+    report.add_argument('--starts', type=int, default=4, help="starting points of the V_o and H fits")
+    report.add_argument('--order', type=int, default=1, help="neighbours compared on each side for S2 nulls")
+    report.add_argument('--force', action='store_true', help="compare every file again, not only changed ones")
+    report.add_argument('-p', '--processes', type=int, default=None, help="number of worker processes")
+    return parser
+
+
+def args_to_job(args):
+    """
+    Turns parsed plot/load/export arguments into a batchRender plot job.
+
+    Parameters:
+        args (argparse.Namespace): Parsed arguments.
+
+    Returns:
+        dict: The plot job.
+    """
+    sources = getattr(args, 'sources', None) or []
+    if not sources:
+        raise SystemExit("error: give at least one --text, --spectrum, --equation or --simulation source")
+    for source, label in zip(sources, args.label):
+        source['label'] = label
+
+    job = {'kind': args.kind, 'scale': args.scale, 'sources': sources}
+    if getattr(args, 'log_x', False):
+        job['log_x'] = True
+    if getattr(args, 'xlim', None):
+        job['x_range'] = args.xlim
+    if getattr(args, 'ylim', None):
+        job['y_range'] = args.ylim
+    if getattr(args, 'title', None):
+        job['title'] = args.title
+    if getattr(args, 'output', None):
+        job['output'] = args.output
+        job['dpi'] = args.dpi if hasattr(args, 'dpi') else 100
+    return job
+
+
+def cmd_plot(args):
+    job = args_to_job(args)
+    if args.output:
+        from batchRender import print_render_report, render_job
+
+        result = render_job(job)
+        print_render_report([result], result['seconds'])
+        return 0 if result['error'] is None else 1
+
+    import matplotlib.pyplot as plt
+    from batchRender import draw_job, job_curves
+    from stageTrace import stage
+
+    curves = job_curves(job)
+    with stage('render'):
+        fig = plt.figure(figsize=(10, 6))
+        draw_job(fig.gca(), job, curves)
+    with stage('show'):
+        plt.show()
+    return 0
+
+
+def cmd_load(args):
+    from batchRender import job_curves
+
+    for curve in job_curves(args_to_job(args)):
+        x = curve['x']
+        print(f"{curve['label']}: {len(x)} points, x from {x.min():.6g} to {x.max():.6g}")
+    return 0
+
+
+def cmd_export(args):
+    import csv
+
+    from batchRender import job_curves
+
+    job = args_to_job(args)
+    curves = job_curves(job)
+    with open(args.output, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['label', 'x', 'y'])
+        for curve in curves:
+            for x, y in zip(curve['x'].tolist(), curve['y'].tolist()):
+                writer.writerow([curve['label'], repr(x), repr(y)])
+    print(f"Wrote {sum(len(curve['x']) for curve in curves)} rows to '{args.output}'.")
+    return 0
+
+
+def cmd_render(args):
+    import json
+
+    from batchRender import print_render_report, render_jobs
+
+    with open(args.spec, 'r') as f:
+        jobs = json.load(f)
+    start = time.perf_counter()
+    results = render_jobs(jobs, args.processes)
+    print_render_report(results, time.perf_counter() - start)
+    return 0 if all(result['error'] is None for result in results) else 1
+
+
+def cmd_spec(args):
+    from batchRender import print_render_report
+    from plotSpec import load_spec, run_spec
+
+    results, wall_seconds = run_spec(load_spec(args.spec), args.processes)
+    if results:
+        print_render_report(results, wall_seconds)
+    return 0 if all(result['error'] is None for result in results) else 1
+
+
+def cmd_fit(args):
+    from fitParameters import run_fit
+
+    run_fit(args)
+    return 0
+
+
+def cmd_features(args):
+    from spectralFeatures import run_features
+
+    results = run_features(args)
+    return 0 if all(result['error'] is None for result in results) else 1
+
+
+def cmd_report(args):
+    from batchReport import run_report
+
+    rows = run_report(args)
+    return 0 if all(row['status'] == 'ok' for row in rows) else 1
+
+
+COMMANDS = {'plot': cmd_plot, 'load': cmd_load, 'export': cmd_export, 'render': cmd_render,
+            'spec': cmd_spec, 'fit': cmd_fit, 'features': cmd_features, 'report': cmd_report}
+
+
+def report_startup_time():
+    """
+    Prints the time from _START to dispatch and to exit, and the heavy modules that were
+    imported. Interpreter start-up happens before _START and is not included, so this
+    is not the process wall time STARTUP_BUDGET_MS applies to.
+    """
+    end = time.perf_counter()
+    dispatch_ms = ((_dispatched or end) - _START) * 1000
+    total_ms = (end - _START) * 1000
+    loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+    print(f"[INFO] {dispatch_ms:.1f} ms to dispatch and {total_ms:.1f} ms to exit after the interpreter "
+          f"started (see benchSuite.py --cli-startup for the whole process); "
+          f"heavy modules imported: {', '.join(loaded) if loaded else 'none'}", file=sys.stderr)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if '--startup-time' in argv:
+        # Registered before parsing so --help (which exits inside argparse) is measured too
+        import atexit
+        atexit.register(report_startup_time)
+    args = build_parser().parse_args(argv)
+    if args.trace or args.trace_memory:
+        from stageTrace import enable
+        enable(args.trace or 'trace.json', memory=args.trace_memory)
+    global _dispatched
+    _dispatched = time.perf_counter()
+    return COMMANDS[args.command](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,102 +1,37 @@
 import numpy as np
-import matplotlib.pyplot as plt
+from backgroundLoader import BackgroundLoader, wait_for_file
+from figureManager import FigureManager
+from compareTheory import batch_error_metrics, print_error_table
+from plotCore import (V_O_REGION_EDGES, Pipeline, V_o_theoretical, get_existing_path, get_range, get_yes_no,
+                      load_time_export)
+from sessionStore import SessionStore, choose_preset, save_preset
+from stageTrace import stage
 
-# Global saved settings
-saved_x_min = None
-saved_x_max = None
-saved_y_min = None
-saved_y_max = None
 
-
-def load_text_file_data(filename):
-    """
-    Loads convolution output data from a text file.
-
-    Parameters:
-        filename (str): Path to the text file containing time and V_o(t) data.
-
-    Returns:
-        np.ndarray: Array of time values.
-        np.ndarray: Array of V_o(t) values.
-    """
-    times = []
-    V_o = []
-    with open(filename, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith("time"):
-                continue
-            parts = line.split()
-            if len(parts) < 2:
-                print(f"Warning: Skipping invalid data line: {line}")
-                continue
-            try:
-                time = float(parts[0])
-                value = float(parts[1])
-            except ValueError:
-                print(f"Warning: Skipping invalid data line: {line}")
-                continue
-            times.append(time)
-            V_o.append(value)
-    return np.array(times), np.array(V_o)
+# Line style of the theoretical curves, thicker and dashed to stand out from the measured ones
+THEORY_STYLE = {'linewidth': 2.5, 'linestyle': '--'}
 
 
-def V_o_theoretical(t):
+def main(theory_style=THEORY_STYLE):
     """
-    Computes the theoretical convolution output V_o(t) based on the piecewise equation.
+    Interactive convolution output plotting tool. plotConvolutionOutput.py runs it with
+    the plain line style it had.
 
     Parameters:
-        t (np.ndarray): Array of time values.
-
-    Returns:
-        np.ndarray: Array of V_o(t) values.
+        theory_style (dict): Line2D properties of the theoretical curves.
     """
-    V_o = np.zeros_like(t)
-
-    # Condition 1: t < 0
-    mask1 = t < 0
-    V_o[mask1] = 0
-
-    # Condition 2: 0 < t < 1 ms
-    mask2 = (t >= 0) & (t < 1e-3)
-    V_o[mask2] = 0.5 * np.exp(-10000 * t[mask2])
-
-    # Condition 3: 1 ms ≤ t < 2 ms
-    mask3 = (t >= 1e-3) & (t < 2e-3)
-    V_o[mask3] = 0.5 * np.exp(-10000 * (t[mask3] - 1e-3)) + 0.5 * np.exp(-10000 * t[mask3])
-
-    # Condition 4: t ≥ 2 ms
-    mask4 = t >= 2e-3
-    V_o[mask4] = 0.5 * np.exp(-10000 * t[mask4]) * (1 + np.exp(10)) - np.exp(-10000 * (t[mask4] - 2e-3))
-
-    return V_o
-
-
-def get_yes_no(prompt):
-    """
-    Utility function to get a yes/no response from the user.
-
-    Parameters:
-        prompt (str): The prompt message to display.
-
-    Returns:
-        str: 'y' for yes or 'n' for no.
-    """
-    while True:
-        response = input(prompt).strip().lower()
-        if response in ['y', 'n']:
-            return response
-        else:
-            print("Invalid input. Please enter 'y' or 'n'.")
-
-
-def main():
-    global saved_x_min, saved_x_max, saved_y_min, saved_y_max
-
-    # Store loaded text file data in a list for reuse.
-    loaded_data_list = []
+    # Loaded data, axis presets and legend labels are kept on disk and restored on the next run
+    session = SessionStore('convolution')
+    session.print_summary()
+    loaded_data_list = session.datasets
+    # Figures and lines are kept and updated in place across plot-again iterations
+    figures = FigureManager()
+    # Files and equations are loaded on background threads while the prompts continue
+    loader = BackgroundLoader()
 
     while True:
+        # Files are parsed afresh each round, in case they changed on disk
+        loader.forget()
         try:
             num_graphs = int(input("How many convolution output graphs do you want to plot? "))
             if num_graphs <= 0:
@@ -124,9 +59,7 @@ def main():
                 any_text_file_used = True
                 # If text file data used before, prompt if user wants to reuse existing data
                 if len(loaded_data_list) > 0:
-                    print("\nYou have previously loaded text file data:")
-                    for idx, d in enumerate(loaded_data_list):
-                        print(f"{idx}: {d['filename']}")
+                    session.print_datasets()
                     reuse_choice = get_yes_no("Do you want to reuse previously loaded data? [y/n]: ")
                     if reuse_choice == 'y':
                         while True:
@@ -142,7 +75,8 @@ def main():
                         plot_sources.append({'type': 'text', 'data_index': chosen_idx})
                         equation_time_specs.append(None)
                         # Assign label
-                        default_label = loaded_data_list[chosen_idx]['filename']
+                        dataset_name = loaded_data_list[chosen_idx]['filename']
+                        default_label = session.label_for(dataset_name, dataset_name)
                         assign_label = get_yes_no(
                             "Do you want to assign a custom name for the legend of this graph? [y/n]: ")
                         if assign_label == 'y':
@@ -150,35 +84,24 @@ def main():
                         else:
                             custom_label = default_label
                         plot_sources[-1]['label'] = custom_label
+                        session.remember_label(dataset_name, custom_label)
                         continue
 
-                # If not reusing:
-                while True:
-                    filename = input("Enter the text file name/path containing convolution output data: ").strip()
-                    try:
-                        times, V_o = load_text_file_data(filename)
-                        if len(times) == 0:
-                            print(f"No valid data found in '{filename}'. Please check the file and try again.")
-                            continue
-                        break
-                    except FileNotFoundError:
-                        print(f"File '{filename}' not found. Please enter a valid file name/path.")
-                    except Exception as e:
-                        print(f"An error occurred while loading the file: {e}")
-                        print("Please ensure the file is in the correct format and try again.")
-
-                loaded_data_list.append(
-                    {'filename': filename, 'times': times, 'V_o': V_o})
-                plot_sources.append({'type': 'text', 'data_index': len(loaded_data_list) - 1})
+                # If not reusing: parse in the background and keep asking questions
+                filename = get_existing_path("Enter the text file name/path containing convolution output data: ")
+                plot_sources.append({'type': 'text', 'filename': filename,
+                                     'pending': loader.submit(load_time_export, filename)})
                 equation_time_specs.append(None)
                 # Assign label
-                default_label = filename
+                dataset_name = filename
+                default_label = session.label_for(dataset_name, dataset_name)
                 assign_label = get_yes_no("Do you want to assign a custom name for the legend of this graph? [y/n]: ")
                 if assign_label == 'y':
                     custom_label = input("Enter legend name: ").strip()
                 else:
                     custom_label = default_label
                 plot_sources[-1]['label'] = custom_label
+                session.remember_label(dataset_name, custom_label)
 
             else:
                 # Equation based
@@ -206,6 +129,9 @@ def main():
                         'num_points': num_points,
                         'custom': True
                     }
+                    # The grid is fixed, so the equation can be evaluated right away
+                    eq_params['pending'] = loader.submit(Pipeline(
+                        {'type': 'equation', 'model': 'V_o', 'range': (t_min, t_max_user, num_points)}).evaluate)
                 else:
                     eq_params = {
                         't_min': -1e-3,  # Start a bit before zero to capture t < 0
@@ -224,6 +150,14 @@ def main():
                     custom_label = default_label
                 plot_sources[-1]['label'] = custom_label
 
+        # Without text files, default equation grids are final as well
+        if not any_text_file_used:
+            for eqp in equation_time_specs:
+                if eqp is not None and 'pending' not in eqp:
+                    eqp['pending'] = loader.submit(Pipeline(
+                        {'type': 'equation', 'model': 'V_o',
+                         'range': (eqp['t_min'], eqp['t_max_user'], eqp['num_points'])}).evaluate)
+
         # If multiple graphs are requested, ask if combined plot
         combined_plot = False
         if num_graphs > 1:
@@ -231,92 +165,20 @@ def main():
             if combine_choice == 'y':
                 combined_plot = True
 
-        # Before asking for new ranges, check if we have saved ranges
-        current_x_min, current_x_max = saved_x_min, saved_x_max
-        current_y_min, current_y_max = saved_y_min, saved_y_max
-
-        # If we have saved settings, ask if user wants to use them
-        if (saved_x_min is not None or saved_x_max is not None or
-                saved_y_min is not None or saved_y_max is not None):
-            use_saved = get_yes_no("\nDo you want to use previously saved x/y axis ranges? [y/n]: ")
-            if use_saved == 'y':
-                # Use the saved settings
-                x_min, x_max = saved_x_min, saved_x_max
-                y_min, y_max = saved_y_min, saved_y_max
-            else:
-                # Ask new ranges as usual
-                specify_yrange = get_yes_no("Do you want to specify vertical (V_o(t)) axis range? [y/n]: ")
-                if specify_yrange == 'y':
-                    while True:
-                        try:
-                            y_min = float(input("Enter minimum y-axis value: "))
-                            y_max = float(input("Enter maximum y-axis value: "))
-                            if y_max <= y_min:
-                                print("Maximum y-axis value must be greater than minimum y-axis value.")
-                                continue
-                            break
-                        except ValueError:
-                            print("Invalid input. Please enter numerical values for y-axis range.")
-                else:
-                    y_min = None
-                    y_max = None
-
-                specify_xrange = get_yes_no("Do you want to specify horizontal (time) axis range? [y/n]: ")
-                if specify_xrange == 'y':
-                    while True:
-                        try:
-                            x_min = float(input("Enter minimum x-axis value (s): "))
-                            x_max = float(input("Enter maximum x-axis value (s): "))
-                            if x_max <= x_min:
-                                print("Maximum x-axis value must be greater than minimum x-axis value.")
-                                continue
-                            break
-                        except ValueError:
-                            print("Invalid input. Please enter numerical values for x-axis range.")
-                else:
-                    x_min = None
-                    x_max = None
-
+        # If we have saved axis presets, ask if user wants to use one
+        preset = choose_preset(session, "\nDo you want to use previously saved x/y axis ranges? [y/n]: ")
+        if preset is not None:
+            x_min, x_max, y_min, y_max = preset
         else:
-            # No saved settings, proceed as usual
-            specify_yrange = get_yes_no("\nDo you want to specify vertical (V_o(t)) axis range? [y/n]: ")
-            if specify_yrange == 'y':
-                while True:
-                    try:
-                        y_min = float(input("Enter minimum y-axis value: "))
-                        y_max = float(input("Enter maximum y-axis value: "))
-                        if y_max <= y_min:
-                            print("Maximum y-axis value must be greater than minimum y-axis value.")
-                            continue
-                        break
-                    except ValueError:
-                        print("Invalid input. Please enter numerical values for y-axis range.")
-            else:
-                y_min = None
-                y_max = None
-
-            specify_xrange = get_yes_no("Do you want to specify horizontal (time) axis range? [y/n]: ")
-            if specify_xrange == 'y':
-                while True:
-                    try:
-                        x_min = float(input("Enter minimum x-axis value (s): "))
-                        x_max = float(input("Enter maximum x-axis value (s): "))
-                        if x_max <= x_min:
-                            print("Maximum x-axis value must be greater than minimum x-axis value.")
-                            continue
-                        break
-                    except ValueError:
-                        print("Invalid input. Please enter numerical values for x-axis range.")
-            else:
-                x_min = None
-                x_max = None
+            # No saved settings used, proceed as usual
+            y_min, y_max = get_range("\nDo you want to specify vertical (V_o(t)) axis range? [y/n]: ", "y-axis")
+            x_min, x_max = get_range("Do you want to specify horizontal (time) axis range? [y/n]: ", "x-axis", "s")
 
         # After setting ranges, ask if user wants to save these settings
         if (x_min is not None or x_max is not None or y_min is not None or y_max is not None):
             save_settings = get_yes_no("\nDo you want to save these x/y axis settings for future plotting? [y/n]: ")
             if save_settings == 'y':
-                saved_x_min, saved_x_max = x_min, x_max
-                saved_y_min, saved_y_max = y_min, y_max
+                save_preset(session, x_min, x_max, y_min, y_max)
             else:
                 # Do not change saved settings
                 pass
@@ -324,6 +186,14 @@ def main():
             # If no range set, no prompt needed to save
             pass
 
+        # Files parsed in the background are needed from here on
+        for ps in plot_sources:
+            if 'pending' in ps:
+                filename, (times, V_o) = wait_for_file(
+                    loader, ps.pop('pending'), ps['filename'], load_time_export,
+                    "Enter the text file name/path containing convolution output data: ")
+                ps['data_index'] = session.add_dataset({'filename': filename, 'times': times, 'V_o': V_o})
+
         # Step 2: Determine time range from text files if any
         if any_text_file_used:
             max_time = 0.0
@@ -342,6 +212,7 @@ def main():
                 text_min_time = text_times.min()
                 text_num_points = len(text_times)
             else:
+                text_times = None
                 text_num_points = 1000
                 text_min_time = 0.0
         else:
@@ -362,16 +233,20 @@ def main():
                     eqp['t_min'] = text_min_time
                     eqp['t_max_user'] = max_time
                     eqp['num_points'] = text_num_points
+                    # Evaluate at the measured (variable-step) sample times instead of a linspace
+                    eqp['times'] = text_times
                     print(
                         "\n[INFO] Since you did not specify parameters for the theoretical convolution output and text file data is present,")
                     print("the following parameters have been adjusted to match the text file data:")
                     print(f"  Minimum Time: {eqp['t_min']} s")
                     print(f"  Maximum Time: {eqp['t_max_user']} s")
-                    print(f"  Number of Points: {eqp['num_points']}\n")
+                    print(f"  Number of Points: {eqp['num_points']}")
+                    print("  Sample Times: taken directly from the text file\n")
 
-        # Prepare plotting
-        if combined_plot:
-            plt.figure(figsize=(10, 6))
+        # Prepare plotting: x and y limits are applied only if both ends are specified
+        xlim = [x_min, x_max] if x_min is not None and x_max is not None else None
+        ylim = [y_min, y_max] if y_min is not None and y_max is not None else None
+        figures.begin()
 
         # Step 4: Plot each graph
         for i, (ps, eqp) in enumerate(zip(plot_sources, equation_time_specs)):
@@ -380,27 +255,27 @@ def main():
                 final_max_time = eqp['t_max_user']
                 final_num_points = eqp['num_points']
 
-                t = np.linspace(t_min, final_max_time, final_num_points)
-                V_o = V_o_theoretical(t)
+                if 'pending' in eqp:
+                    # Evaluated in the background during the prompts
+                    trace = loader.wait(eqp.pop('pending'), f"Theoretical V_o(t) {i + 1}")
+                    t, V_o = trace['x'], trace['y']
+                else:
+                    if eqp.get('times') is not None:
+                        t = eqp['times']
+                    else:
+                        t = np.linspace(t_min, final_max_time, final_num_points)
+                    with stage('compute', f"Theoretical V_o(t) {i + 1}", input_bytes=t.nbytes):
+                        V_o = V_o_theoretical(t)
 
                 label_str = ps.get('label', f"Theoretical V_o(t) {i + 1}")
 
-                if combined_plot:
-                    plt.plot(t, V_o, label=label_str, linewidth=2.5, linestyle='--')  # **Thicker and Dashed Line**
-                else:
-                    plt.figure(figsize=(10, 6))
-                    plt.plot(t, V_o, label=label_str, linewidth=2.5, linestyle='--')  # **Thicker and Dashed Line**
-                    # Apply x and y limits if specified
-                    if x_min is not None and x_max is not None:
-                        plt.xlim([x_min, x_max])
-                    if y_min is not None and y_max is not None:
-                        plt.ylim([y_min, y_max])
-                    plt.xlabel("Time (s)")
-                    plt.ylabel("Vₒ(t) [V]")
-                    plt.title("Theoretical Convolution Output: Vₒ(t)")
-                    plt.grid(True, which="both", ls="--")
-                    plt.legend()
-                    plt.show()
+                with stage('render', label_str):
+                    if combined_plot:
+                        figures.set_line('combined', ('equation', i), t, V_o, label=label_str, **theory_style)
+                    else:
+                        figures.set_line(('single', i), ('equation', i), t, V_o, label=label_str, **theory_style)
+                        figures.finish(('single', i), "Time (s)", "Vₒ(t) [V]",
+                                       "Theoretical Convolution Output: Vₒ(t)", xlim=xlim, ylim=ylim)
 
             elif ps['type'] == 'text':
                 data_idx = ps['data_index']
@@ -409,43 +284,43 @@ def main():
 
                 label_str = ps.get('label', loaded_data_list[data_idx]['filename'])
 
-                if combined_plot:
-                    plt.plot(times, V_o, label=label_str)
-                else:
-                    plt.figure(figsize=(10, 6))
-                    plt.plot(times, V_o, label=label_str)
-                    # Apply x and y limits if specified
-                    if x_min is not None and x_max is not None:
-                        plt.xlim([x_min, x_max])
-                    if y_min is not None and y_max is not None:
-                        plt.ylim([y_min, y_max])
-                    plt.xlabel("Time (s)")
-                    plt.ylabel("Vₒ(t) [V]")
-                    plt.title("Convolution Output from Simulation Data")
-                    plt.grid(True, which="both", ls="--")
-                    plt.legend()
-                    plt.show()
+                with stage('render', label_str):
+                    if combined_plot:
+                        figures.set_line('combined', ('text', i), times, V_o, label=label_str)
+                    else:
+                        figures.set_line(('single', i), ('text', i), times, V_o, label=label_str)
+                        figures.finish(('single', i), "Time (s)", "Vₒ(t) [V]",
+                                       "Convolution Output from Simulation Data", xlim=xlim, ylim=ylim)
 
         if combined_plot:
             # **Apply styles only to theoretical graphs**
-            # Since plt.plot was called earlier with styles for theoretical graphs,
-            # and default styles for text graphs, no additional styling is needed here.
-
-            if x_min is not None and x_max is not None:
-                plt.xlim([x_min, x_max])
-            if y_min is not None and y_max is not None:
-                plt.ylim([y_min, y_max])
-            plt.xlabel("Time (s)")
-            plt.ylabel("Vₒ(t) [V]")
-            plt.title("Combined Convolution Output Plots")
-            plt.grid(True, which="both", ls="--")
-            plt.legend()
-            plt.show()
+            # Styles were passed to set_line for theoretical graphs and default styles
+            # for text graphs, so no additional styling is needed here.
+            with stage('render', 'combined'):
+                figures.finish('combined', "Time (s)", "Vₒ(t) [V]",
+                               "Combined Convolution Output Plots", xlim=xlim, ylim=ylim)
+        with stage('show'):
+            figures.show()
+
+        # Step 5: Report how far each simulation trace is from the theoretical V_o(t)
+        if any_text_file_used and any(ps['type'] == 'equation' for ps in plot_sources):
+            error_labels = []
+            error_pairs = []
+            for ps in plot_sources:
+                if ps['type'] == 'text':
+                    data = loaded_data_list[ps['data_index']]
+                    error_labels.append(ps['label'])
+                    error_pairs.append((data['times'], data['V_o'], V_o_theoretical(data['times'])))
+            metrics = batch_error_metrics(error_pairs, V_O_REGION_EDGES)
+            print("\n[INFO] Error of simulation data against theoretical V_o(t), evaluated at the measured sample times:")
+            print_error_table(error_labels, metrics, unit="V")
 
         # After plotting, ask user if they want to continue
         cont_choice = get_yes_no("\nDo you want to plot again? [y/n]: ")
         if cont_choice != 'y':
             print("Exiting the plotting tool. Goodbye!")
+            loader.close()
+            figures.show_and_close()
             break
 
 
@@ -0,0 +1,652 @@
+import ast
+import os
+from types import SimpleNamespace
+
+import numpy as np
+
+from normalizeTraces import normalize_traces
+from spectrumAnalysis import (check_sorted, compute_spectrum, export_lines, load_time_series, open_export,
+                              zoom_spectrum)
+from stageTrace import stage, traced
+
+# Source types and transforms by name, filled in by register_source and register_transform
+SOURCE_TYPES = {}
+TRANSFORMS = {}
+
+# Grid of an equation or simulation given neither a range nor a source to follow: (min, max, points)
+DEFAULT_GRIDS = {
+    'S2': (1e-3, 1e4, 1000),
+    'pulse': (1e-3, 10.0, 1000),
+    'V_o': (-1e-3, 5e-3, 1000),
+    'H': (0.0, 5e-3, 1000),
+    'convolution': (0.0, 3e-3, 3000),
+    'expression': (0.0, 10.0, 1000),
+}
+
+
+@traced('parse')
+def load_fft_export(filename, step=0):
+    """
+    Loads an LTspice FFT/AC export of the form freq<TAB>(mag dB,phase°).
+
+    Header lines are skipped, and malformed lines with a warning. Of a .step export
+    only one run is read (see spectrumAnalysis.export_lines).
+
+    Parameters:
+        filename (str): Path to the text file; a gzip, bzip2 or xz compressed file is
+            decompressed while reading.
+        step (int): Index of the .step run to read.
+
+    Returns:
+        np.ndarray: Frequencies in Hz.
+        np.ndarray: Magnitudes in dB.
+        np.ndarray: Phases in degrees.
+    """
+    freqs = []
+    mags_dB = []
+    phases_deg = []
+    with open_export(filename) as f:
+        for line in export_lines(f, filename, step):
+            if line.startswith("Freq"):
+                continue
+            parts = line.split()
+            if len(parts) < 2 or ',' not in parts[1]:
+                print(f"Warning: Skipping invalid data line: {line}")
+                continue
+            data_str = parts[1].strip("()")
+
+            mag_str, phase_str = data_str.split(',', 1)
+
+            # Remove 'dB'
+            mag_str = mag_str.replace('dB', '')
+            # Remove degree symbol '°' and '∞' if present
+            phase_str = phase_str.replace('°', '')
+            phase_str = phase_str.replace('∞', '')
+
+            try:
+                freq = float(parts[0])
+                mag_dB = float(mag_str)
+                phase_deg = float(phase_str)
+            except ValueError:
+                print(f"Warning: Skipping invalid data line: {line}")
+                continue
+
+            freqs.append(freq)
+            mags_dB.append(mag_dB)
+            phases_deg.append(phase_deg)
+
+    freqs = np.array(freqs)
+    check_sorted(freqs, None, filename)
+    return freqs, np.array(mags_dB), np.array(phases_deg)
+
+
+# Time/value exports (transient, convolution output, impulse response) share one parser
+load_time_export = load_time_series
+
+
+def S2_equation(omega, m=0.001):
+    """
+    S_2(ω) = [(sin(2mω) - 0.5 sin(mω)) / ω] + j[(cos(2mω) - 0.5 cos(mω) - 0.5) / ω].
+
+    Parameters:
+        omega (np.ndarray): Angular frequencies in rad/s; ω = 0 is replaced by a tiny epsilon.
+        m (float): Pulse width in seconds.
+
+    Returns:
+        np.ndarray: Complex spectrum.
+    """
+    epsilon = 1e-15
+    denom = np.where(omega == 0, epsilon, omega)
+    real_part = (np.sin(2 * m * omega) - 0.5 * np.sin(m * omega)) / denom
+    imag_part = (np.cos(2 * m * omega) - 0.5 * np.cos(m * omega) - 0.5) / denom
+    return real_part + 1j * imag_part
+
+
+def pulse_equation(omega):
+    """
+    Spectrum of a unit pulse, sin(ω)/ω + j(cos(ω) - 1)/ω, with its limit 1 at ω = 0.
+
+    Parameters:
+        omega (np.ndarray): Angular frequencies in rad/s.
+
+    Returns:
+        np.ndarray: Complex spectrum.
+    """
+    omega = np.asarray(omega, dtype=float)
+    nonzero = omega != 0
+    denom = np.where(nonzero, omega, 1.0)
+    real_part = np.where(nonzero, np.sin(omega) / denom, 1.0)
+    imag_part = np.where(nonzero, (np.cos(omega) - 1) / denom, 0.0)
+    return real_part + 1j * imag_part
+
+
+def V_o_theoretical(t, rate=10000.0, m=1e-3):
+    """
+    Computes the theoretical convolution output V_o(t) based on the piecewise equation.
+
+    Parameters:
+        t (np.ndarray): Array of time values.
+        rate (float): Decay rate R/L of H(t) in 1/s.
+        m (float): Width of each step of the input pulse in seconds.
+
+    Returns:
+        np.ndarray: Array of V_o(t) values.
+    """
+    V_o = np.zeros_like(t)
+
+    # Condition 1: t < 0
+    mask1 = t < 0
+    V_o[mask1] = 0
+
+    # Condition 2: 0 < t < m
+    mask2 = (t >= 0) & (t < m)
+    V_o[mask2] = 0.5 * np.exp(-rate * t[mask2])
+
+    # Condition 3: m ≤ t < 2m
+    mask3 = (t >= m) & (t < 2 * m)
+    V_o[mask3] = 0.5 * np.exp(-rate * (t[mask3] - m)) + 0.5 * np.exp(-rate * t[mask3])
+
+    # Condition 4: t ≥ 2m; 0.5 e^{-rate t} (1 + e^{rate m}) with each exponent kept <= 0
+    mask4 = t >= 2 * m
+    t4 = t[mask4]
+    V_o[mask4] = 0.5 * np.exp(-rate * t4) + 0.5 * np.exp(-rate * (t4 - m)) - np.exp(-rate * (t4 - 2 * m))
+
+    return V_o
+
+
+# Breakpoints of the piecewise V_o(t) equation (default m), used to report the error per region
+V_O_REGION_EDGES = [0.0, 1e-3, 2e-3]
+
+
+def H_theoretical(t, rate=10000.0):
+    """
+    Computes the theoretical impulse response H(t) = δ(t) - (R/L)e^{-(R/L)t}u(t).
+
+    Parameters:
+        t (np.ndarray): Array of time values, starting at t = 0.
+        rate (float): R/L in 1/s.
+
+    Returns:
+        np.ndarray: Array of H(t) values.
+    """
+    H_t = np.zeros_like(t)
+    # H(t=0) = delta(t) - R/L, with the delta taken as 1
+    H_t[0] = 1 - rate
+    # For t > 0, H(t) = -(R/L) * e^{-(R/L)t}
+    H_t[1:] = -rate * np.exp(-rate * t[1:])
+    return H_t
+
+
+def input_signal(t):
+    """
+    The input S(t) of the convolution: 0.5 for 0 < t < 1 ms, 1 for 1 ms ≤ t < 2 ms, else 0.
+
+    Parameters:
+        t (np.ndarray): Array of time values.
+
+    Returns:
+        np.ndarray: Array of S(t) values.
+    """
+    S = np.zeros_like(t)
+    S[(t > 0) & (t < 1e-3)] = 0.5
+    S[(t >= 1e-3) & (t < 2e-3)] = 1.0
+    return S
+
+
+def simulate_convolution(t, R=100.0, L=1e-3):
+    """
+    Simulates V_o = S * H by discrete convolution, with the delta in H(t) taken as 1/dt.
+
+    Parameters:
+        t (np.ndarray): Uniform time grid starting at t = 0.
+        R (float): Resistance in ohms.
+        L (float): Inductance in henries.
+
+    Returns:
+        np.ndarray: V_o(t) samples.
+    """
+    dt = t[1] - t[0]
+    H = np.zeros_like(t)
+    H[0] = 1.0 / dt
+    positive = t > 0
+    H[positive] -= (R / L) * np.exp(-(R / L) * t[positive])
+    return (np.convolve(input_signal(t), H, mode='full') * dt)[:len(t)]
+
+
+def convolution_integral(t, S_values, R=100.0, L=1e-3, t_stop=2e-3):
+    """
+    Evaluates V_o(t) = S(t) - (R/L) * Integral_0^{min(t, t_stop)} S(τ) e^{-(R/L)(t-τ)} dτ, the
+    convolution of S with H(t) = δ(t) - (R/L)e^{-(R/L)t}u(t), at every sample at once.
+
+    The integral of each t is the trapezoidal rule over the samples below its upper limit,
+    as np.trapz over np.arange(0, upper, dt) gives. Since e^{-(R/L)(t-τ)} =
+    e^{-(R/L)t} e^{(R/L)τ}, all of them come from one cumulative sum over τ.
+
+    Parameters:
+        t (np.ndarray): Uniform time grid starting at t = 0.
+        S_values (np.ndarray): S(t) at the samples of t.
+        R (float): Resistance in ohms.
+        L (float): Inductance in henries.
+        t_stop (float): Time after which S is zero, the integral's upper limit.
+
+    Returns:
+        np.ndarray: V_o(t) samples.
+    """
+    t = np.asarray(t, dtype=float)
+    S_values = np.asarray(S_values, dtype=float)
+    rate = R / L
+    dt = t[1] - t[0]
+
+    # Number of τ samples in np.arange(0, min(t, t_stop), dt) for every t
+    counts = np.ceil(np.minimum(t, t_stop) / dt).astype(np.int64)
+    np.clip(counts, 0, len(t), out=counts)
+    # Exponents are taken relative to the last τ sample used, so they stay bounded
+    t_ref = t[max(counts.max() - 1, 0)]
+    g = S_values * np.exp(rate * (t - t_ref))
+    cumulative = np.concatenate(([0.0], np.cumsum(g)))
+
+    last = np.maximum(counts - 1, 0)
+    trapezoid = dt * (cumulative[counts] - 0.5 * (g[0] + g[last]))
+    trapezoid[counts < 2] = 0.0
+    return S_values - rate * np.exp(-rate * (t - t_ref)) * trapezoid
+
+
+# Equation models: name -> (function, True if it is a complex spectrum taking ω = 2πf)
+EQUATION_MODELS = {
+    'S2': (S2_equation, True),
+    'pulse': (pulse_equation, True),
+    'V_o': (V_o_theoretical, False),
+    'H': (H_theoretical, False),
+}
+
+# numpy names an 'expression' equation may use, as np.<name> or bare. Expressions come from
+# spec and job files, so nothing else is reachable: no builtins, no other numpy function
+# (np.save, np.load, ...) and of array attributes only EXPRESSION_ATTRIBUTES (not x.tofile)
+EXPRESSION_NAMES = ['pi', 'e', 'inf', 'nan', 'sin', 'cos', 'tan', 'arcsin', 'arccos', 'arctan', 'arctan2',
+                    'sinh', 'cosh', 'tanh', 'exp', 'expm1', 'log', 'log10', 'log2', 'log1p', 'sqrt', 'square',
+                    'power', 'abs', 'absolute', 'sign', 'floor', 'ceil', 'round', 'real', 'imag', 'conj',
+                    'angle', 'hypot', 'maximum', 'minimum', 'clip', 'where', 'heaviside', 'sinc', 'i0',
+                    'cumsum', 'diff', 'ones_like', 'zeros_like', 'full_like']
+EXPRESSION_ATTRIBUTES = ['real', 'imag', 'T', 'size', 'shape']
+_EXPRESSION_FUNCTIONS = {name: getattr(np, name) for name in EXPRESSION_NAMES}
+
+
+def evaluate_expression(expression, x):
+    """
+    Evaluates a numpy expression in x, e.g. 'np.sin(2*np.pi*x)', with only x and the
+    EXPRESSION_NAMES functions in scope.
+
+    Parameters:
+        expression (str): The expression.
+        x (np.ndarray): Values of x.
+
+    Returns:
+        The value of the expression.
+    """
+    namespace = dict(_EXPRESSION_FUNCTIONS, np=SimpleNamespace(**_EXPRESSION_FUNCTIONS), x=x)
+    tree = ast.parse(expression, mode='eval')
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Attribute):
+            on_numpy = isinstance(node.value, ast.Name) and node.value.id == 'np'
+            if node.attr not in (EXPRESSION_NAMES if on_numpy else EXPRESSION_ATTRIBUTES):
+                raise ValueError(f"'.{node.attr}' is not allowed in an expression.")
+        elif isinstance(node, ast.Name) and node.id not in namespace:
+            raise ValueError(f"Unknown name '{node.id}' in '{expression}'; use x and the numpy "
+                             "names in EXPRESSION_NAMES.")
+    return eval(compile(tree, '<expression>', 'eval'), {'__builtins__': {}}, namespace)
+
+
+# Simulations: name -> function of a uniform time grid and keyword parameters
+SIMULATIONS = {
+    'convolution': simulate_convolution,
+}
+
+
+def get_yes_no(prompt):
+    """
+    Utility function to get a yes/no response from the user.
+
+    Parameters:
+        prompt (str): The prompt message to display.
+
+    Returns:
+        str: 'y' for yes or 'n' for no.
+    """
+    while True:
+        response = input(prompt).strip().lower()
+        if response in ['y', 'n']:
+            return response
+        else:
+            print("Invalid input. Please enter 'y' or 'n'.")
+
+
+def get_range(prompt, axis_name, unit=None):
+    """
+    Asks whether to set a range and, if so, for a min/max pair.
+
+    Parameters:
+        prompt (str): Yes/no question asked first.
+        axis_name (str): Axis name used in the value prompts, e.g. 'x-axis'.
+        unit (str): Unit shown in the value prompts, or None.
+
+    Returns:
+        tuple: (min, max), or (None, None) if the user does not want to set a range.
+    """
+    if get_yes_no(prompt) != 'y':
+        return None, None
+    unit_str = f" ({unit})" if unit else ""
+    while True:
+        try:
+            v_min = float(input(f"Enter minimum {axis_name} value{unit_str}: "))
+            v_max = float(input(f"Enter maximum {axis_name} value{unit_str}: "))
+            if v_max <= v_min:
+                print(f"Maximum {axis_name} value must be greater than minimum {axis_name} value.")
+                continue
+            return v_min, v_max
+        except ValueError:
+            print(f"Invalid input. Please enter numerical values for {axis_name} range.")
+
+
+def get_existing_path(prompt):
+    """
+    Asks for a file path until one that exists is given. Only existence is checked,
+    so the file can be parsed in the background while the next prompts run.
+
+    Parameters:
+        prompt (str): The prompt message to display.
+
+    Returns:
+        str: The path.
+    """
+    while True:
+        filename = input(prompt).strip()
+        if os.path.isfile(filename):
+            return filename
+        print(f"File '{filename}' not found. Please enter a valid file name/path.")
+
+
+def register_source(name):
+    """
+    Decorator adding a source type. The function takes the source dict and the
+    evaluation cache and returns a trace: a dict with 'x', 'y' and 'domain' ('dB',
+    'linear' or None for signals that are not magnitudes), plus any extra arrays.
+    """
+    def decorate(func):
+        SOURCE_TYPES[name] = func
+        return func
+    return decorate
+
+
+def _grid(source, cache, default):
+    """x values of an equation or simulation: its 'x', 'range', 'grid' pipeline or a default."""
+    if source.get('x') is not None:
+        return np.asarray(source['x'], dtype=float)
+    if source.get('range') is not None:
+        lo, hi, num = source['range'][:3]
+        return np.linspace(lo, hi, int(num))
+    if source.get('grid') is not None:
+        # Follow another source's own x values, e.g. a text file's frequency points
+        return _evaluate(source['grid'], cache)['x']
+    return np.linspace(*default[:2], default[2])
+
+
+@register_source('text')
+def _text_source(source, cache):
+    """An LTspice export: 'format' 'fft' (the default) or 'time'; 'unit' 'dB' or 'linear' for FFTs."""
+    with stage('load', source['path']):
+        if source.get('format', 'fft') == 'fft':
+            freqs, mags, phases_deg = load_fft_export(source['path'])
+            return {'x': freqs, 'y': mags, 'domain': source.get('unit', 'dB'), 'phases_deg': phases_deg}
+        times, values = load_time_export(source['path'])
+        return {'x': times, 'y': values, 'domain': None}
+
+
+@register_source('raw')
+def _raw_source(source, cache):
+    """Arrays already in memory ('x', 'y'), or an .npz file holding 'x' and 'y'."""
+    if source.get('path') is not None:
+        with stage('load', source['path']):
+            with np.load(source['path']) as data:
+                x, y = data['x'], data['y']
+    else:
+        x, y = source['x'], source['y']
+    return {'x': np.asarray(x), 'y': np.asarray(y), 'domain': source.get('domain')}
+
+
+@register_source('equation')
+def _equation_source(source, cache):
+    """
+    A named model from EQUATION_MODELS, or a numpy 'expression' in x. Spectrum models
+    take x in Hz and are evaluated at ω = 2πx, unless 'omega' is true and x is ω itself.
+    """
+    if source.get('expression') is not None:
+        x = _grid(source, cache, DEFAULT_GRIDS['expression'])
+        with stage('compute', source['expression'], input_bytes=x.nbytes):
+            y = evaluate_expression(source['expression'], x)
+        return {'x': x, 'y': np.broadcast_to(np.asarray(y, dtype=float), x.shape).copy(), 'domain': None}
+
+    model = source['model']
+    if model not in EQUATION_MODELS:
+        raise ValueError(f"Unknown equation model '{model}'. Use one of {list(EQUATION_MODELS)}.")
+    func, is_spectrum = EQUATION_MODELS[model]
+    x = _grid(source, cache, DEFAULT_GRIDS[model])
+    params = source.get('params') or {}
+    with stage('compute', model, input_bytes=x.nbytes):
+        if is_spectrum:
+            omega = x if source.get('omega') else 2 * np.pi * x
+            return {'x': x, 'y': np.abs(func(omega, **params)), 'domain': 'linear'}
+        return {'x': x, 'y': func(x, **params), 'domain': None}
+
+
+@register_source('simulation')
+def _simulation_source(source, cache):
+    """
+    A simulation from SIMULATIONS, run on a uniform grid from 0 to the end of its x
+    values and interpolated onto them when they are not that grid.
+    """
+    model = source.get('model', 'convolution')
+    if model not in SIMULATIONS:
+        raise ValueError(f"Unknown simulation '{model}'. Use one of {list(SIMULATIONS)}.")
+    x = _grid(source, cache, DEFAULT_GRIDS[model])
+    t = np.linspace(0.0, x[-1], len(x))
+    with stage('compute', model, input_bytes=t.nbytes):
+        y = SIMULATIONS[model](t, **(source.get('params') or {}))
+        if not np.allclose(t, x, rtol=1e-9, atol=0.0):
+            y = np.interp(x, t, y, left=0.0)
+    return {'x': x, 'y': y, 'domain': None}
+
+
+def register_transform(name):
+    """
+    Decorator adding a transform. The function takes a trace and keyword parameters
+    and returns a new trace; it must not modify its input, which may be cached.
+    """
+    def decorate(func):
+        TRANSFORMS[name] = func
+        return func
+    return decorate
+
+
+@register_transform('spectrum')
+def _spectrum(trace, window='hann', segment_len=None):
+    """Spectrum of a time-domain trace (see spectrumAnalysis.compute_spectrum); keeps the samples for zoom."""
+    spectrum = compute_spectrum(trace['x'], trace['y'], window=window, segment_len=segment_len)
+    return {'x': spectrum['freqs'], 'y': spectrum['mags_dB'], 'domain': 'dB',
+            'phases_deg': spectrum['phases_deg'], 'times': trace['x'], 'values': trace['y'], 'window': window}
+
+
+@register_transform('zoom')
+def _zoom(trace, f_start, f_stop, num_points=2000):
+    """
+    Recomputes a 'spectrum' trace over one band with the chirp-Z transform. The full
+    spectrum's maximum is kept as 'reference', so normalization ignores the zoom.
+    """
+    zoom = zoom_spectrum(trace['times'], trace['values'], f_start, f_stop, num_points, trace.get('window', 'hann'))
+    return dict(trace, x=zoom['freqs'], y=zoom['mags_dB'], phases_deg=zoom['phases_deg'],
+                reference=trace.get('reference', trace['y'].max()))
+
+
+@register_transform('crop')
+def _crop(trace, x_min=None, x_max=None):
+    """Keeps the points with x_min <= x <= x_max."""
+    keep = np.ones(len(trace['x']), dtype=bool)
+    if x_min is not None:
+        keep &= trace['x'] >= x_min
+    if x_max is not None:
+        keep &= trace['x'] <= x_max
+    return dict(trace, x=trace['x'][keep], y=trace['y'][keep])
+
+
+@register_transform('to_dB')
+def _to_dB(trace):
+    """Converts a linear magnitude to dB."""
+    if trace['domain'] == 'dB':
+        return trace
+    return dict(trace, y=20 * np.log10(np.abs(trace['y']) + 1e-30), domain='dB')
+
+
+@register_transform('normalize')
+def _normalize(trace, scale='dB'):
+    """
+    Normalizes a magnitude to its maximum (or its 'reference') in the given scale.
+    Trailing normalize steps are batched across pipelines by evaluate_pipelines.
+    """
+    (y,), (zero,) = normalize_traces([trace['y']], trace['domain'] or 'linear', scale, [trace.get('reference')])
+    return dict(trace, y=y, domain=scale, zero_reference=zero)
+
+
+def source_key(source):
+    """
+    Hashable identity of a source for the evaluation cache. Arrays are identified by
+    object, pipelines by their own key; the legend label is ignored.
+    """
+    key = []
+    for name, value in sorted(source.items()):
+        if name == 'label':
+            continue
+        if isinstance(value, np.ndarray):
+            value = ('array', id(value))
+        elif isinstance(value, Pipeline):
+            value = value.key()
+        elif isinstance(value, dict):
+            value = tuple(sorted(value.items()))
+        elif isinstance(value, list):
+            value = tuple(value)
+        key.append((name, value))
+    return tuple(key)
+
+
+class Pipeline:
+    """
+    A source followed by a chain of transforms, evaluated lazily.
+
+    Building a pipeline does no work: then() returns a new pipeline with one more
+    step, so pipelines sharing a prefix can be composed freely. Evaluation goes
+    through a cache keyed by source and steps, so a file or an intermediate result
+    used by several pipelines is computed once.
+
+    Example:
+        Pipeline({'type': 'text', 'path': 'tran.txt', 'format': 'time'}).then('spectrum').then('normalize')
+    """
+    __slots__ = ('source', 'steps')
+
+    def __init__(self, source, steps=()):
+        if source.get('type') not in SOURCE_TYPES:
+            raise ValueError(f"Unknown source type '{source.get('type')}'. Use one of {list(SOURCE_TYPES)}.")
+        self.source = source
+        self.steps = tuple(steps)
+
+    def then(self, name, **params):
+        """
+        Appends a transform.
+
+        Parameters:
+            name (str): Transform name, one of TRANSFORMS.
+            **params: Transform parameters; they must be hashable.
+
+        Returns:
+            Pipeline: The extended pipeline (this one is unchanged).
+        """
+        if name not in TRANSFORMS:
+            raise ValueError(f"Unknown transform '{name}'. Use one of {list(TRANSFORMS)}.")
+        return Pipeline(self.source, self.steps + ((name, tuple(sorted(params.items()))),))
+
+    def key(self):
+        return source_key(self.source), self.steps
+
+    def parent(self):
+        """The pipeline without its last step."""
+        return Pipeline(self.source, self.steps[:-1])
+
+    def evaluate(self, cache=None):
+        """
+        Evaluates the pipeline.
+
+        Parameters:
+            cache (dict): Optional cache shared with other evaluations.
+
+        Returns:
+            dict: The trace ('x', 'y', 'domain', ...).
+        """
+        return evaluate_pipelines([self], cache)[0]
+
+    def __repr__(self):
+        steps = ''.join(f".then({name!r})" for name, _ in self.steps)
+        return f"Pipeline({self.source.get('type')!r}){steps}"
+
+
+def _evaluate(pipeline, cache):
+    key = pipeline.key()
+    if key in cache:
+        return cache[key]
+    if not pipeline.steps:
+        trace = SOURCE_TYPES[pipeline.source['type']](pipeline.source, cache)
+    else:
+        trace = _evaluate(pipeline.parent(), cache)
+        name, params = pipeline.steps[-1]
+        label = pipeline.source.get('path') or pipeline.source.get('model') or pipeline.source['type']
+        with stage('normalize' if name == 'normalize' else 'compute', f"{name}: {label}",
+                   input_bytes=trace['y'].nbytes):
+            trace = TRANSFORMS[name](trace, **dict(params))
+    cache[key] = trace
+    return trace
+
+
+def evaluate_pipelines(pipelines, cache=None):
+    """
+    Evaluates several pipelines through one cache.
+
+    Pipelines ending in a 'normalize' step with the same parameters are normalized
+    together in one normalize_traces call, which stacks equal-length traces.
+
+    Parameters:
+        pipelines (list of Pipeline): Pipelines to evaluate.
+        cache (dict): Optional cache shared with other evaluations.
+
+    Returns:
+        list of dict: One trace per pipeline, in input order.
+    """
+    if cache is None:
+        cache = {}
+
+    results = [None] * len(pipelines)
+    batches = {}
+    for i, pipeline in enumerate(pipelines):
+        if pipeline.steps and pipeline.steps[-1][0] == 'normalize' and pipeline.key() not in cache:
+            batches.setdefault(pipeline.steps[-1][1], {}).setdefault(pipeline.key(), []).append(i)
+        else:
+            results[i] = _evaluate(pipeline, cache)
+
+    for params, members in batches.items():
+        scale = dict(params).get('scale', 'dB')
+        keys = list(members)
+        traces = [_evaluate(pipelines[members[key][0]].parent(), cache) for key in keys]
+        with stage('normalize', f"{len(traces)} traces", input_bytes=sum(trace['y'].nbytes for trace in traces)):
+            ys, zero = normalize_traces([trace['y'] for trace in traces],
+                                        [trace['domain'] or 'linear' for trace in traces], scale,
+                                        [trace.get('reference') for trace in traces])
+        for key, trace, y, is_zero in zip(keys, traces, ys, zero):
+            cache[key] = dict(trace, y=y, domain=scale, zero_reference=is_zero)
+            for i in members[key]:
+                results[i] = cache[key]
+    return results
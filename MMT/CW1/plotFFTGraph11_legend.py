@@ -1,76 +1,71 @@
 import numpy as np
-import matplotlib.pyplot as plt
-
-# Global saved settings
-saved_x_min = None
-saved_x_max = None
-saved_y_min = None
-saved_y_max = None
-
-def load_text_file_data(filename):
-    freqs = []
-    mags_dB = []
-    phases_deg = []
-    with open(filename, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith("Freq"):
-                continue
-            parts = line.split()
-            freq = float(parts[0])
-            data_str = parts[1].strip("()")
-
-            mag_str, phase_str = data_str.split(',')
-
-            # Remove 'dB'
-            mag_str = mag_str.replace('dB', '')
-            # Remove degree symbol '°' and '∞' if present
-            phase_str = phase_str.replace('°', '')
-            phase_str = phase_str.replace('∞', '')
-
-            try:
-                mag_dB = float(mag_str)
-                phase_deg = float(phase_str)
-            except ValueError:
-                print(f"Warning: Skipping invalid data line: {line}")
-                continue
-
-            freqs.append(freq)
-            mags_dB.append(mag_dB)
-            phases_deg.append(phase_deg)
-
-    return np.array(freqs), np.array(mags_dB), np.array(phases_deg)
-
-
-def S2_equation(omega, m=0.001):
-    epsilon = 1e-15
-    denom = np.where(omega == 0, epsilon, omega)
-    real_part = (np.sin(2 * m * omega) - 0.5 * np.sin(m * omega)) / denom
-    imag_part = (np.cos(2 * m * omega) - 0.5 * np.cos(m * omega) - 0.5) / denom
-    return real_part + 1j * imag_part
-
-
-def convert_dB_to_linear(dB_val):
-    return 10 ** (dB_val / 20.0)
-
-
-def get_yes_no(prompt):
-    """Utility function to get a yes/no response."""
-    while True:
-        response = input(prompt).strip().lower()
-        if response in ['y', 'n']:
-            return response
-        else:
-            print("Invalid input. Please enter 'y' or 'n'.")
-
-
-def main():
-    global saved_x_min, saved_x_max, saved_y_min, saved_y_max
-
-    # Store loaded text file data in a list for reuse.
-    loaded_data_list = []
+from backgroundLoader import BackgroundLoader, wait_for_file
+from compareTheory import batch_error_metrics, print_error_table
+from figureManager import FigureManager
+from normalizeTraces import normalize_traces
+from plotCore import Pipeline, S2_equation, get_existing_path, get_range, get_yes_no, load_fft_export
+from resampleTransient import RESAMPLE_METHODS, print_resample_report, resample_uniform
+from sessionStore import SessionStore, choose_preset, save_preset
+from spectrumAnalysis import WINDOW_NAMES, compute_spectrum, is_uniform, load_time_series, zoom_spectrum
+from stageTrace import stage
+
+# Number of frequency points computed by the zoom spectrum over the chosen x-range
+ZOOM_POINTS = 2000
+
+
+def choose_label(session, dataset_name, default, ask):
+    """
+    Asks for a custom legend name, offering the one last used for the dataset.
+
+    Parameters:
+        session (SessionStore): The session remembering labels per dataset.
+        dataset_name (str): Dataset the label is remembered for, or None (equations).
+        default (str): Label used when no custom name is given.
+        ask (bool): False to use default without asking.
+
+    Returns:
+        str: The legend label.
+    """
+    if not ask:
+        return default
+    if dataset_name is not None:
+        default = session.label_for(dataset_name, default)
+    assign_label = get_yes_no("Do you want to assign a custom name for the legend of this graph? [y/n]: ")
+    label = input("Enter legend name: ").strip() if assign_label == 'y' else default
+    if dataset_name is not None:
+        session.remember_label(dataset_name, label)
+    return label
+
+
+def main(s2_m=0.001, normalize=True, spectrum_source=True, ask_equation_range=True, ask_log_axis=True,
+         report_adapted_range=True, axis_ranges='both', save_settings=True, legend_names=True):
+    """
+    Interactive FFT plotting tool. The earlier plotFFTGraph versions run it with the
+    parameters and prompts they had.
+
+    Parameters:
+        s2_m (float): Pulse width m of the S2 equation in seconds.
+        normalize (bool): Normalize each graph to its maximum; False plots the magnitudes as they are.
+        spectrum_source (bool): Offer spectra of time-domain files as a graph source.
+        ask_equation_range (bool): Ask for the frequency range and points of each equation.
+        ask_log_axis (bool): Ask whether the frequency axis is logarithmic.
+        report_adapted_range (bool): Report the equation range adapted to the text files.
+        axis_ranges (str): Axis ranges asked for: 'both', 'vertical' or None.
+        save_settings (bool): Offer to save axis ranges as presets and to reuse them.
+        legend_names (bool): Ask for a custom legend name for each graph.
+    """
+    # Loaded data, axis presets and legend labels are kept on disk and restored on the next run
+    session = SessionStore('fft')
+    session.print_summary()
+    loaded_data_list = session.datasets
+    # Figures and lines are kept and updated in place across plot-again iterations
+    figures = FigureManager()
+    # Files and equations are loaded on background threads while the prompts continue
+    loader = BackgroundLoader()
 
     while True:
+        # Files are parsed afresh each round, in case they changed on disk
+        loader.forget()
         try:
             num_graphs = int(input("How many graphs do you want to plot? "))
             if num_graphs <= 0:
@@ -88,19 +83,76 @@ def main():
         for i in range(num_graphs):
             print(f"\nFor graph {i + 1}:")
             while True:
-                source_type = input("Is this graph from text file (t) or equation (e)? [t/e]: ").strip().lower()
-                if source_type in ['t', 'e']:
+                if spectrum_source:
+                    source_type = input("Is this graph from text file (t), equation (e) or spectrum of a time-domain file (s)? [t/e/s]: ").strip().lower()
+                else:
+                    source_type = input("Is this graph from text file (t) or equation (e)? [t/e]: ").strip().lower()
+                if source_type in (['t', 'e', 's'] if spectrum_source else ['t', 'e']):
                     break
+                elif spectrum_source:
+                    print("Invalid input. Please enter 't' for text file, 'e' for equation or 's' for spectrum.")
                 else:
                     print("Invalid input. Please enter 't' for text file or 'e' for equation.")
 
-            if source_type == 't':
+            if source_type == 's':
+                any_text_file_used = True
+                while True:
+                    filename = input("Enter the time-domain text file name/path: ").strip()
+                    try:
+                        times, values = load_time_series(filename)
+                        if len(times) < 2:
+                            print(f"No valid data found in '{filename}'. Please check the file and try again.")
+                            continue
+                        break
+                    except FileNotFoundError:
+                        print(f"File '{filename}' not found. Please enter a valid file name/path.")
+                    except Exception as e:
+                        print(f"An error occurred while loading the file: {e}")
+                        print("Please ensure the file is in the correct format and try again.")
+
+                if not is_uniform(times):
+                    print("\nThe time steps in this file are not uniform.")
+                    while True:
+                        method = input(f"Choose a resampling method {RESAMPLE_METHODS} [linear]: ").strip().lower() or 'linear'
+                        if method in RESAMPLE_METHODS:
+                            break
+                        print(f"Invalid input. Please enter one of {RESAMPLE_METHODS}.")
+                    times, values, report = resample_uniform(times, values, method=method)
+                    print_resample_report(report)
+
+                while True:
+                    window = input(f"Choose a window {WINDOW_NAMES} [hann]: ").strip().lower() or 'hann'
+                    if window in WINDOW_NAMES:
+                        break
+                    print(f"Invalid input. Please enter one of {WINDOW_NAMES}.")
+
+                segment_len = None
+                welch_choice = get_yes_no("Do you want to Welch-average over segments? [y/n]: ")
+                if welch_choice == 'y':
+                    while True:
+                        try:
+                            segment_len = int(input("Enter segment length in samples: "))
+                            if segment_len < 2:
+                                print("Segment length must be at least 2.")
+                                continue
+                            break
+                        except ValueError:
+                            print("Invalid input. Please enter a valid integer.")
+
+                with stage('compute', filename):
+                    spectrum = compute_spectrum(times, values, window=window, segment_len=segment_len)
+                spectrum_name = f"{filename} (spectrum)"
+                data_index = session.add_dataset({'filename': spectrum_name, 'times': times, 'values': values,
+                                                  'window': window, **spectrum}, source_path=filename)
+                plot_sources.append({'type': 'text', 'data_index': data_index})
+                equation_freq_specs.append(None)
+                plot_sources[-1]['label'] = choose_label(session, spectrum_name, spectrum_name, legend_names)
+
+            elif source_type == 't':
                 any_text_file_used = True
                 # If text file data used before, prompt if user wants to reuse existing data
                 if len(loaded_data_list) > 0:
-                    print("\nYou have previously loaded text file data:")
-                    for idx, d in enumerate(loaded_data_list):
-                        print(f"{idx}: {d['filename']}")
+                    session.print_datasets()
                     reuse_choice = get_yes_no("Do you want to reuse previously loaded data? [y/n]: ")
                     if reuse_choice == 'y':
                         while True:
@@ -114,47 +166,22 @@ def main():
                                 print("Invalid input. Please enter a valid integer.")
                         plot_sources.append({'type': 'text', 'data_index': chosen_idx})
                         equation_freq_specs.append(None)
-                        # Assign label
-                        default_label = loaded_data_list[chosen_idx]['filename']
-                        assign_label = get_yes_no("Do you want to assign a custom name for the legend of this graph? [y/n]: ")
-                        if assign_label == 'y':
-                            custom_label = input("Enter legend name: ").strip()
-                        else:
-                            custom_label = default_label
-                        plot_sources[-1]['label'] = custom_label
+                        dataset_name = loaded_data_list[chosen_idx]['filename']
+                        plot_sources[-1]['label'] = choose_label(session, dataset_name, dataset_name, legend_names)
                         continue
 
-                # If not reusing:
-                while True:
-                    filename = input("Enter the text file name/path: ").strip()
-                    try:
-                        freqs, mags_dB, phases_deg = load_text_file_data(filename)
-                        if len(freqs) == 0:
-                            print(f"No valid data found in '{filename}'. Please check the file and try again.")
-                            continue
-                        break
-                    except FileNotFoundError:
-                        print(f"File '{filename}' not found. Please enter a valid file name/path.")
-                    except Exception as e:
-                        print(f"An error occurred while loading the file: {e}")
-                        print("Please ensure the file is in the correct format and try again.")
-
-                loaded_data_list.append(
-                    {'filename': filename, 'freqs': freqs, 'mags_dB': mags_dB, 'phases_deg': phases_deg})
-                plot_sources.append({'type': 'text', 'data_index': len(loaded_data_list) - 1})
+                # If not reusing: parse in the background and keep asking questions
+                filename = get_existing_path("Enter the text file name/path: ")
+                plot_sources.append({'type': 'text', 'filename': filename,
+                                     'pending': loader.submit(load_fft_export, filename)})
                 equation_freq_specs.append(None)
-                # Assign label
-                default_label = filename
-                assign_label = get_yes_no("Do you want to assign a custom name for the legend of this graph? [y/n]: ")
-                if assign_label == 'y':
-                    custom_label = input("Enter legend name: ").strip()
-                else:
-                    custom_label = default_label
-                plot_sources[-1]['label'] = custom_label
+                plot_sources[-1]['label'] = choose_label(session, filename, filename, legend_names)
 
             else:
                 # Equation based
-                custom_choice = get_yes_no("Do you want to specify frequency range and sample points for the equation? [y/n]: ")
+                custom_choice = 'n'
+                if ask_equation_range:
+                    custom_choice = get_yes_no("Do you want to specify frequency range and sample points for the equation? [y/n]: ")
                 if custom_choice == 'y':
                     while True:
                         try:
@@ -176,6 +203,10 @@ def main():
                         'num_points': num_points,
                         'custom': True
                     }
+                    # The grid is fixed, so the equation can be evaluated right away
+                    eq_params['pending'] = loader.submit(Pipeline(
+                        {'type': 'equation', 'model': 'S2', 'range': (min_freq, max_freq_user, num_points),
+                         'params': {'m': s2_m}}).evaluate)
                 else:
                     eq_params = {
                         'min_freq': 1e-3,
@@ -185,14 +216,16 @@ def main():
                     }
                 plot_sources.append({'type': 'equation'})
                 equation_freq_specs.append(eq_params)
-                # Assign label
-                default_label = f"Equation {i + 1}"
-                assign_label = get_yes_no("Do you want to assign a custom name for the legend of this graph? [y/n]: ")
-                if assign_label == 'y':
-                    custom_label = input("Enter legend name: ").strip()
-                else:
-                    custom_label = default_label
-                plot_sources[-1]['label'] = custom_label
+                plot_sources[-1]['label'] = choose_label(session, None, f"Equation {i + 1}", legend_names)
+
+        # Without text files, default equation grids are final as well
+        if not any_text_file_used:
+            for eqp in equation_freq_specs:
+                if eqp is not None and 'pending' not in eqp:
+                    eqp['pending'] = loader.submit(Pipeline(
+                        {'type': 'equation', 'model': 'S2',
+                         'range': (eqp['min_freq'], eqp['max_freq_user'], eqp['num_points']),
+                         'params': {'m': s2_m}}).evaluate)
 
         # If multiple graphs are requested, ask if combined plot
         combined_plot = False
@@ -213,95 +246,31 @@ def main():
         linear_scale = (scale_choice == 'linear')
 
         # Ask user if they want a logarithmic frequency axis
-        log_choice = get_yes_no("Do you want the frequency axis to be logarithmic? [y/n]: ")
-        use_log_scale = (log_choice == 'y')
-
-        # Before asking for new ranges, check if we have saved ranges
-        current_x_min, current_x_max = saved_x_min, saved_x_max
-        current_y_min, current_y_max = saved_y_min, saved_y_max
-
-        # If we have saved settings, ask if user wants to use them
-        if (saved_x_min is not None or saved_x_max is not None or
-            saved_y_min is not None or saved_y_max is not None):
-            use_saved = get_yes_no("\nDo you want to use previously saved x/y axis ranges? [y/n]: ")
-            if use_saved == 'y':
-                # Use the saved settings
-                x_min, x_max = saved_x_min, saved_x_max
-                y_min, y_max = saved_y_min, saved_y_max
-            else:
-                # Ask new ranges as usual
-                specify_yrange = get_yes_no("Do you want to specify vertical axis range? [y/n]: ")
-                if specify_yrange == 'y':
-                    while True:
-                        try:
-                            y_min = float(input("Enter minimum y-axis value: "))
-                            y_max = float(input("Enter maximum y-axis value: "))
-                            if y_max <= y_min:
-                                print("Maximum y-axis value must be greater than minimum y-axis value.")
-                                continue
-                            break
-                        except ValueError:
-                            print("Invalid input. Please enter numerical values for y-axis range.")
-                else:
-                    y_min = None
-                    y_max = None
-
-                specify_xrange = get_yes_no("Do you want to specify horizontal (frequency) axis range? [y/n]: ")
-                if specify_xrange == 'y':
-                    while True:
-                        try:
-                            x_min = float(input("Enter minimum x-axis value (Hz): "))
-                            x_max = float(input("Enter maximum x-axis value (Hz): "))
-                            if x_max <= x_min:
-                                print("Maximum x-axis value must be greater than minimum x-axis value.")
-                                continue
-                            break
-                        except ValueError:
-                            print("Invalid input. Please enter numerical values for x-axis range.")
-                else:
-                    x_min = None
-                    x_max = None
-
+        use_log_scale = False
+        if ask_log_axis:
+            log_choice = get_yes_no("Do you want the frequency axis to be logarithmic? [y/n]: ")
+            use_log_scale = (log_choice == 'y')
+
+        # If we have saved axis presets, ask if user wants to use one
+        preset = None
+        if save_settings:
+            preset = choose_preset(session, "\nDo you want to use previously saved x/y axis ranges? [y/n]: ")
+        x_min = x_max = y_min = y_max = None
+        if preset is not None:
+            x_min, x_max, y_min, y_max = preset
         else:
-            # No saved settings, proceed as usual
-            specify_yrange = get_yes_no("\nDo you want to specify vertical axis range? [y/n]: ")
-            if specify_yrange == 'y':
-                while True:
-                    try:
-                        y_min = float(input("Enter minimum y-axis value: "))
-                        y_max = float(input("Enter maximum y-axis value: "))
-                        if y_max <= y_min:
-                            print("Maximum y-axis value must be greater than minimum y-axis value.")
-                            continue
-                        break
-                    except ValueError:
-                        print("Invalid input. Please enter numerical values for y-axis range.")
-            else:
-                y_min = None
-                y_max = None
-
-            specify_xrange = get_yes_no("Do you want to specify horizontal (frequency) axis range? [y/n]: ")
-            if specify_xrange == 'y':
-                while True:
-                    try:
-                        x_min = float(input("Enter minimum x-axis value (Hz): "))
-                        x_max = float(input("Enter maximum x-axis value (Hz): "))
-                        if x_max <= x_min:
-                            print("Maximum x-axis value must be greater than minimum x-axis value.")
-                            continue
-                        break
-                    except ValueError:
-                        print("Invalid input. Please enter numerical values for x-axis range.")
-            else:
-                x_min = None
-                x_max = None
+            # No saved settings used, proceed as usual
+            if axis_ranges in ('vertical', 'both'):
+                y_min, y_max = get_range("\nDo you want to specify vertical axis range? [y/n]: ", "y-axis")
+            if axis_ranges == 'both':
+                x_min, x_max = get_range("Do you want to specify horizontal (frequency) axis range? [y/n]: ",
+                                         "x-axis", "Hz")
 
         # After setting ranges, ask if user wants to save these settings
-        if (x_min is not None or x_max is not None or y_min is not None or y_max is not None):
+        if save_settings and (x_min is not None or x_max is not None or y_min is not None or y_max is not None):
             save_settings = get_yes_no("\nDo you want to save these x/y axis settings for future plotting? [y/n]: ")
             if save_settings == 'y':
-                saved_x_min, saved_x_max = x_min, x_max
-                saved_y_min, saved_y_max = y_min, y_max
+                save_preset(session, x_min, x_max, y_min, y_max)
             else:
                 # Do not change saved settings
                 pass
@@ -309,6 +278,14 @@ def main():
             # If no range set, no prompt needed to save
             pass
 
+        # Files parsed in the background are needed from here on
+        for ps in plot_sources:
+            if 'pending' in ps:
+                filename, (freqs, mags_dB, phases_deg) = wait_for_file(
+                    loader, ps.pop('pending'), ps['filename'], load_fft_export, "Enter the text file name/path: ")
+                ps['data_index'] = session.add_dataset(
+                    {'filename': filename, 'freqs': freqs, 'mags_dB': mags_dB, 'phases_deg': phases_deg})
+
         # Step 2: Determine frequency range from text files if any
         if any_text_file_used:
             max_freq = 0.0
@@ -327,6 +304,7 @@ def main():
                 text_min_freq = text_freqs.min()
                 text_num_points = len(text_freqs)
             else:
+                text_freqs = None
                 text_num_points = 1000
                 text_min_freq = 1e-3
         else:
@@ -347,119 +325,149 @@ def main():
                     eqp['min_freq'] = text_min_freq
                     eqp['max_freq_user'] = max_freq
                     eqp['num_points'] = text_num_points
-                    print("\n[INFO] Since you did not specify parameters for the equation-based FFT and text file FFT data is present,")
-                    print("the following parameters have been adjusted to match the text file FFT graph:")
-                    print(f"  Minimum Frequency: {eqp['min_freq']} Hz")
-                    print(f"  Maximum Frequency: {eqp['max_freq_user']} Hz")
-                    print(f"  Number of Points: {eqp['num_points']}\n")
-
-        # Prepare plotting
-        if combined_plot:
-            plt.figure(figsize=(10, 6))
-
-        # Step 4: Plot each graph
+                    # Bind to the text file's own frequency array (no copy), so theory and data
+                    # share one x vector even when the export is log-spaced or irregular
+                    eqp['freqs'] = text_freqs
+                    eqp['data_index'] = max_freq_data_idx
+                    if report_adapted_range:
+                        print("\n[INFO] Since you did not specify parameters for the equation-based FFT and text file FFT data is present,")
+                        print("the following parameters have been adjusted to match the text file FFT graph:")
+                        print(f"  Minimum Frequency: {eqp['min_freq']} Hz")
+                        print(f"  Maximum Frequency: {eqp['max_freq_user']} Hz")
+                        print(f"  Number of Points: {eqp['num_points']}")
+                        print(f"  Frequency Points: taken directly from '{loaded_data_list[max_freq_data_idx]['filename']}'\n")
+
+        # Prepare plotting: x and y limits are applied only if both ends are specified
+        xlim = [x_min, x_max] if x_min is not None and x_max is not None else None
+        ylim = [y_min, y_max] if y_min is not None and y_max is not None else None
+        normalized_word = "Normalized " if normalize else ""
+        ylabel = f"{normalized_word}Magnitude" + (" (linear)" if linear_scale else " (dB)")
+        figures.begin()
+
+        # Plotted data per graph, kept for the residual report below
+        plotted_freqs = {}
+        plotted_ydata = {}
+
+        # Step 4: Get each graph's magnitude in the domain it comes in (linear |S2| for
+        # equations, dB for text files), with the value to normalize it against
+        trace_freqs = []
+        trace_mags = []
+        trace_domains = []
+        trace_references = []
         for i, (ps, eqp) in enumerate(zip(plot_sources, equation_freq_specs)):
             if ps['type'] == 'equation':
                 min_freq = eqp['min_freq']
                 final_max_freq = eqp['max_freq_user']
                 final_num_points = eqp['num_points']
 
-                freqs = np.linspace(min_freq, final_max_freq, final_num_points)
-                omega = 2 * np.pi * freqs
-
-                S2 = S2_equation(omega)
-                mag_lin = np.abs(S2)
-
-                max_amp = mag_lin.max()
-                if max_amp == 0:
-                    print(f"Warning: Maximum amplitude for Equation {i + 1} is zero. Skipping normalization.")
-                    mag_lin_normalized = np.zeros_like(mag_lin)
-                else:
-                    mag_lin_normalized = mag_lin / max_amp
-
-                if linear_scale:
-                    ydata = mag_lin_normalized
+                if 'pending' in eqp:
+                    # Evaluated in the background during the prompts
+                    trace = loader.wait(eqp.pop('pending'), f"Equation {i + 1}")
+                    freqs, mag = trace['x'], trace['y']
                 else:
-                    # Avoid log of zero by adding a small epsilon
-                    ydata = 20 * np.log10(mag_lin_normalized + 1e-30)
-
-                label_str = ps.get('label', f"Equation {i + 1}")
-                if combined_plot:
-                    plt.plot(freqs, ydata, label=label_str)
-                else:
-                    plt.figure(figsize=(10, 6))
-                    if use_log_scale:
-                        plt.xscale('log')
-                    plt.plot(freqs, ydata, label=label_str)
-                    # Apply x and y limits if specified
-                    if x_min is not None and x_max is not None:
-                        plt.xlim([x_min, x_max])
-                    if y_min is not None and y_max is not None:
-                        plt.ylim([y_min, y_max])
-                    plt.xlabel("Frequency (Hz)")
-                    plt.ylabel("Normalized Magnitude" + (" (linear)" if linear_scale else " (dB)"))
-                    plt.title("Normalized FFT from Equation")
-                    plt.grid(True, which="both", ls="--")
-                    plt.legend()
-                    plt.show()
+                    if eqp.get('freqs') is not None:
+                        freqs = eqp['freqs']
+                    else:
+                        freqs = np.linspace(min_freq, final_max_freq, final_num_points)
+                    omega = 2 * np.pi * freqs
+
+                    with stage('compute', f"Equation {i + 1}", input_bytes=omega.nbytes):
+                        mag = np.abs(S2_equation(omega, m=s2_m))
+                trace_freqs.append(freqs)
+                trace_mags.append(mag)
+                trace_domains.append('linear')
+                trace_references.append(None)
 
             elif ps['type'] == 'text':
                 data_idx = ps['data_index']
                 freqs = loaded_data_list[data_idx]['freqs']
                 mags_dB = loaded_data_list[data_idx]['mags_dB']
 
-                mags_lin = convert_dB_to_linear(mags_dB)
-                max_amp = mags_lin.max()
-                if max_amp == 0:
-                    print(f"Warning: Maximum amplitude for '{loaded_data_list[data_idx]['filename']}' is zero. Skipping normalization.")
-                    mags_lin_normalized = np.zeros_like(mags_lin)
-                else:
-                    mags_lin_normalized = mags_lin / max_amp
-
-                if linear_scale:
-                    ydata = mags_lin_normalized
-                else:
-                    # Avoid log of zero by adding a small epsilon
-                    ydata = 20 * np.log10(mags_lin_normalized + 1e-30)
-
+                # With an x-range set, spectra of time-domain files are recomputed over just
+                # that band with the chirp-Z transform, at ZOOM_POINTS resolution
+                full_max_dB = None
+                if x_min is not None and x_max is not None and 'times' in loaded_data_list[data_idx]:
+                    band_min = max(x_min, 0.0)
+                    band_max = min(x_max, freqs[-1])
+                    if band_max > band_min:
+                        # Normalize against the full spectrum, not just the zoomed band
+                        full_max_dB = mags_dB.max()
+                        with stage('compute', loaded_data_list[data_idx]['filename']):
+                            zoom = zoom_spectrum(loaded_data_list[data_idx]['times'], loaded_data_list[data_idx]['values'],
+                                                 band_min, band_max, ZOOM_POINTS, loaded_data_list[data_idx]['window'])
+                        freqs = zoom['freqs']
+                        mags_dB = zoom['mags_dB']
+                        print(f"\n[INFO] Zoom spectrum of '{loaded_data_list[data_idx]['filename']}' computed over "
+                              f"{band_min} Hz to {band_max} Hz with {ZOOM_POINTS} points.")
+
+                trace_freqs.append(freqs)
+                trace_mags.append(mags_dB)
+                trace_domains.append('dB')
+                trace_references.append(full_max_dB)
+
+        # Normalize every graph in one batch: a max-subtract for dB data, a divide for linear
+        # data, vectorized over stacked traces of equal length. Without normalizing, the
+        # references 0 dB and 1 only convert each graph to the chosen scale
+        if not normalize:
+            trace_references = [0.0 if domain == 'dB' else 1.0 for domain in trace_domains]
+        with stage('normalize', f"{len(trace_mags)} traces", input_bytes=sum(m.nbytes for m in trace_mags)):
+            normalized, zero_max = normalize_traces(trace_mags, trace_domains, 'linear' if linear_scale else 'dB',
+                                                    trace_references)
+
+        # Step 5: Plot each graph
+        for i, ps in enumerate(plot_sources):
+            freqs = trace_freqs[i]
+            ydata = normalized[i]
+            plotted_freqs[i] = freqs
+            plotted_ydata[i] = ydata
+            if ps['type'] == 'equation':
+                if normalize and zero_max[i]:
+                    print(f"Warning: Maximum amplitude for Equation {i + 1} is zero. Skipping normalization.")
+                label_str = ps.get('label', f"Equation {i + 1}")
+                line_key = ('equation', i)
+                title = f"{normalized_word}FFT from Equation"
+            else:
+                data_idx = ps['data_index']
                 label_str = ps.get('label', loaded_data_list[data_idx]['filename'])
+                line_key = ('text', i)
+                title = f"{normalized_word}FFT from Text File Data"
+            with stage('render', label_str):
                 if combined_plot:
-                    plt.plot(freqs, ydata, label=label_str)
+                    figures.set_line('combined', line_key, freqs, ydata, label=label_str)
                 else:
-                    plt.figure(figsize=(10, 6))
-                    if use_log_scale:
-                        plt.xscale('log')
-                    plt.plot(freqs, ydata, label=label_str)
-                    # Apply x and y limits if specified
-                    if x_min is not None and x_max is not None:
-                        plt.xlim([x_min, x_max])
-                    if y_min is not None and y_max is not None:
-                        plt.ylim([y_min, y_max])
-                    plt.xlabel("Frequency (Hz)")
-                    plt.ylabel("Normalized Magnitude" + (" (linear)" if linear_scale else " (dB)"))
-                    plt.title("Normalized FFT from Text File Data")
-                    plt.grid(True, which="both", ls="--")
-                    plt.legend()
-                    plt.show()
-
-        if combined_plot:
-            if use_log_scale:
-                plt.xscale('log')
-            if x_min is not None and x_max is not None:
-                plt.xlim([x_min, x_max])
-            if y_min is not None and y_max is not None:
-                plt.ylim([y_min, y_max])
-            plt.xlabel("Frequency (Hz)")
-            plt.ylabel("Normalized Magnitude" + (" (linear)" if linear_scale else " (dB)"))
-            plt.title("Combined Normalized FFT Plots")
-            plt.grid(True, which="both", ls="--")
-            plt.legend()
-            plt.show()
+                    figures.set_line(('single', i), line_key, freqs, ydata, label=label_str)
+                    figures.finish(('single', i), "Frequency (Hz)", ylabel, title,
+                                   log_x=use_log_scale, xlim=xlim, ylim=ylim)
+
+        with stage('render', 'combined'):
+            if combined_plot:
+                figures.finish('combined', "Frequency (Hz)", ylabel, f"Combined {normalized_word}FFT Plots",
+                               log_x=use_log_scale, xlim=xlim, ylim=ylim)
+        with stage('show'):
+            figures.show()
+
+        # Step 6: Residuals of equations that share their frequency vector with a text file
+        residual_labels = []
+        residual_pairs = []
+        for i, (ps, eqp) in enumerate(zip(plot_sources, equation_freq_specs)):
+            if ps['type'] != 'equation' or eqp.get('data_index') is None:
+                continue
+            for j, other in enumerate(plot_sources):
+                if other['type'] == 'text' and plotted_freqs[j] is eqp['freqs']:
+                    residual_labels.append(f"{other['label']} - {ps['label']}")
+                    residual_pairs.append((eqp['freqs'], plotted_ydata[j], plotted_ydata[i]))
+                    break
+        if residual_pairs:
+            print("\n[INFO] Residuals of text file data against equations on the shared frequency points:")
+            print_error_table(residual_labels, batch_error_metrics(residual_pairs),
+                              unit="linear" if linear_scale else "dB")
 
         # After plotting, ask user if they want to continue
         cont_choice = get_yes_no("\nDo you want to plot again? [y/n]: ")
         if cont_choice != 'y':
             print("Exiting the plotting tool. Goodbye!")
+            loader.close()
+            figures.show_and_close()
             break
 
 
@@ -1,5 +1,4 @@
 import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
 from matplotlib.gridspec import GridSpec
 import os
@@ -13,6 +12,9 @@ class DataPlotter:
 
     def read_data(self, filename):
         """Read data from text file"""
+        # pandas is slow to import, so only pay for it when a file is actually read
+        import pandas as pd
+
         try:
             # Try reading with tab delimiter first
             data = pd.read_csv(filename, delimiter='\t', skipinitialspace=True)
@@ -32,6 +34,8 @@ class DataPlotter:
 
     def generate_equation_data(self, equation_type):
         """Generate data from predefined equations"""
+        import pandas as pd
+
         x = np.linspace(0, 10, 1000)
         if equation_type == 'sine':
             y = np.sin(x)
@@ -1,49 +1,17 @@
-import numpy as np
-import matplotlib.pyplot as plt
+# First general plotting tool: every file is an FFT export in dB, equations are tagged
+# with a section, and all graphs are drawn together on one 'All Graphs' figure.
 import os
 
+import matplotlib.pyplot as plt
 
-# Function to read LTSpice data
-# Function to read LTSpice data
-def read_ltspice_file(filepath):
-    try:
-        with open(filepath, 'r') as file:
-            lines = file.readlines()
-
-        data = []
-        for line in lines:
-            if line.strip() and not line.startswith('Freq.'):  # Skip empty lines and header
-                split_line = line.split()
-                freq = float(split_line[0])
-                # Split and process the dB and phase values
-                db, phase = split_line[1][1:-1].split(',')
-                db = float(db[:-2])  # Remove "dB" and convert to float
-                phase = float(phase[:-1])  # Remove "°" and convert to float
-                data.append((freq, db, phase))
-        return np.array(data)
-    except Exception as e:
-        print(f"Error reading file: {e}")
-        return None
-
-
-
-# Function to generate theoretical data
-def generate_theoretical_data(equation, x_range):
-    try:
-        x = np.linspace(*x_range, 1000)
-        y = eval(equation)
-        return x, y
-    except Exception as e:
-        print(f"Error in equation: {e}")
-        return None, None
+from plotCore import Pipeline, evaluate_pipelines
+from plotGraph9 import checked, draw_figure, generate_equation_data
 
 
-# Main function
 def main():
+    # Each graph: (pipeline, legend suffix)
     graphs = []
-    superpose = []
-
-    # Input the number of graphs
+    cache = {}
     num_graphs = int(input("How many graphs do you want to plot? "))
 
     for i in range(num_graphs):
@@ -54,12 +22,10 @@ def main():
         if graph_type == 'file':
             file_path = input("Enter the full file path: ").strip()
             if os.path.exists(file_path):
-                data = read_ltspice_file(file_path)
-                if data is not None:
-                    freq, db, phase = data.T
-                    graphs.append(('file', freq, db, phase))
-                else:
-                    print("Failed to read file data.")
+                pipeline = checked(Pipeline({'type': 'text', 'path': file_path}), cache, "Error reading file",
+                                   "Failed to read file data.")
+                if pipeline is not None:
+                    graphs.append((pipeline, "File"))
             else:
                 print("File does not exist.")
 
@@ -68,49 +34,25 @@ def main():
             equation = input("Enter the equation (e.g., 'np.sin(2*np.pi*x)'): ").strip()
             x_range = input("Enter the x range as 'start, end' (e.g., '0, 10'): ").strip()
             x_start, x_end = map(float, x_range.split(','))
-            x, y = generate_theoretical_data(equation, (x_start, x_end))
-            if x is not None:
-                graphs.append(('equation', x, y, section))
-            else:
-                print("Failed to generate theoretical data.")
+            pipeline = checked(generate_equation_data(equation, (x_start, x_end), 2), cache, "Error in equation",
+                               "Failed to generate theoretical data.")
+            if pipeline is not None:
+                graphs.append((pipeline, f"Equation, Section {section}"))
 
         else:
             print("Invalid input. Skipping graph.")
 
-    # Superpose graphs
+    superpose = []
     if input("Do you want to superpose graphs? (yes/no): ").strip().lower() == 'yes':
         indices = input("Enter the graph indices to superpose, separated by commas (e.g., '0,1'): ").strip()
         superpose = [int(idx) for idx in indices.split(',')]
 
-    # Plot graphs
-    plt.figure(figsize=(10, 6))
-    for i, graph in enumerate(graphs):
-        if graph[0] == 'file':
-            plt.plot(graph[1], graph[2], label=f'Graph {i + 1} (File)')
-        elif graph[0] == 'equation':
-            plt.plot(graph[1], graph[2], label=f'Graph {i + 1} (Equation, Section {graph[3]})')
-
+    traces = evaluate_pipelines([pipeline for pipeline, _ in graphs], cache)
+    labels = [f"Graph {i + 1} ({suffix})" for i, (_, suffix) in enumerate(graphs)]
+    draw_figure(traces, labels, "All Graphs", "X-axis", "Y-axis")
     if superpose:
-        plt.figure(figsize=(10, 6))
-        for idx in superpose:
-            graph = graphs[idx]
-            if graph[0] == 'file':
-                plt.plot(graph[1], graph[2], label=f'Graph {idx + 1} (File)')
-            elif graph[0] == 'equation':
-                plt.plot(graph[1], graph[2], label=f'Graph {idx + 1} (Equation, Section {graph[3]})')
-        plt.legend()
-        plt.title("Superposed Graph")
-        plt.xlabel("X-axis")
-        plt.ylabel("Y-axis")
-        plt.grid(True)
-        plt.show()
-
-    # Show all individual graphs
-    plt.legend()
-    plt.title("All Graphs")
-    plt.xlabel("X-axis")
-    plt.ylabel("Y-axis")
-    plt.grid(True)
+        draw_figure([traces[idx] for idx in superpose], [labels[idx] for idx in superpose], "Superposed Graph",
+                    "X-axis", "Y-axis")
     plt.show()
 
 
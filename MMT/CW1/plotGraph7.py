@@ -1,120 +1,16 @@
-import numpy as np
-import matplotlib.pyplot as plt
+# Asks whether FFT files are in dB or linear (linear ones are converted to dB), offers
+# the built-in FFT equation as its linear amplitude, and guards log-log scaling
+# against non-positive values.
 import os
 
-
-def read_fft_file(filepath):
-    try:
-        with open(filepath, 'r') as file:
-            lines = file.readlines()
-
-        # Ask user about the data unit
-        print("\nWhat is the vertical axis unit in your FFT file?")
-        print("1. dB")
-        print("2. Linear scale")
-        unit_choice = int(input("Enter your choice (1 or 2): "))
-
-        data = []
-        for line in lines[1:]:
-            if line.strip():
-                split_line = line.split()
-                freq = float(split_line[0])
-                db, phase = split_line[1][1:-1].split(',')
-                db = float(db[:-2])
-                phase = float(phase[:-1])
-                data.append((freq, db, phase, unit_choice == 1))  # Store unit info
-        return np.array(data)
-    except Exception as e:
-        print(f"Error reading FFT file: {e}")
-        return None
-
-
-def read_normal_file(filepath):
-    try:
-        with open(filepath, 'r') as file:
-            lines = file.readlines()
-
-        data = []
-        for line in lines[1:]:
-            if line.strip():
-                split_line = line.split()
-                time = float(split_line[0])
-                voltage = float(split_line[1])
-                data.append((time, voltage))
-        return np.array(data)
-    except Exception as e:
-        print(f"Error reading normal graph file: {e}")
-        return None
-
-
-def generate_equation_data(equation, x_range, equation_type):
-    try:
-        x = np.linspace(*x_range, 1000)
-
-        if equation_type == 1:  # FFT Equation
-            # Create a mask for non-zero values
-            nonzero_mask = (x != 0)
-
-            # Initialize arrays
-            real_part = np.zeros_like(x)
-            imag_part = np.zeros_like(x)
-
-            # Calculate for non-zero values
-            real_part[nonzero_mask] = np.sin(x[nonzero_mask]) / x[nonzero_mask]
-            imag_part[nonzero_mask] = (np.cos(x[nonzero_mask]) - 1) / x[nonzero_mask]
-
-            # Handle ω = 0 case with limits
-            real_part[~nonzero_mask] = 1  # lim(sin(x)/x) as x→0 = 1
-            imag_part[~nonzero_mask] = 0  # lim((cos(x)-1)/x) as x→0 = 0
-
-            # Calculate amplitude
-            complex_val = real_part + 1j * imag_part
-            amplitude = np.abs(complex_val)
-
-            return x, amplitude
-        else:  # Normal Equation
-            y = eval(equation)
-            return x, y
-
-    except Exception as e:
-        print(f"Error in equation: {e}")
-        return None, None
-
-
-def set_axis_scale():
-    print("\nChoose the axis scaling:")
-    print("1. Linear scale")
-    print("2. Log-log scale")
-    print("3. dB scale")
-    print("4. Semi-log (horizontal log scale)")
-    scale_choice = int(input("Enter your choice (1-4): "))
-
-    if scale_choice == 1:
-        plt.xscale("linear")
-        plt.yscale("linear")
-    elif scale_choice == 2:
-        if plt.gca().get_ylim()[0] <= 0 or plt.gca().get_ylim()[1] <= 0:
-            print("Warning: Data contains non-positive values. Using linear scale for y-axis.")
-            plt.yscale("linear")
-        else:
-            plt.xscale("log")
-            plt.yscale("log")
-    elif scale_choice == 3:
-        plt.yscale("linear")  # Always use linear scale for dB data
-    elif scale_choice == 4:
-        plt.xscale("log")
-
-
-def are_compatible_types(type1, type2):
-    fft_types = {'fft', 'fft equation'}
-    normal_types = {'normal', 'normal equation'}
-
-    return (type1 in fft_types and type2 in fft_types) or \
-        (type1 in normal_types and type2 in normal_types)
+from plotGraph9 import (are_compatible_types, ask_superpose_indices, checked, data_pipeline, draw_each,
+                        draw_superposed, generate_equation_data, read_fft_file, read_normal_file)
 
 
 def main():
+    # Each graph: (type, name, pipeline, x label, y label)
     graphs = []
+    cache = {}
     num_graphs = int(input("How many graphs do you want to plot? "))
 
     for i in range(num_graphs):
@@ -131,23 +27,15 @@ def main():
                 print("2. Normal")
                 graph_format = int(input("Enter your choice (1 or 2): "))
                 if graph_format == 1:
-                    data = read_fft_file(file_path)
-                    if data is not None:
-                        freq, db, phase, is_db = data.T
-                        # Take the first value since all values should be the same
-                        is_db_value = bool(is_db[0])
-                        # Convert to dB if data is linear and dB scale is chosen
-                        if not is_db_value:
-                            db = 20 * np.log10(db)
-                        graphs.append(('fft', file_path, freq, db, "Frequency (Hz)",
-                                    "Amplitude (dB)" if is_db_value else "Amplitude"))
-                    else:
-                        print("Failed to read FFT file data.")
+                    pipeline = checked(read_fft_file(file_path), cache, "Error reading FFT file",
+                                       "Failed to read FFT file data.")
+                    if pipeline is not None:
+                        graphs.append(('fft', file_path, pipeline, "Frequency (Hz)", "Amplitude (dB)"))
                 elif graph_format == 2:
                     data = read_normal_file(file_path)
                     if data is not None:
-                        time, voltage = data.T
-                        graphs.append(('normal', file_path, time, voltage, "Time (s)", "Voltage (V)"))
+                        graphs.append(('normal', file_path, data_pipeline(data[:, 0], data[:, 1]),
+                                       "Time (s)", "Voltage (V)"))
                     else:
                         print("Failed to read normal graph file data.")
                 else:
@@ -168,58 +56,28 @@ def main():
 
             x_range = input("Enter the frequency range as 'start, end' (e.g., '0, 10'): ").strip()
             x_start, x_end = map(float, x_range.split(','))
-            x, y = generate_equation_data(equation, (x_start, x_end), equation_type)
-
-            if x is not None:
-                if equation_type == 1:
-                    graphs.append(('fft equation', "FFT Equation", x, y, "Frequency (Hz)", "Amplitude"))
-                elif equation_type == 2:
-                    graphs.append(('normal equation', "Equation", x, y, "Time (s)", "Voltage (V)"))
-                else:
-                    print("Invalid equation type.")
+            pipeline = checked(generate_equation_data(equation, (x_start, x_end), equation_type, in_dB=False), cache,
+                               "Error in equation", "Failed to generate data from equation.")
+            if pipeline is None:
+                continue
+            if equation_type == 1:
+                graphs.append(('fft equation', "FFT Equation", pipeline, "Frequency (Hz)", "Amplitude"))
+            elif equation_type == 2:
+                graphs.append(('normal equation', "Equation", pipeline, "Time (s)", "Voltage (V)"))
             else:
-                print("Failed to generate data from equation.")
+                print("Invalid equation type.")
 
     if input("\nDo you want to superpose graphs? (yes/no): ").strip().lower() == 'yes':
-        print("\nAvailable graphs:")
-        for idx, (gtype, fname, _, _, _, _) in enumerate(graphs):
-            print(f"{idx}: {gtype.upper()} - {fname}")
-
-        superpose_indices = input("Enter the graph indices to superpose, separated by commas (e.g., '0,1'): ").strip()
-        superpose_indices = [int(idx) for idx in superpose_indices.split(',')]
-
+        superpose_indices = ask_superpose_indices(graphs)
         types = [graphs[idx][0] for idx in superpose_indices]
-        compatible = all(are_compatible_types(types[0], t) for t in types[1:])
-
-        if compatible:
-            plt.figure(figsize=(10, 6))
-            for idx in superpose_indices:
-                graph = graphs[idx]
-                plt.plot(graph[2], graph[3], label=f"{graph[1]} ({graph[0].upper()})")
-            plt.xlabel(graphs[superpose_indices[0]][4])
-            plt.ylabel(graphs[superpose_indices[0]][5])
-            print("\nSetting axis scaling for the graph:")
-            set_axis_scale()
-            plt.legend()
-            plt.title("Superposed Graphs")
-            plt.grid(True)
-            plt.show()
+        if all(are_compatible_types(types[0], t) for t in types[1:]):
+            draw_superposed(graphs, superpose_indices, cache, "\nSetting axis scaling for the graph:")
         else:
             print("Cannot superpose these graphs. Please choose compatible graph types:")
             print("- FFT graphs can be superposed with FFT equation graphs")
             print("- Normal graphs can be superposed with Normal equation graphs")
     else:
-        for i, graph in enumerate(graphs):
-            plt.figure(figsize=(10, 6))
-            plt.plot(graph[2], graph[3], label=f"{graph[1]} ({graph[0].upper()})")
-            plt.xlabel(graph[4])
-            plt.ylabel(graph[5])
-            print(f"\nSetting axis scaling for Graph {i + 1}:")
-            set_axis_scale()
-            plt.legend()
-            plt.title(f"Graph {i + 1}")
-            plt.grid(True)
-            plt.show()
+        draw_each(graphs, cache)
 
 
 if __name__ == "__main__":
@@ -1,87 +1,100 @@
-import numpy as np
-import matplotlib.pyplot as plt
 import os
 
+import matplotlib.pyplot as plt
+import numpy as np
+
+from plotCore import Pipeline, evaluate_pipelines
+from spectrumAnalysis import load_time_series, spectrum_from_normal_data
+
+# Points of an equation over the range the user enters
+EQUATION_POINTS = 1000
+
 
 def read_fft_file(filepath):
-    try:
-        with open(filepath, 'r') as file:
-            lines = file.readlines()
-
-        # Ask user about the data unit
-        print("\nWhat is the vertical axis unit in your FFT file?")
-        print("1. dB")
-        print("2. Linear scale")
-        unit_choice = int(input("Enter your choice (1 or 2): "))
-
-        data = []
-        for line in lines[1:]:
-            if line.strip():
-                split_line = line.split()
-                freq = float(split_line[0])
-                db, phase = split_line[1][1:-1].split(',')
-                db = float(db[:-2])
-                phase = float(phase[:-1])
-                data.append((freq, db, phase, unit_choice == 1))  # Store unit info
-        return np.array(data)
-    except Exception as e:
-        print(f"Error reading FFT file: {e}")
-        return None
+    """
+    Builds the pipeline of an FFT export, asking whether its magnitudes are in dB or
+    linear.
+
+    Parameters:
+        filepath (str): Path to the FFT export.
+
+    Returns:
+        Pipeline: The file's magnitude, in dB.
+    """
+    print("\nWhat is the vertical axis unit in your FFT file?")
+    print("1. dB")
+    print("2. Linear scale")
+    unit_choice = int(input("Enter your choice (1 or 2): "))
+    source = {'type': 'text', 'path': filepath, 'unit': 'dB' if unit_choice == 1 else 'linear'}
+    return Pipeline(source).then('to_dB')
 
 
 def read_normal_file(filepath):
+    """
+    Reads a time/voltage export with the shared time-series parser.
+
+    Parameters:
+        filepath (str): Path to the export.
+
+    Returns:
+        np.ndarray: (N, 2) array of time and voltage, or None if the file can't be read.
+    """
     try:
-        with open(filepath, 'r') as file:
-            lines = file.readlines()
-
-        data = []
-        for line in lines[1:]:
-            if line.strip():
-                split_line = line.split()
-                time = float(split_line[0])
-                voltage = float(split_line[1])
-                data.append((time, voltage))
-        return np.array(data)
+        times, voltages = load_time_series(filepath)
+        return np.column_stack((times, voltages))
     except Exception as e:
         print(f"Error reading normal graph file: {e}")
         return None
 
 
-def generate_equation_data(equation, x_range, equation_type):
-    try:
-        x = np.linspace(*x_range, 1000)
+def data_pipeline(x, y, domain=None):
+    """Wraps arrays that are already loaded as a pipeline, so they plot like the others."""
+    return Pipeline({'type': 'raw', 'x': x, 'y': y, 'domain': domain})
 
-        if equation_type == 1:  # FFT Equation
-            # Create a mask for non-zero values
-            nonzero_mask = (x != 0)
 
-            # Initialize arrays
-            real_part = np.zeros_like(x)
-            imag_part = np.zeros_like(x)
+def generate_equation_data(equation, x_range, equation_type, in_dB=True):
+    """
+    Builds the pipeline of an equation over x_range: the built-in FFT equation
+    sin(ω)/ω + j(cos(ω)-1)/ω for equation_type 1, otherwise a numpy expression in x.
 
-            # Calculate for non-zero values
-            real_part[nonzero_mask] = np.sin(x[nonzero_mask]) / x[nonzero_mask]
-            imag_part[nonzero_mask] = (np.cos(x[nonzero_mask]) - 1) / x[nonzero_mask]
+    Parameters:
+        in_dB (bool): Whether the built-in equation's amplitude is converted to dB.
+    """
+    grid = (x_range[0], x_range[1], EQUATION_POINTS)
+    if equation_type == 1:
+        # The built-in equation takes the entered x as ω directly, not as a frequency in Hz
+        pipeline = Pipeline({'type': 'equation', 'model': 'pulse', 'range': grid, 'omega': True})
+        return pipeline.then('to_dB') if in_dB else pipeline
+    return Pipeline({'type': 'equation', 'expression': equation, 'range': grid})
 
-            # Handle ω = 0 case with limits
-            real_part[~nonzero_mask] = 1  # lim(sin(x)/x) as x→0 = 1
-            imag_part[~nonzero_mask] = 0  # lim((cos(x)-1)/x) as x→0 = 0
 
-            # Calculate amplitude
-            complex_val = real_part + 1j * imag_part
-            amplitude = np.abs(complex_val)
-
-            return x, amplitude
-        else:  # Normal Equation
-            y = eval(equation)
-            return x, y
+def checked(pipeline, cache, error_prefix, failure_message):
+    """
+    Evaluates a graph's pipeline as soon as it is entered, so a bad file or equation is
+    reported for that graph and the others can still be entered. The trace stays in
+    cache for plotting.
 
+    Returns:
+        Pipeline: The pipeline, or None if it failed.
+    """
+    try:
+        if len(pipeline.evaluate(cache)['x']) == 0:
+            raise ValueError("no valid data")
+        return pipeline
     except Exception as e:
-        print(f"Error in equation: {e}")
-        return None, None
+        print(f"{error_prefix}: {e}")
+        print(failure_message)
+        return None
+
 
+def set_axis_scale(legacy=False):
+    """
+    Asks for the axis scaling of the current figure.
 
-def set_axis_scale():
+    Parameters:
+        legacy (bool): Scale as plotGraph4-6 did: log-log without checking for
+            non-positive values, and a log y-axis for the dB choice.
+    """
     print("\nChoose the axis scaling:")
     print("1. Linear scale")
     print("2. Log-log scale")
@@ -92,6 +105,9 @@ def set_axis_scale():
     if scale_choice == 1:
         plt.xscale("linear")
         plt.yscale("linear")
+    elif scale_choice == 2 and legacy:
+        plt.xscale("log")
+        plt.yscale("log")
     elif scale_choice == 2:
         if plt.gca().get_ylim()[0] <= 0 or plt.gca().get_ylim()[1] <= 0:
             print("Warning: Data contains non-positive values. Using linear scale for y-axis.")
@@ -99,6 +115,8 @@ def set_axis_scale():
         else:
             plt.xscale("log")
             plt.yscale("log")
+    elif scale_choice == 3 and legacy:
+        plt.yscale("log")
     elif scale_choice == 3:
         plt.yscale("linear")  # Always use linear scale for dB data
     elif scale_choice == 4:
@@ -113,8 +131,78 @@ def are_compatible_types(type1, type2):
         (type1 in normal_types and type2 in normal_types)
 
 
+def draw_figure(traces, labels, title, x_label=None, y_label=None, scale_message=None, legacy_scale=None):
+    """
+    Draws traces on a new figure; the caller shows it.
+
+    Parameters:
+        traces (list): Traces from evaluate_pipelines.
+        labels (list): Legend label of each trace.
+        title (str): Figure title.
+        x_label, y_label (str): Axis labels, or None for none.
+        scale_message (str): Printed before asking for the axis scaling.
+        legacy_scale (bool): Whether to ask for the axis scaling with set_axis_scale(legacy),
+            or None not to ask.
+    """
+    plt.figure(figsize=(10, 6))
+    for trace, label in zip(traces, labels):
+        plt.plot(trace['x'], trace['y'], label=label)
+    if x_label is not None:
+        plt.xlabel(x_label)
+    if y_label is not None:
+        plt.ylabel(y_label)
+    if scale_message is not None:
+        print(scale_message)
+    if legacy_scale is not None:
+        set_axis_scale(legacy_scale)
+    plt.legend()
+    plt.title(title)
+    plt.grid(True)
+
+
+def ask_superpose_indices(graphs):
+    """
+    Lists the graphs by type and name and asks which ones to superpose.
+
+    Parameters:
+        graphs (list): (type, name, pipeline, x label, y label) of each graph.
+
+    Returns:
+        list: Indices into graphs.
+    """
+    print("\nAvailable graphs:")
+    for idx, (gtype, fname, _, _, _) in enumerate(graphs):
+        print(f"{idx}: {gtype.upper()} - {fname}")
+
+    superpose_indices = input("Enter the graph indices to superpose, separated by commas (e.g., '0,1'): ").strip()
+    return [int(idx) for idx in superpose_indices.split(',')]
+
+
+def draw_superposed(graphs, indices, cache, scale_message=None, legacy_scale=False):
+    """Draws and shows the 'Superposed Graphs' figure of the graphs at indices."""
+    # Every graph was evaluated when it was entered; this only reads the cache
+    traces = evaluate_pipelines([graphs[idx][2] for idx in indices], cache)
+    labels = [f"{graphs[idx][1]} ({graphs[idx][0].upper()})" for idx in indices]
+    first = graphs[indices[0]]
+    draw_figure(traces, labels, "Superposed Graphs", first[3], first[4], scale_message, legacy_scale)
+    plt.show()
+
+
+def draw_each(graphs, cache, announce=True, legacy_scale=False):
+    """Draws and shows each graph on its own figure, asking for its axis scaling."""
+    traces = evaluate_pipelines([graph[2] for graph in graphs], cache)
+    for i, ((gtype, fname, _, x_label, y_label), trace) in enumerate(zip(graphs, traces)):
+        message = f"\nSetting axis scaling for Graph {i + 1}:" if announce else None
+        draw_figure([trace], [f"{fname} ({gtype.upper()})"], f"Graph {i + 1}", x_label, y_label,
+                    message, legacy_scale)
+        plt.show()
+
+
 def main():
+    # Each graph: (type, name, pipeline, x label, y label)
     graphs = []
+    # Traces evaluated while the graphs are entered, reused when they are plotted
+    cache = {}
     num_graphs = int(input("How many graphs do you want to plot? "))
 
     for i in range(num_graphs):
@@ -129,27 +217,24 @@ def main():
                 print("\nChoose the format:")
                 print("1. FFT")
                 print("2. Normal")
-                graph_format = int(input("Enter your choice (1 or 2): "))
+                print("3. Normal, plotted as its spectrum")
+                graph_format = int(input("Enter your choice (1-3): "))
                 if graph_format == 1:
-                    data = read_fft_file(file_path)
-                    if data is not None:
-                        freq, db, phase, is_db = data.T
-                        # Take the first value since all values should be the same
-                        is_db_value = bool(is_db[0])
-                        # Convert to dB if data is linear and dB scale is chosen
-                        if not is_db_value:
-                            db = 20 * np.log10(db)
-                        graphs.append(('fft', file_path, freq, db, "Frequency (Hz)",
-                                    "Amplitude (dB)" if is_db_value else "Amplitude"))
-                    else:
-                        print("Failed to read FFT file data.")
-                elif graph_format == 2:
+                    pipeline = checked(read_fft_file(file_path), cache, "Error reading FFT file",
+                                       "Failed to read FFT file data.")
+                    if pipeline is not None:
+                        graphs.append(('fft', file_path, pipeline, "Frequency (Hz)", "Amplitude (dB)"))
+                elif graph_format in (2, 3):
                     data = read_normal_file(file_path)
-                    if data is not None:
-                        time, voltage = data.T
-                        graphs.append(('normal', file_path, time, voltage, "Time (s)", "Voltage (V)"))
-                    else:
+                    if data is None:
                         print("Failed to read normal graph file data.")
+                    elif graph_format == 2:
+                        graphs.append(('normal', file_path, data_pipeline(data[:, 0], data[:, 1]),
+                                       "Time (s)", "Voltage (V)"))
+                    else:
+                        spectrum = spectrum_from_normal_data(data)
+                        graphs.append(('fft', file_path, data_pipeline(spectrum['freqs'], spectrum['mags_dB'], 'dB'),
+                                       "Frequency (Hz)", "Amplitude (dB)"))
                 else:
                     print("Invalid format. Skipping graph.")
             else:
@@ -168,53 +253,26 @@ def main():
 
             x_range = input("Enter the frequency range as 'start, end' (e.g., '0, 10'): ").strip()
             x_start, x_end = map(float, x_range.split(','))
-            x, y = generate_equation_data(equation, (x_start, x_end), equation_type)
+            pipeline = checked(generate_equation_data(equation, (x_start, x_end), equation_type), cache,
+                               "Error in equation", "Failed to generate data from equation.")
 
-            if x is not None:
-                if equation_type == 1:
-                    graphs.append(('fft equation', "FFT Equation", x, y, "Frequency (Hz)", "Amplitude"))
-                elif equation_type == 2:
-                    graphs.append(('normal equation', "Equation", x, y, "Time (s)", "Voltage (V)"))
-                else:
-                    print("Invalid equation type.")
+            if pipeline is None:
+                continue
+            if equation_type == 1:
+                graphs.append(('fft equation', "FFT Equation", pipeline, "Frequency (Hz)", "Amplitude (dB)"))
+            elif equation_type == 2:
+                graphs.append(('normal equation', "Equation", pipeline, "Time (s)", "Voltage (V)"))
             else:
-                print("Failed to generate data from equation.")
+                print("Invalid equation type.")
 
     if input("\nDo you want to superpose graphs? (yes/no): ").strip().lower() == 'yes':
-        print("\nAvailable graphs:")
-        for idx, (gtype, fname, _, _, _, _) in enumerate(graphs):
-            print(f"{idx}: {gtype.upper()} - {fname}")
-
-        superpose_indices = input("Enter the graph indices to superpose, separated by commas (e.g., '0,1'): ").strip()
-        superpose_indices = [int(idx) for idx in superpose_indices.split(',')]
+        superpose_indices = ask_superpose_indices(graphs)
 
         types = [graphs[idx][0] for idx in superpose_indices]
         compatible = all(are_compatible_types(types[0], t) for t in types[1:])
 
         if compatible:
-            plt.figure(figsize=(10, 6))
-            for idx in superpose_indices:
-                graph = graphs[idx]
-                x_data, y_data = graph[2], graph[3]
-
-                # Check if the graph requires dB conversion
-                if graph[0] in {'fft', 'fft equation'}:
-                    # Convert amplitude to dB if not already in dB
-                    is_already_db = "Amplitude (dB)" in graph[5]
-                    if not is_already_db:
-                        y_data = 20 * np.log10(np.clip(y_data, a_min=1e-12, a_max=None))  # Prevent log of 0 or negative
-
-                plt.plot(x_data, y_data, label=f"{graph[1]} ({graph[0].upper()})")
-            plt.xlabel(graphs[superpose_indices[0]][4])
-            plt.ylabel("Amplitude (dB)" if any("Amplitude (dB)" in graph[5] for graph in graphs) else
-                       graphs[superpose_indices[0]][5])
-            print("\nSetting axis scaling for the graph:")
-            set_axis_scale()
-            plt.legend()
-            plt.title("Superposed Graphs")
-            plt.grid(True)
-            plt.show()
-
+            draw_superposed(graphs, superpose_indices, cache, "\nSetting axis scaling for the graph:")
         else:
             print("Cannot superpose these graphs. Please choose compatible graph types:")
             print("- FFT graphs can only be superposed with other FFT graphs.")
@@ -1,17 +1,17 @@
-import numpy as np
 import matplotlib.pyplot as plt
 
+from plotCore import Pipeline
+
 # Constants
 R = 1  # Resistance in ohms
 L = 1  # Inductance in henries
-t = np.linspace(0, 5, 1000)  # Time range
 
-# Impulse response function
-H = np.where(t == 0, 1, 0) - (R / L) * np.exp(-R / L * t)
+# Impulse response H(t) = δ(t) - (R/L)e^{-(R/L)t}u(t) over 0 to 5 s
+H = Pipeline({'type': 'equation', 'model': 'H', 'range': (0, 5, 1000), 'params': {'rate': R / L}}).evaluate()
 
 # Plot the impulse response
 plt.figure(figsize=(10, 6))
-plt.plot(t, H, label=r"$H(t) = \delta(t) - \frac{R}{L} e^{-\frac{R}{L} t}$")
+plt.plot(H['x'], H['y'], label=r"$H(t) = \delta(t) - \frac{R}{L} e^{-\frac{R}{L} t}$")
 plt.axhline(0, color='black', linewidth=0.8, linestyle='--')
 plt.title("Impulse Response")
 plt.xlabel("Time (t)")
@@ -1,89 +1,45 @@
 import numpy as np
-import matplotlib.pyplot as plt
+from backgroundLoader import BackgroundLoader, wait_for_file
+from figureManager import FigureManager
+from impulseFromFFT import impulse_from_fft
+from plotCore import (H_theoretical, Pipeline, get_existing_path, get_range, get_yes_no, load_fft_export,
+                      load_time_export)
+from sessionStore import SessionStore, choose_preset, save_preset
+from stageTrace import stage
 
-# Global saved settings
-saved_x_min = None
-saved_x_max = None
-saved_y_min = None
-saved_y_max = None
 
-
-def load_text_file_data(filename):
-    """
-    Loads impulse response data from a text file.
-
-    Parameters:
-        filename (str): Path to the text file containing time and H(t) data.
-
-    Returns:
-        np.ndarray: Array of time values.
-        np.ndarray: Array of H(t) values.
-    """
-    times = []
-    H_t = []
-    with open(filename, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith("time"):
-                continue
-            parts = line.split()
-            if len(parts) < 2:
-                print(f"Warning: Skipping invalid data line: {line}")
-                continue
-            try:
-                time = float(parts[0])
-                value = float(parts[1])
-            except ValueError:
-                print(f"Warning: Skipping invalid data line: {line}")
-                continue
-            times.append(time)
-            H_t.append(value)
-    return np.array(times), np.array(H_t)
-
-
-def H_theoretical(t):
-    """
-    Computes the theoretical impulse response H(t) = δ(t) - 10000e^{-10000t}u(t).
-
-    Parameters:
-        t (np.ndarray): Array of time values.
-
-    Returns:
-        np.ndarray: Array of H(t) values.
-    """
-    H_t = np.zeros_like(t)
-    # Correctly set H(t=0) = delta(t) - 10000 = 1 - 10000 = -9999
-    H_t[0] = 1 - 10000  # = -9999
-    # For t > 0, H(t) = -10000 * e^{-10000t}
-    H_t[1:] = -10000 * np.exp(-10000 * t[1:])
-    return H_t
-
-
-def get_yes_no(prompt):
+def load_inverse_fft(filename):
     """
-    Utility function to get a yes/no response from the user.
+    Parses an FFT export and recovers H(t) from it: H(f) is rebuilt from magnitude and
+    phase, resampled to a uniform grid and inverse rFFT'd.
 
     Parameters:
-        prompt (str): The prompt message to display.
+        filename (str): Path to the FFT export.
 
     Returns:
-        str: 'y' for yes or 'n' for no.
+        numpy.ndarray: Times (empty if the export has fewer than two rows).
+        numpy.ndarray: H(t).
     """
-    while True:
-        response = input(prompt).strip().lower()
-        if response in ['y', 'n']:
-            return response
-        else:
-            print("Invalid input. Please enter 'y' or 'n'.")
+    freqs, mags_dB, phases_deg = load_fft_export(filename)
+    if len(freqs) < 2:
+        return np.array([]), np.array([])
+    with stage('compute', filename):
+        return impulse_from_fft(freqs, mags_dB, phases_deg)
 
 
 def main():
-    global saved_x_min, saved_x_max, saved_y_min, saved_y_max
-
-    # Store loaded text file data in a list for reuse.
-    loaded_data_list = []
+    # Loaded data, axis presets and legend labels are kept on disk and restored on the next run
+    session = SessionStore('impulse')
+    session.print_summary()
+    loaded_data_list = session.datasets
+    # Figures and lines are kept and updated in place across plot-again iterations
+    figures = FigureManager()
+    # Files and equations are loaded on background threads while the prompts continue
+    loader = BackgroundLoader()
 
     while True:
+        # Files are parsed afresh each round, in case they changed on disk
+        loader.forget()
         try:
             num_graphs = int(input("How many graphs do you want to plot? "))
             if num_graphs <= 0:
@@ -101,19 +57,35 @@ def main():
         for i in range(num_graphs):
             print(f"\nFor graph {i + 1}:")
             while True:
-                source_type = input("Is this graph from text file (t) or equation (e)? [t/e]: ").strip().lower()
-                if source_type in ['t', 'e']:
+                source_type = input("Is this graph from text file (t), equation (e) or inverse FFT of an FFT export (f)? [t/e/f]: ").strip().lower()
+                if source_type in ['t', 'e', 'f']:
                     break
                 else:
-                    print("Invalid input. Please enter 't' for text file or 'e' for equation.")
+                    print("Invalid input. Please enter 't' for text file, 'e' for equation or 'f' for FFT export.")
 
-            if source_type == 't':
+            if source_type == 'f':
+                any_text_file_used = True
+                # Parsed and inverted in the background while the prompts continue
+                filename = get_existing_path("Enter the FFT export text file name/path: ")
+                plot_sources.append({'type': 'text', 'filename': filename, 'inverse': True,
+                                     'pending': loader.submit(load_inverse_fft, filename)})
+                equation_time_specs.append(None)
+                # Assign label
+                dataset_name = f"{filename} (inverse FFT)"
+                default_label = session.label_for(dataset_name, dataset_name)
+                assign_label = get_yes_no("Do you want to assign a custom name for the legend of this graph? [y/n]: ")
+                if assign_label == 'y':
+                    custom_label = input("Enter legend name: ").strip()
+                else:
+                    custom_label = default_label
+                plot_sources[-1]['label'] = custom_label
+                session.remember_label(dataset_name, custom_label)
+
+            elif source_type == 't':
                 any_text_file_used = True
                 # If text file data used before, prompt if user wants to reuse existing data
                 if len(loaded_data_list) > 0:
-                    print("\nYou have previously loaded text file data:")
-                    for idx, d in enumerate(loaded_data_list):
-                        print(f"{idx}: {d['filename']}")
+                    session.print_datasets()
                     reuse_choice = get_yes_no("Do you want to reuse previously loaded data? [y/n]: ")
                     if reuse_choice == 'y':
                         while True:
@@ -129,7 +101,8 @@ def main():
                         plot_sources.append({'type': 'text', 'data_index': chosen_idx})
                         equation_time_specs.append(None)
                         # Assign label
-                        default_label = loaded_data_list[chosen_idx]['filename']
+                        dataset_name = loaded_data_list[chosen_idx]['filename']
+                        default_label = session.label_for(dataset_name, dataset_name)
                         assign_label = get_yes_no(
                             "Do you want to assign a custom name for the legend of this graph? [y/n]: ")
                         if assign_label == 'y':
@@ -137,35 +110,24 @@ def main():
                         else:
                             custom_label = default_label
                         plot_sources[-1]['label'] = custom_label
+                        session.remember_label(dataset_name, custom_label)
                         continue
 
-                # If not reusing:
-                while True:
-                    filename = input("Enter the text file name/path: ").strip()
-                    try:
-                        times, H_t = load_text_file_data(filename)
-                        if len(times) == 0:
-                            print(f"No valid data found in '{filename}'. Please check the file and try again.")
-                            continue
-                        break
-                    except FileNotFoundError:
-                        print(f"File '{filename}' not found. Please enter a valid file name/path.")
-                    except Exception as e:
-                        print(f"An error occurred while loading the file: {e}")
-                        print("Please ensure the file is in the correct format and try again.")
-
-                loaded_data_list.append(
-                    {'filename': filename, 'times': times, 'H_t': H_t})
-                plot_sources.append({'type': 'text', 'data_index': len(loaded_data_list) - 1})
+                # If not reusing: parse in the background and keep asking questions
+                filename = get_existing_path("Enter the text file name/path: ")
+                plot_sources.append({'type': 'text', 'filename': filename,
+                                     'pending': loader.submit(load_time_export, filename)})
                 equation_time_specs.append(None)
                 # Assign label
-                default_label = filename
+                dataset_name = filename
+                default_label = session.label_for(dataset_name, dataset_name)
                 assign_label = get_yes_no("Do you want to assign a custom name for the legend of this graph? [y/n]: ")
                 if assign_label == 'y':
                     custom_label = input("Enter legend name: ").strip()
                 else:
                     custom_label = default_label
                 plot_sources[-1]['label'] = custom_label
+                session.remember_label(dataset_name, custom_label)
 
             else:
                 # Equation based
@@ -193,6 +155,9 @@ def main():
                         'num_points': num_points,
                         'custom': True
                     }
+                    # The grid is fixed, so the equation can be evaluated right away
+                    eq_params['pending'] = loader.submit(Pipeline(
+                        {'type': 'equation', 'model': 'H', 'range': (t_min, t_max_user, num_points)}).evaluate)
                 else:
                     eq_params = {
                         't_min': 0.0,
@@ -211,6 +176,14 @@ def main():
                     custom_label = default_label
                 plot_sources[-1]['label'] = custom_label
 
+        # Without text files, default equation grids are final as well
+        if not any_text_file_used:
+            for eqp in equation_time_specs:
+                if eqp is not None and 'pending' not in eqp:
+                    eqp['pending'] = loader.submit(Pipeline(
+                        {'type': 'equation', 'model': 'H',
+                         'range': (eqp['t_min'], eqp['t_max_user'], eqp['num_points'])}).evaluate)
+
         # If multiple graphs are requested, ask if combined plot
         combined_plot = False
         if num_graphs > 1:
@@ -220,92 +193,20 @@ def main():
 
         # Removed logarithmic scale options; plots will use linear scales exclusively
 
-        # Before asking for new ranges, check if we have saved ranges
-        current_x_min, current_x_max = saved_x_min, saved_x_max
-        current_y_min, current_y_max = saved_y_min, saved_y_max
-
-        # If we have saved settings, ask if user wants to use them
-        if (saved_x_min is not None or saved_x_max is not None or
-                saved_y_min is not None or saved_y_max is not None):
-            use_saved = get_yes_no("\nDo you want to use previously saved x/y axis ranges? [y/n]: ")
-            if use_saved == 'y':
-                # Use the saved settings
-                x_min, x_max = saved_x_min, saved_x_max
-                y_min, y_max = saved_y_min, saved_y_max
-            else:
-                # Ask new ranges as usual
-                specify_yrange = get_yes_no("Do you want to specify vertical (H(t)) axis range? [y/n]: ")
-                if specify_yrange == 'y':
-                    while True:
-                        try:
-                            y_min = float(input("Enter minimum y-axis value: "))
-                            y_max = float(input("Enter maximum y-axis value: "))
-                            if y_max <= y_min:
-                                print("Maximum y-axis value must be greater than minimum y-axis value.")
-                                continue
-                            break
-                        except ValueError:
-                            print("Invalid input. Please enter numerical values for y-axis range.")
-                else:
-                    y_min = None
-                    y_max = None
-
-                specify_xrange = get_yes_no("Do you want to specify horizontal (time) axis range? [y/n]: ")
-                if specify_xrange == 'y':
-                    while True:
-                        try:
-                            x_min = float(input("Enter minimum x-axis value (s): "))
-                            x_max = float(input("Enter maximum x-axis value (s): "))
-                            if x_max <= x_min:
-                                print("Maximum x-axis value must be greater than minimum x-axis value.")
-                                continue
-                            break
-                        except ValueError:
-                            print("Invalid input. Please enter numerical values for x-axis range.")
-                else:
-                    x_min = None
-                    x_max = None
-
+        # If we have saved axis presets, ask if user wants to use one
+        preset = choose_preset(session, "\nDo you want to use previously saved x/y axis ranges? [y/n]: ")
+        if preset is not None:
+            x_min, x_max, y_min, y_max = preset
         else:
-            # No saved settings, proceed as usual
-            specify_yrange = get_yes_no("\nDo you want to specify vertical (H(t)) axis range? [y/n]: ")
-            if specify_yrange == 'y':
-                while True:
-                    try:
-                        y_min = float(input("Enter minimum y-axis value: "))
-                        y_max = float(input("Enter maximum y-axis value: "))
-                        if y_max <= y_min:
-                            print("Maximum y-axis value must be greater than minimum y-axis value.")
-                            continue
-                        break
-                    except ValueError:
-                        print("Invalid input. Please enter numerical values for y-axis range.")
-            else:
-                y_min = None
-                y_max = None
-
-            specify_xrange = get_yes_no("Do you want to specify horizontal (time) axis range? [y/n]: ")
-            if specify_xrange == 'y':
-                while True:
-                    try:
-                        x_min = float(input("Enter minimum x-axis value (s): "))
-                        x_max = float(input("Enter maximum x-axis value (s): "))
-                        if x_max <= x_min:
-                            print("Maximum x-axis value must be greater than minimum x-axis value.")
-                            continue
-                        break
-                    except ValueError:
-                        print("Invalid input. Please enter numerical values for x-axis range.")
-            else:
-                x_min = None
-                x_max = None
+            # No saved settings used, proceed as usual
+            y_min, y_max = get_range("\nDo you want to specify vertical (H(t)) axis range? [y/n]: ", "y-axis")
+            x_min, x_max = get_range("Do you want to specify horizontal (time) axis range? [y/n]: ", "x-axis", "s")
 
         # After setting ranges, ask if user wants to save these settings
         if (x_min is not None or x_max is not None or y_min is not None or y_max is not None):
             save_settings = get_yes_no("\nDo you want to save these x/y axis settings for future plotting? [y/n]: ")
             if save_settings == 'y':
-                saved_x_min, saved_x_max = x_min, x_max
-                saved_y_min, saved_y_max = y_min, y_max
+                save_preset(session, x_min, x_max, y_min, y_max)
             else:
                 # Do not change saved settings
                 pass
@@ -313,6 +214,22 @@ def main():
             # If no range set, no prompt needed to save
             pass
 
+        # Files parsed in the background are needed from here on
+        for ps in plot_sources:
+            if 'pending' not in ps:
+                continue
+            if ps.pop('inverse', False):
+                filename, (times, H_t) = wait_for_file(
+                    loader, ps.pop('pending'), ps['filename'], load_inverse_fft,
+                    "Enter the FFT export text file name/path: ")
+                print(f"\n[INFO] Recovered H(t) from '{filename}': {len(times)} points, dt = {times[1]:.6g} s.")
+                ps['data_index'] = session.add_dataset(
+                    {'filename': f"{filename} (inverse FFT)", 'times': times, 'H_t': H_t}, source_path=filename)
+            else:
+                filename, (times, H_t) = wait_for_file(
+                    loader, ps.pop('pending'), ps['filename'], load_time_export, "Enter the text file name/path: ")
+                ps['data_index'] = session.add_dataset({'filename': filename, 'times': times, 'H_t': H_t})
+
         # Step 2: Determine time range from text files if any
         if any_text_file_used:
             max_time = 0.0
@@ -358,9 +275,10 @@ def main():
                     print(f"  Maximum Time: {eqp['t_max_user']} s")
                     print(f"  Number of Points: {eqp['num_points']}\n")
 
-        # Prepare plotting
-        if combined_plot:
-            plt.figure(figsize=(10, 6))
+        # Prepare plotting: x and y limits are applied only if both ends are specified
+        xlim = [x_min, x_max] if x_min is not None and x_max is not None else None
+        ylim = [y_min, y_max] if y_min is not None and y_max is not None else None
+        figures.begin()
 
         # Step 4: Plot each graph
         for i, (ps, eqp) in enumerate(zip(plot_sources, equation_time_specs)):
@@ -369,27 +287,24 @@ def main():
                 final_max_time = eqp['t_max_user']
                 final_num_points = eqp['num_points']
 
-                t = np.linspace(t_min, final_max_time, final_num_points)
-                H_t = H_theoretical(t)
+                if 'pending' in eqp:
+                    # Evaluated in the background during the prompts
+                    trace = loader.wait(eqp.pop('pending'), f"Equation {i + 1}")
+                    t, H_t = trace['x'], trace['y']
+                else:
+                    t = np.linspace(t_min, final_max_time, final_num_points)
+                    with stage('compute', f"Equation {i + 1}", input_bytes=t.nbytes):
+                        H_t = H_theoretical(t)
 
                 label_str = ps.get('label', f"Equation {i + 1}")
 
-                if combined_plot:
-                    plt.plot(t, H_t, label=label_str)
-                else:
-                    plt.figure(figsize=(10, 6))
-                    plt.plot(t, H_t, label=label_str)
-                    # Apply x and y limits if specified
-                    if x_min is not None and x_max is not None:
-                        plt.xlim([x_min, x_max])
-                    if y_min is not None and y_max is not None:
-                        plt.ylim([y_min, y_max])
-                    plt.xlabel("Time (s)")
-                    plt.ylabel("H(t)")
-                    plt.title(r"Impulse Response from Equation: $H(t) = \delta(t) - 10000 e^{-10000t} u(t)$")
-                    plt.grid(True, which="both", ls="--")
-                    plt.legend()
-                    plt.show()
+                with stage('render', label_str):
+                    if combined_plot:
+                        figures.set_line('combined', ('equation', i), t, H_t, label=label_str)
+                    else:
+                        figures.set_line(('single', i), ('equation', i), t, H_t, label=label_str)
+                        figures.finish(('single', i), "Time (s)", "H(t)",
+                                       r"Impulse Response from Equation: $H(t) = \delta(t) - 10000 e^{-10000t} u(t)$", xlim=xlim, ylim=ylim)
 
             elif ps['type'] == 'text':
                 data_idx = ps['data_index']
@@ -398,39 +313,27 @@ def main():
 
                 label_str = ps.get('label', loaded_data_list[data_idx]['filename'])
 
-                if combined_plot:
-                    plt.plot(times, H_t, label=label_str)
-                else:
-                    plt.figure(figsize=(10, 6))
-                    plt.plot(times, H_t, label=label_str)
-                    # Apply x and y limits if specified
-                    if x_min is not None and x_max is not None:
-                        plt.xlim([x_min, x_max])
-                    if y_min is not None and y_max is not None:
-                        plt.ylim([y_min, y_max])
-                    plt.xlabel("Time (s)")
-                    plt.ylabel("H(t)")
-                    plt.title("Impulse Response from Text File Data")
-                    plt.grid(True, which="both", ls="--")
-                    plt.legend()
-                    plt.show()
+                with stage('render', label_str):
+                    if combined_plot:
+                        figures.set_line('combined', ('text', i), times, H_t, label=label_str)
+                    else:
+                        figures.set_line(('single', i), ('text', i), times, H_t, label=label_str)
+                        figures.finish(('single', i), "Time (s)", "H(t)",
+                                       "Impulse Response from Text File Data", xlim=xlim, ylim=ylim)
 
         if combined_plot:
-            if x_min is not None and x_max is not None:
-                plt.xlim([x_min, x_max])
-            if y_min is not None and y_max is not None:
-                plt.ylim([y_min, y_max])
-            plt.xlabel("Time (s)")
-            plt.ylabel("H(t)")
-            plt.title(r"Combined Impulse Response Plots: $H(t) = \delta(t) - 10000 e^{-10000t} u(t)$")
-            plt.grid(True, which="both", ls="--")
-            plt.legend()
-            plt.show()
+            with stage('render', 'combined'):
+                figures.finish('combined', "Time (s)", "H(t)",
+                               r"Combined Impulse Response Plots: $H(t) = \delta(t) - 10000 e^{-10000t} u(t)$", xlim=xlim, ylim=ylim)
+        with stage('show'):
+            figures.show()
 
         # After plotting, ask user if they want to continue
         cont_choice = get_yes_no("\nDo you want to plot again? [y/n]: ")
         if cont_choice != 'y':
             print("Exiting the plotting tool. Goodbye!")
+            loader.close()
+            figures.show_and_close()
             break
 
 
@@ -1,6 +1,8 @@
 import numpy as np
 import matplotlib.pyplot as plt
 
+from plotCore import convolution_integral
+
 # Parameters
 R = 100.0  # Ohms
 L = 1e-3  # Henry
@@ -34,26 +36,9 @@ S_values = S_vec(t)
 # Define Vo(t) based on integral
 # Vo(t) = S(t) - (R/L)*Integral_0^{min(t,2ms)} S(tau)*exp(-(R/L)*(t-tau)) d tau
 
-Vo = np.zeros_like(t)
-
-for i, ti in enumerate(t):
-    # First get the delta part: S(ti)
-    part_delta = S(ti)
-
-    # Determine integration limits
-    upper_limit = min(ti, 2e-3)
-
-    if upper_limit <= 0:
-        # no integral contribution if t<0
-        integral_part = 0
-    else:
-        # We integrate from tau=0 to tau=upper_limit
-        # We'll do numeric integration:
-        tau_values = np.arange(0, upper_limit, dt)
-        integrand = S_vec(tau_values) * np.exp(-(R / L) * (ti - tau_values))
-        integral_part = np.trapz(integrand, tau_values)  # numerical integration using trapezoidal rule
-
-    Vo[i] = part_delta - (R / L) * integral_part
+# The integral is evaluated for every t at once (one cumulative sum), with the same
+# trapezoidal rule over np.arange(0, min(t, 2ms), dt) as a per-sample np.trapz loop
+Vo = convolution_integral(t, S_values, R, L, t_stop=2e-3)
 
 # Plot
 plt.figure(figsize=(10, 6))
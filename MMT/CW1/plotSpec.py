@@ -0,0 +1,183 @@
+import argparse
+import copy
+import json
+import os
+import time
+
+# Figure keys copied straight into the plot job when present
+JOB_KEYS = ['kind', 'scale', 'log_x', 'x_range', 'y_range', 'title', 'xlabel', 'ylabel', 'figsize', 'dpi']
+
+
+def load_spec(filename):
+    """
+    Reads a plot spec from a JSON or TOML file (chosen by extension).
+
+    A spec captures every answer the interactive tools prompt for:
+        'defaults' (dict): Job keys applied to every figure, e.g. kind, scale, log_x.
+        'sources' (dict): Named sources, each a batchRender source ('type' of 'text',
+            'spectrum' or 'equation', with 'path' or 'model', optional 'range',
+            'window' and 'label').
+        'axis_presets' (dict): Named {'x_range': [...], 'y_range': [...]} settings, the
+            file form of the "save settings" prompt.
+        'figures' (list of dict): Each lists 'sources' (names, or {'source': name,
+            'label': ...} to override the legend), an optional 'axes' preset name,
+            'output' (image file; omit to show the figure in a window), 'title' and
+            any other job key. 'combined': false gives one figure per source, like
+            answering 'n' to "Plot all graphs on the same figure?".
+
+    Parameters:
+        filename (str): Path of the spec file.
+
+    Returns:
+        dict: The parsed spec.
+    """
+    if os.path.splitext(filename)[1].lower() == '.toml':
+        import tomllib
+        with open(filename, 'rb') as f:
+            return tomllib.load(f)
+    with open(filename, 'r') as f:
+        return json.load(f)
+
+
+def _resolve_source(spec, entry):
+    """Turns a figure's source entry (a name or a dict) into a batchRender source."""
+    if isinstance(entry, str):
+        entry = {'source': entry}
+    name = entry['source']
+    if name not in spec.get('sources', {}):
+        raise ValueError(f"Figure refers to unknown source '{name}'.")
+    source = copy.deepcopy(spec['sources'][name])
+    source.setdefault('label', name)
+    if 'label' in entry:
+        source['label'] = entry['label']
+    return source
+
+
+def _numbered_output(output, index):
+    """Adds a _1, _2, ... suffix before the extension of an output path."""
+    if not output:
+        return output
+    root, ext = os.path.splitext(output)
+    return f"{root}_{index}{ext}"
+
+
+def expand_spec(spec):
+    """
+    Expands a spec into a flat list of batchRender plot jobs.
+
+    Parameters:
+        spec (dict): Parsed spec, see load_spec.
+
+    Returns:
+        list of dict: Plot jobs, in figure order.
+    """
+    defaults = spec.get('defaults', {})
+    presets = spec.get('axis_presets', {})
+    jobs = []
+    for number, figure in enumerate(spec.get('figures', []), start=1):
+        job = {key: defaults[key] for key in JOB_KEYS if key in defaults}
+        if 'axes' in figure:
+            if figure['axes'] not in presets:
+                raise ValueError(f"Figure {number} refers to unknown axis preset '{figure['axes']}'.")
+            job.update(presets[figure['axes']])
+        job.update({key: figure[key] for key in JOB_KEYS if key in figure})
+        if 'output' in figure:
+            job['output'] = figure['output']
+
+        sources = [_resolve_source(spec, entry) for entry in figure.get('sources', [])]
+        if not sources:
+            raise ValueError(f"Figure {number} has no sources.")
+        if figure.get('combined', True):
+            jobs.append(dict(job, sources=sources))
+        else:
+            for i, source in enumerate(sources, start=1):
+                jobs.append(dict(job, sources=[source], output=_numbered_output(job.get('output'), i)))
+    return jobs
+
+
+def run_spec(spec, processes=None):
+    """
+    Runs every figure of a spec in one go.
+
+    Sources and equations are loaded and evaluated once in this process through a cache
+    shared by all figures, so a file used by several figures is parsed a single time.
+    Figures with an 'output' are then drawn and saved on a pool of worker processes;
+    the rest are shown in windows at the end. A figure whose sources fail to load or
+    evaluate is skipped and reported as an error result; the others still render.
+
+    Parameters:
+        spec (dict): Parsed spec, see load_spec.
+        processes (int): Number of render processes; None uses every CPU.
+
+    Returns:
+        list of dict: Render results for the saved figures (see batchRender.render_job),
+            followed by one error result per figure whose sources failed.
+        float: Wall time in seconds.
+    """
+    from batchRender import job_curves, render_jobs
+
+    start = time.perf_counter()
+    jobs = expand_spec(spec)
+    cache = {}
+    saved, shown, failed = [], [], []
+    for job in jobs:
+        job_start = time.perf_counter()
+        try:
+            curves = job_curves(job, cache)
+        except Exception as e:
+            # Like render_job: a broken figure is reported, the others still render
+            failed.append({'output': job.get('output') or job.get('title', "(window)"),
+                           'seconds': time.perf_counter() - job_start,
+                           'error': f"{type(e).__name__}: {e}"})
+            continue
+        (saved if job.get('output') else shown).append((job, curves))
+
+    results = []
+    if saved:
+        results = render_jobs([job for job, _ in saved], processes, [curves for _, curves in saved])
+    results += failed
+    wall_seconds = time.perf_counter() - start
+
+    if shown:
+        import matplotlib.pyplot as plt
+        from batchRender import draw_job
+        from stageTrace import stage
+
+        for job, curves in shown:
+            with stage('render', job.get('title')):
+                fig = plt.figure(figsize=tuple(job.get('figsize', (10, 6))))
+                draw_job(fig.gca(), job, curves)
+        with stage('show'):
+            plt.show()
+    return results, wall_seconds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a declarative JSON/TOML plot spec unattended.")
+    parser.add_argument('spec', help="JSON or TOML plot spec")
+    parser.add_argument('-p', '--processes', type=int, default=None,
+                        help="number of render processes (default: one per CPU)")
+    parser.add_argument('--list', action='store_true', help="print the expanded plot jobs and exit")
+    parser.add_argument('--trace', metavar='FILE', help="time each stage and write a Chrome trace to FILE")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="also record each stage's peak memory (implies --trace trace.json if not given)")
+    args = parser.parse_args(argv)
+    if args.trace or args.trace_memory:
+        from stageTrace import enable
+        enable(args.trace or 'trace.json', memory=args.trace_memory)
+
+    spec = load_spec(args.spec)
+    if args.list:
+        print(json.dumps(expand_spec(spec), indent=2))
+        return 0
+
+    from batchRender import print_render_report
+
+    results, wall_seconds = run_spec(spec, args.processes)
+    if results:
+        print_render_report(results, wall_seconds)
+    return 0 if all(result['error'] is None for result in results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
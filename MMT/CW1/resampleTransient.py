@@ -0,0 +1,231 @@
+import numpy as np
+
+from compareTheory import interp_sorted
+
+# Resampling methods offered by resample_uniform
+RESAMPLE_METHODS = ['linear', 'cubic', 'sinc']
+
+# Half-width (in kernel steps) and Kaiser window shape of the 'sinc' method's kernel
+SINC_HALF_WIDTH = 16
+SINC_KAISER_BETA = 8.0
+
+# Kernel weights the 'sinc' method evaluates at a time
+SINC_BLOCK_TAPS = 1 << 22
+
+# Number of output samples processed per chunk
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+def _hermite_slopes(t, y):
+    """
+    Slopes for cubic Hermite interpolation on a non-uniform grid: the step-weighted
+    average of the neighbouring secant slopes, one-sided at the ends.
+    """
+    h = np.diff(t)
+    secant = np.divide(np.diff(y), h, out=np.zeros_like(h), where=h != 0)
+    slopes = np.empty_like(y)
+    slopes[0] = secant[0]
+    slopes[-1] = secant[-1]
+    h_sum = h[:-1] + h[1:]
+    slopes[1:-1] = np.divide(secant[1:] * h[:-1] + secant[:-1] * h[1:], h_sum,
+                             out=np.zeros_like(h_sum), where=h_sum != 0)
+    return slopes
+
+
+def _cubic(tu, t, y):
+    """Cubic Hermite interpolation of (t, y) at tu."""
+    if len(t) < 3:
+        return interp_sorted(tu, t, y)
+    slopes = _hermite_slopes(t, y)
+    idx = np.searchsorted(t, tu, side='right') - 1
+    np.clip(idx, 0, len(t) - 2, out=idx)
+    h = t[idx + 1] - t[idx]
+    s = np.divide(tu - t[idx], h, out=np.zeros_like(tu), where=h != 0)
+    np.clip(s, 0.0, 1.0, out=s)
+    s2 = s * s
+    s3 = s2 * s
+    return ((2 * s3 - 3 * s2 + 1) * y[idx] + (s3 - 2 * s2 + s) * h * slopes[idx]
+            + (-2 * s3 + 3 * s2) * y[idx + 1] + (s3 - s2) * h * slopes[idx + 1])
+
+
+def _uniform_step(times, rtol=1e-6):
+    """The step of an evenly spaced time vector, or None if its steps vary."""
+    mean_step = (times[-1] - times[0]) / (len(times) - 1)
+    if mean_step > 0 and np.ptp(np.diff(times)) <= rtol * mean_step:
+        return mean_step
+    return None
+
+
+def _sinc(tu, grid_start, grid_step, z, scale):
+    """
+    Windowed-sinc interpolation at tu of samples z on the uniform grid
+    grid_start + grid_step * m.
+
+    The kernel is a Kaiser-windowed sinc stretched to scale (at least grid_step): at
+    scale == grid_step it reconstructs the band-limited signal, and a larger scale also
+    low-passes to the output grid's Nyquist frequency so decimating does not alias.
+    The weights are normalised so DC is preserved.
+    """
+    taps = int(np.ceil(SINC_HALF_WIDTH * scale / grid_step))
+    offsets = np.arange(-taps, taps + 1)
+    block = max(1, SINC_BLOCK_TAPS // len(offsets))
+    out = np.empty_like(tu)
+    for start in range(0, len(tu), block):
+        pos = (tu[start:start + block] - grid_start) / grid_step
+        m = np.rint(pos).astype(np.int64)[:, None] + offsets
+        x = (pos[:, None] - m) * (grid_step / scale)
+        valid = (m >= 0) & (m < len(z)) & (np.abs(x) < SINC_HALF_WIDTH)
+        np.clip(m, 0, len(z) - 1, out=m)
+        window = np.i0(SINC_KAISER_BETA * np.sqrt(np.clip(1.0 - (x / SINC_HALF_WIDTH) ** 2, 0.0, None)))
+        weights = np.where(valid, np.sinc(x) * window, 0.0)
+        out[start:start + block] = (weights * z[m]).sum(axis=1) / weights.sum(axis=1)
+    return out
+
+
+def iter_resample_chunks(times, values, dt=None, method='linear', chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Resamples a (possibly non-uniform) trace onto a uniform grid, chunk by chunk.
+
+    Only one chunk of output samples and the input samples around it are touched at a
+    time, so temporaries stay bounded however long the trace is.
+
+    Parameters:
+        times (np.ndarray): Sorted time values (repeated times are allowed).
+        values (np.ndarray): Signal values.
+        dt (float): Uniform step. Defaults to the mean input step.
+        method (str): One of RESAMPLE_METHODS.
+        chunk_size (int): Number of output samples per chunk.
+
+    Yields:
+        np.ndarray: Uniform time values of the chunk.
+        np.ndarray: Resampled values of the chunk.
+    """
+    if method not in RESAMPLE_METHODS:
+        raise ValueError(f"Unknown resampling method '{method}'. Choose one of {RESAMPLE_METHODS}.")
+    times = np.asarray(times, dtype=float)
+    values = np.asarray(values, dtype=float)
+    if len(times) < 2:
+        raise ValueError("At least two samples are needed to resample a trace.")
+
+    t0 = times[0]
+    if dt is None:
+        dt = (times[-1] - t0) / (len(times) - 1)
+    if dt <= 0:
+        raise ValueError("The time step must be positive.")
+    num_points = int(np.floor((times[-1] - t0) / dt * (1 + 1e-12))) + 1
+    margin = {'linear': 1, 'cubic': 2, 'sinc': 2}[method]
+    reach = 0.0
+    if method == 'sinc':
+        # The kernel runs on a uniform grid: the input itself if it is evenly spaced,
+        # otherwise a cubic resampling of it at the finer of dt and the median step
+        grid_step = _uniform_step(times)
+        on_input_grid = grid_step is not None
+        if not on_input_grid:
+            steps = np.diff(times)
+            grid_step = min(dt, float(np.median(steps[steps > 0])))
+        scale = max(grid_step, dt)
+        reach = SINC_HALF_WIDTH * scale + grid_step
+
+    for start in range(0, num_points, chunk_size):
+        stop = min(start + chunk_size, num_points)
+        tu = t0 + dt * np.arange(start, stop)
+        lo = max(int(np.searchsorted(times, tu[0] - reach)) - margin, 0)
+        hi = min(int(np.searchsorted(times, tu[-1] + reach, side='right')) + margin, len(times))
+        t_slice = times[lo:hi]
+        y_slice = values[lo:hi]
+        if method == 'linear':
+            yield tu, interp_sorted(tu, t_slice, y_slice)
+        elif method == 'cubic':
+            yield tu, _cubic(tu, t_slice, y_slice)
+        else:
+            if on_input_grid:
+                yu = _sinc(tu, t_slice[0], grid_step, y_slice, scale)
+            else:
+                grid = t0 + grid_step * np.arange(np.ceil((t_slice[0] - t0) / grid_step),
+                                                  np.floor((t_slice[-1] - t0) / grid_step) + 1)
+                yu = _sinc(tu, grid[0], grid_step, _cubic(grid, t_slice, y_slice), scale)
+            # Within a kernel half-width of either end the kernel is cut off by the end of
+            # the data, which rings far worse than cubic does there
+            edge = (tu < times[0] + reach) | (tu > times[-1] - reach)
+            if edge.any():
+                yu[edge] = _cubic(tu[edge], t_slice, y_slice)
+            yield tu, yu
+
+
+def exact_sample_mask(uniform_times, times, tol):
+    """
+    Flags uniform samples that coincide with an input sample to within tol.
+
+    Parameters:
+        uniform_times (np.ndarray): Uniform time values.
+        times (np.ndarray): Sorted input time values.
+        tol (float): Absolute time tolerance.
+
+    Returns:
+        np.ndarray: Boolean mask, True where the value was captured exactly.
+    """
+    idx = np.searchsorted(times, uniform_times)
+    right = times[np.minimum(idx, len(times) - 1)]
+    left = times[np.maximum(idx - 1, 0)]
+    nearest = np.minimum(np.abs(right - uniform_times), np.abs(uniform_times - left))
+    return nearest <= tol
+
+
+def resample_uniform(times, values, dt=None, method='linear', chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Resamples a variable-timestep LTspice transient onto a uniform grid.
+
+    Parameters:
+        times (np.ndarray): Sorted time values.
+        values (np.ndarray): Signal values.
+        dt (float): Uniform step. Defaults to the mean input step.
+        method (str): 'linear', 'cubic' (Hermite) or 'sinc' (band-limited, Kaiser-windowed
+            sinc; uneven input is first put on a uniform grid with 'cubic', and samples
+            within the kernel half-width of either end fall back to 'cubic').
+        chunk_size (int): Number of output samples processed at a time.
+
+    Returns:
+        np.ndarray: Uniform time values.
+        np.ndarray: Resampled signal values.
+        dict: Report with 'dt', 'num_points', 'exact_points', 'interpolated_points',
+            'exact_fraction', 'interpolated_fraction' and 'max_input_step'. The
+            fractions are of the uniform samples, i.e. of the signal's time span.
+    """
+    times = np.asarray(times, dtype=float)
+    if dt is None and len(times) > 1:
+        dt = (times[-1] - times[0]) / (len(times) - 1)
+
+    t_parts = []
+    y_parts = []
+    exact_points = 0
+    for tu, yu in iter_resample_chunks(times, values, dt, method, chunk_size):
+        exact_points += int(np.count_nonzero(exact_sample_mask(tu, times, 1e-6 * dt)))
+        t_parts.append(tu)
+        y_parts.append(yu)
+
+    uniform_times = np.concatenate(t_parts)
+    uniform_values = np.concatenate(y_parts)
+    num_points = len(uniform_times)
+    report = {
+        'dt': float(dt),
+        'num_points': num_points,
+        'exact_points': exact_points,
+        'interpolated_points': num_points - exact_points,
+        'exact_fraction': exact_points / num_points,
+        'interpolated_fraction': 1.0 - exact_points / num_points,
+        'max_input_step': float(np.max(np.diff(times))),
+    }
+    return uniform_times, uniform_values, report
+
+
+def print_resample_report(report):
+    """
+    Prints a short summary of a resample_uniform report.
+
+    Parameters:
+        report (dict): Report returned by resample_uniform.
+    """
+    print(f"\n[INFO] Resampled onto a uniform grid of {report['num_points']} points (dt = {report['dt']:.6g} s):")
+    print(f"  Captured exactly: {100 * report['exact_fraction']:.2f}% of the time span")
+    print(f"  Interpolated:     {100 * report['interpolated_fraction']:.2f}% of the time span")
+    print(f"  Largest input step: {report['max_input_step']:.6g} s ({report['max_input_step'] / report['dt']:.3g} x dt)")
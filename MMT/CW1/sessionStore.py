@@ -0,0 +1,368 @@
+import argparse
+import json
+import os
+import shutil
+
+import numpy as np
+
+from datasetRegistry import DatasetRegistry, content_hash, format_bytes
+from plotCore import get_yes_no
+
+# Root directory of the session stores; overridden by the PLOT_SESSION_DIR environment variable
+DEFAULT_SESSION_DIR = os.path.join('~', '.plot_sessions')
+
+# Name used for axis settings saved without an explicit name
+DEFAULT_PRESET = 'default'
+
+STATE_FILE = 'session.json'
+
+# Default cap on the on-disk dataset copies of one session; overridden by the
+# PLOT_SESSION_BUDGET_MB environment variable
+DEFAULT_DISK_BUDGET_MB = 4096
+
+
+def disk_budget_bytes():
+    """
+    Returns the configured cap on a session's on-disk dataset copies.
+
+    Returns:
+        int: Budget in bytes.
+    """
+    try:
+        budget_mb = float(os.environ.get('PLOT_SESSION_BUDGET_MB', DEFAULT_DISK_BUDGET_MB))
+    except ValueError:
+        budget_mb = DEFAULT_DISK_BUDGET_MB
+    return int(budget_mb * 1024 * 1024)
+
+
+def session_dir(tool):
+    """
+    Returns the directory holding the session of one tool.
+
+    Parameters:
+        tool (str): Tool name, e.g. 'fft'.
+
+    Returns:
+        str: Directory path (not necessarily existing yet).
+    """
+    root = os.environ.get('PLOT_SESSION_DIR') or os.path.expanduser(DEFAULT_SESSION_DIR)
+    return os.path.join(root, tool)
+
+
+def _file_stamp(path):
+    """Size and modification time of a source file, or None if it cannot be read."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _record_digest(record):
+    """Content hash of a dataset record (older sessions did not store it)."""
+    return record.get('hash') or ':'.join(sorted(record['arrays'].values()))
+
+
+def _record_key(record):
+    """
+    What a record was derived from: its source file, array fields and other settings
+    (e.g. the window of a spectrum). A record with the same key but other contents is
+    an outdated copy of the same dataset.
+    """
+    meta = tuple(sorted((key, value) for key, value in record['meta'].items() if key != 'filename'))
+    return record.get('source_path'), tuple(sorted(record['arrays'])), meta
+
+
+def _json_value(value):
+    """Converts a dataset field to something json can store, or raises TypeError."""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    raise TypeError(type(value).__name__)
+
+
+class SessionStore:
+    """
+    On-disk working set of an interactive tool: loaded datasets, named axis presets and
+    legend labels. It replaces the module-level saved_x_min/... globals and the
+    in-memory loaded_data_list, so a restarted tool picks up where the last one ended.
+
+    Each dataset is a dict like the entries of the old loaded_data_list. Its arrays are
+    written once as .npy files named by their content hash and memory-mapped on
+    restore, so restoring does not re-parse or even read the data until it is plotted.
+    Source files are recorded by absolute path, so a session restored from another
+    working directory still finds them. Datasets whose source file changed since they
+    were cached are dropped on restore, and loading a changed file again replaces its
+    dataset in place. The .npy copies are kept within a disk budget: on restore, the
+    least recently used datasets beyond it are dropped.
+    self.datasets is a DatasetRegistry, which keeps the arrays in memory within a
+    budget and shares them between identical datasets.
+    """
+
+    def __init__(self, tool, directory=None, budget_bytes=None, disk_budget=None):
+        """
+        Parameters:
+            tool (str): Tool name, used for the default directory.
+            directory (str): Session directory, or None for session_dir(tool).
+            budget_bytes (int): Memory cap for the datasets, or None for the default.
+            disk_budget (int): Cap on the .npy copies in bytes, or None for
+                disk_budget_bytes().
+        """
+        self.directory = directory or session_dir(tool)
+        self.datasets = DatasetRegistry(budget_bytes)
+        self.disk_budget = disk_budget_bytes() if disk_budget is None else disk_budget
+        self.presets = {}
+        self.labels = {}
+        # One record per dataset, at the dataset's index in self.datasets
+        self._records = []
+        self.stale = []
+        self.trimmed = []
+        self._restore()
+
+    def _restore(self):
+        path = os.path.join(self.directory, STATE_FILE)
+        try:
+            with open(path, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.presets = state.get('presets', {})
+        self.labels = state.get('labels', {})
+        records, dropped = self._within_disk_budget(state.get('datasets', []))
+        self.trimmed = [record['meta'].get('filename', record.get('source_path')) for record in dropped]
+        for record in records:
+            source = record.get('source_path')
+            name = record['meta'].get('filename', source)
+            if source is not None and record.get('stamp') is not None and _file_stamp(source) != record['stamp']:
+                self.stale.append(name)
+                dropped.append(record)
+                continue
+            paths = {key: os.path.join(self.directory, file) for key, file in record['arrays'].items()}
+            digest = _record_digest(record)
+            # Identical datasets share the arrays mapped for the first of them
+            if self.datasets.paths(digest) is None:
+                try:
+                    arrays = {key: np.load(path, mmap_mode='r') for key, path in paths.items()}
+                except (OSError, ValueError):
+                    self.stale.append(name)
+                    continue
+            else:
+                arrays = {}
+            self.datasets.add({**record['meta'], **arrays}, digest, paths)
+            self._records.append(record)
+        if self.stale or self.trimmed:
+            self._remove_unused_arrays(dropped)
+            self.save()
+
+    def _within_disk_budget(self, records):
+        """
+        Splits saved records (least recently used first) into the most recently used
+        ones whose .npy files fit the disk budget and the older ones beyond it.
+        """
+        kept = []
+        counted = set()
+        total = 0
+        for pos in range(len(records) - 1, -1, -1):
+            files = set(records[pos]['arrays'].values()) - counted
+            total += sum(_file_size(os.path.join(self.directory, file)) for file in files)
+            if total > self.disk_budget:
+                return kept[::-1], records[:pos + 1]
+            counted |= files
+            kept.append(records[pos])
+        return kept[::-1], []
+
+    def _remove_unused_arrays(self, dropped):
+        in_use = {file for record in self._records for file in record['arrays'].values()}
+        for record in dropped:
+            for file in record['arrays'].values():
+                if file not in in_use:
+                    try:
+                        os.remove(os.path.join(self.directory, file))
+                    except OSError:
+                        pass
+
+    def save(self):
+        """Writes the session state; the file is replaced atomically."""
+        os.makedirs(self.directory, exist_ok=True)
+        # Datasets are written least recently used first, the order the disk budget trims in
+        rank = {digest: pos for pos, digest in enumerate(self.datasets.usage_order())}
+        records = sorted(self._records, key=lambda record: rank.get(_record_digest(record), -1))
+        state = {'presets': self.presets, 'labels': self.labels, 'datasets': records}
+        path = os.path.join(self.directory, STATE_FILE)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(state, f, indent=1)
+        os.replace(path + '.tmp', path)
+
+    def add_dataset(self, entry, source_path=None):
+        """
+        Adds a loaded dataset to the session and caches its arrays on disk.
+
+        Loading the same file with the same contents again returns the existing dataset,
+        and loading it after it changed replaces that dataset at the same index; a
+        different file with identical contents gets its own entry sharing the arrays.
+
+        Parameters:
+            entry (dict): Dataset, e.g. {'filename': ..., 'freqs': ..., 'mags_dB': ...}.
+                Array fields are cached; other fields must be plain scalars or strings.
+            source_path (str): File the dataset was parsed from, checked for changes on
+                restore. Defaults to entry['filename'].
+
+        Returns:
+            int: Index of the dataset in self.datasets.
+        """
+        arrays = {key: value for key, value in entry.items() if isinstance(value, np.ndarray)}
+        meta = {key: _json_value(value) for key, value in entry.items() if key not in arrays}
+        digest = content_hash(arrays)
+        source_path = entry.get('filename') if source_path is None else source_path
+        if source_path:
+            source_path = os.path.abspath(source_path)
+        files = {key: f"{digest}_{key}.npy" for key in arrays}
+        record = {'meta': meta, 'arrays': files, 'hash': digest, 'source_path': source_path,
+                  'stamp': _file_stamp(source_path) if source_path else None}
+
+        key = _record_key(record)
+        index = next((idx for idx, old in enumerate(self._records) if _record_key(old) == key), None)
+        if index is not None and _record_digest(self._records[index]) == digest:
+            return index
+        if index is None:
+            existing = self.datasets.find(digest, entry.get('filename'))
+            if existing is not None:
+                return existing
+
+        if self.datasets.paths(digest) is None:
+            os.makedirs(self.directory, exist_ok=True)
+            for field, value in arrays.items():
+                np.save(os.path.join(self.directory, files[field]), value)
+
+        paths = {field: os.path.join(self.directory, file) for field, file in files.items()}
+        if index is None:
+            self._records.append(record)
+            index = self.datasets.add(entry, digest, paths)
+        else:
+            # The file changed since it was loaded: its dataset is replaced in place
+            outdated = self._records[index]
+            self._records[index] = record
+            self.datasets.replace(index, entry, digest, paths)
+            self._remove_unused_arrays([outdated])
+        self.save()
+        return index
+
+    def set_preset(self, name, x_min, x_max, y_min, y_max):
+        """
+        Saves named axis ranges (None for an unset limit).
+
+        Parameters:
+            name (str): Preset name.
+            x_min, x_max, y_min, y_max (float): Axis limits.
+        """
+        # Re-inserted so the most recently saved preset comes last
+        self.presets.pop(name, None)
+        self.presets[name] = [x_min, x_max, y_min, y_max]
+        self.save()
+
+    def label_for(self, filename, default):
+        """Returns the legend label last used for a dataset, or default."""
+        return self.labels.get(os.path.abspath(filename), default)
+
+    def remember_label(self, filename, label):
+        """Stores the legend label chosen for a dataset, keyed like its source path."""
+        key = os.path.abspath(filename)
+        if self.labels.get(key) != label:
+            self.labels[key] = label
+            self.save()
+
+    def clear(self):
+        """Deletes the whole session, on disk and in memory."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.datasets = DatasetRegistry(self.datasets.budget_bytes)
+        self.presets = {}
+        self.labels = {}
+        self._records = []
+        self.stale = []
+        self.trimmed = []
+
+    def print_summary(self):
+        """Prints what was restored from the previous session."""
+        if self.stale:
+            print(f"[INFO] Dropped {len(self.stale)} cached dataset(s) whose files changed: {', '.join(self.stale)}")
+        if self.trimmed:
+            print(f"[INFO] Dropped {len(self.trimmed)} least recently used dataset(s) over the "
+                  f"{format_bytes(self.disk_budget)} disk budget: {', '.join(map(str, self.trimmed))}")
+        if len(self.datasets) or self.presets:
+            print(f"[INFO] Restored {len(self.datasets)} dataset(s) and {len(self.presets)} axis preset(s) "
+                  f"from '{self.directory}'.")
+
+    def print_datasets(self):
+        """Lists the loaded datasets with their size and the resident memory, for the reuse prompt."""
+        print(f"\nYou have previously loaded text file data ({self.datasets.footprint_line()}):")
+        for idx, d in enumerate(self.datasets):
+            num_bytes, resident = self.datasets.dataset_bytes(idx)
+            print(f"{idx}: {d['filename']} [{format_bytes(num_bytes)}{'' if resident else ', on disk'}]")
+
+
+def choose_preset(session, prompt):
+    """
+    Offers the saved axis presets, like the old "use previously saved ranges?" prompt.
+
+    Parameters:
+        session (SessionStore): The session.
+        prompt (str): Yes/no question to ask.
+
+    Returns:
+        list: [x_min, x_max, y_min, y_max] of the chosen preset, or None.
+    """
+    if not session.presets or get_yes_no(prompt) == 'n':
+        return None
+    names = list(session.presets)
+    if len(names) == 1:
+        return session.presets[names[0]]
+    print("Saved axis presets:")
+    for name, ranges in session.presets.items():
+        print(f"  {name}: x {ranges[0]} to {ranges[1]}, y {ranges[2]} to {ranges[3]}")
+    while True:
+        name = input(f"Enter the preset name [{names[-1]}]: ").strip() or names[-1]
+        if name in session.presets:
+            return session.presets[name]
+        print(f"Unknown preset '{name}'. Please enter one of {names}.")
+
+
+def save_preset(session, x_min, x_max, y_min, y_max):
+    """
+    Asks for a preset name and saves the axis ranges under it.
+
+    Parameters:
+        session (SessionStore): The session.
+        x_min, x_max, y_min, y_max (float): Axis limits.
+    """
+    name = input(f"Enter a name for these settings [{DEFAULT_PRESET}]: ").strip() or DEFAULT_PRESET
+    session.set_preset(name, x_min, x_max, y_min, y_max)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or clear the saved session of a plotting tool.")
+    parser.add_argument('tool', help="tool name: fft, convolution, impulse or spectrogram")
+    parser.add_argument('--clear', action='store_true', help="delete the saved session")
+    args = parser.parse_args()
+
+    session = SessionStore(args.tool)
+    if args.clear:
+        session.clear()
+        print(f"Cleared '{session.directory}'.")
+        return
+    print(f"Session directory: {session.directory}")
+    if len(session.datasets):
+        session.print_datasets()
+    for name, ranges in session.presets.items():
+        print(f"preset {name}: x {ranges[0]} to {ranges[1]}, y {ranges[2]} to {ranges[3]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+import argparse
+import csv
+import glob
+import os
+import time
+
+import numpy as np
+
+from plotCore import Pipeline
+from stageTrace import enable as enable_trace, stage
+
+# Level below the main peak that defines the bandwidth
+DEFAULT_DROP_DB = 3.0
+
+# Files picked up when a directory is given
+DEFAULT_PATTERN = '*.txt'
+
+DEFAULT_CSV = 'features.csv'
+
+
+def local_extrema(y, order=1, kind='peak'):
+    """
+    Finds local maxima or minima by comparing every sample with its neighbours, one
+    whole-array comparison per neighbour distance.
+
+    A sample is a peak if it is above every sample up to order to its left and not
+    below any up to order to its right, so a flat top counts once (at its left end).
+    The first and last order samples are never extrema.
+
+    Parameters:
+        y (np.ndarray): Values, e.g. magnitudes in dB.
+        order (int): Neighbours compared on each side.
+        kind (str): 'peak' or 'null'.
+
+    Returns:
+        np.ndarray: Indices of the extrema, ascending.
+    """
+    n = len(y)
+    if n < 2 * order + 1:
+        return np.array([], dtype=int)
+    left, right = (np.greater, np.greater_equal) if kind == 'peak' else (np.less, np.less_equal)
+    centre = y[order:n - order]
+    mask = np.ones(len(centre), dtype=bool)
+    for k in range(1, order + 1):
+        mask &= left(centre, y[order - k:n - order - k])
+        mask &= right(centre, y[order + k:n - order + k])
+    return np.flatnonzero(mask) + order
+
+
+def parabolic_refine(x, y, idx):
+    """
+    Refines extrema by the vertex of the parabola through each one and its two
+    neighbours; the spacing may be non-uniform.
+
+    Parameters:
+        x (np.ndarray): Sample positions, ascending.
+        y (np.ndarray): Values.
+        idx (np.ndarray): Indices of extrema, none at either end.
+
+    Returns:
+        np.ndarray: Refined positions.
+        np.ndarray: Refined values.
+    """
+    xa, x0, xb = x[idx - 1], x[idx], x[idx + 1]
+    ya, y0, yb = y[idx - 1], y[idx], y[idx + 1]
+    # Newton form through the three points: y = ya + s1 (x - xa) + c (x - xa)(x - x0)
+    s1 = (y0 - ya) / (x0 - xa)
+    c = ((yb - y0) / (xb - x0) - s1) / (xb - xa)
+    safe_c = np.where(c != 0, c, 1.0)
+    xv = np.where(c != 0, 0.5 * (xa + x0) - s1 / (2 * safe_c), x0)
+    xv = np.clip(xv, xa, xb)
+    yv = np.where(c != 0, ya + s1 * (xv - xa) + c * (xv - xa) * (xv - x0), y0)
+    return xv, yv
+
+
+def level_crossings(x, y, level):
+    """
+    Positions where y crosses level, linearly interpolated between samples.
+
+    Returns:
+        np.ndarray: Index of the sample before each crossing.
+        np.ndarray: Interpolated positions.
+    """
+    below = y < level
+    idx = np.flatnonzero(below[1:] != below[:-1])
+    x0, x1, y0, y1 = x[idx], x[idx + 1], y[idx], y[idx + 1]
+    return idx, x0 + (level - y0) * (x1 - x0) / (y1 - y0)
+
+
+def extract_features(freqs, mags_dB, order=1, drop_dB=DEFAULT_DROP_DB):
+    """
+    Extracts the main peak, every local peak and null, and the -3 dB points of a
+    magnitude spectrum.
+
+    Parameters:
+        freqs (np.ndarray): Frequencies in Hz, ascending.
+        mags_dB (np.ndarray): Magnitudes in dB.
+        order (int): Neighbours compared on each side when finding peaks and nulls.
+        drop_dB (float): Level below the main peak that defines the bandwidth.
+
+    Returns:
+        dict: 'peak_freq' and 'peak_dB' (the maximum), 'cutoff_dB' (the sampled
+            maximum less drop_dB), 'f_low' and 'f_high' (its crossings either side of
+            the maximum, NaN if there is none),
+            'bandwidth' (f_high - f_low, from the first frequency for a low-pass),
+            'peaks' and 'nulls' (arrays of [frequency, level] rows, refined).
+    """
+    freqs = np.asarray(freqs, dtype=float)
+    mags_dB = np.asarray(mags_dB, dtype=float)
+    if len(freqs) < 3:
+        raise ValueError(f"At least three points are needed, got {len(freqs)}.")
+
+    features = {}
+    for kind in ('peak', 'null'):
+        idx = local_extrema(mags_dB, order, kind)
+        f, level = parabolic_refine(freqs, mags_dB, idx)
+        features[kind + 's'] = np.column_stack((f, level))
+
+    top = int(np.argmax(mags_dB))
+    peak_freq, peak_dB = freqs[top], mags_dB[top]
+    if 0 < top < len(freqs) - 1:
+        (peak_freq,), (peak_dB,) = parabolic_refine(freqs, mags_dB, np.array([top]))
+
+    cutoff_dB = mags_dB[top] - drop_dB
+    idx, crossings = level_crossings(freqs, mags_dB, cutoff_dB)
+    lower = crossings[idx < top]
+    upper = crossings[idx >= top]
+    f_low = lower[-1] if len(lower) else np.nan
+    f_high = upper[0] if len(upper) else np.nan
+    features.update({
+        'peak_freq': float(peak_freq),
+        'peak_dB': float(peak_dB),
+        'cutoff_dB': float(cutoff_dB),
+        'f_low': float(f_low),
+        'f_high': float(f_high),
+        'bandwidth': float(f_high - (f_low if len(lower) else freqs[0])),
+    })
+    return features
+
+
+def source_features(source, order=1, drop_dB=DEFAULT_DROP_DB, annotate_dir=None):
+    """
+    Loads one source and extracts its features; errors are returned, not raised, so
+    one bad file does not stop a batch.
+
+    Parameters:
+        source (dict): plotCore source: an FFT export ({'type': 'text', 'path': ...})
+            or an equation ({'type': 'equation', 'model': 'S2', 'range': ...}).
+        order (int): See extract_features.
+        drop_dB (float): See extract_features.
+        annotate_dir (str): Directory to write an annotated plot to, or None.
+
+    Returns:
+        dict: 'name', 'features' (see extract_features, None on failure), 'seconds'
+            and 'error' (None on success).
+    """
+    start = time.perf_counter()
+    name = source_name(source)
+    try:
+        trace = Pipeline(source).then('to_dB').evaluate()
+        with stage('compute', f"features: {name}", input_bytes=trace['y'].nbytes):
+            features = extract_features(trace['x'], trace['y'], order, drop_dB)
+        if annotate_dir:
+            output = os.path.join(annotate_dir, _plot_name(source))
+            plot_features(trace['x'], trace['y'], features, name, output)
+        error = None
+    except Exception as e:
+        features = None
+        error = f"{type(e).__name__}: {e}"
+    return {'name': name, 'features': features, 'seconds': time.perf_counter() - start, 'error': error}
+
+
+def source_name(source):
+    """Name of a source in tables and plot titles: its path, or its model and range."""
+    if source.get('path'):
+        return source['path']
+    if source.get('range'):
+        lo, hi, num = source['range'][:3]
+        return f"{source['model']} [{lo:g}, {hi:g}] Hz x {num}"
+    return source['model']
+
+
+def _plot_name(source):
+    base = os.path.splitext(os.path.basename(source['path']))[0] if source.get('path') else source_name(source)
+    return "".join(ch if ch.isalnum() or ch in '-_.' else '_' for ch in base) + '.png'
+
+
+def annotate_features(ax, features):
+    """Marks peaks, nulls and the cutoff points on an Axes that already shows the magnitude in dB."""
+    peaks, nulls = features['peaks'], features['nulls']
+    ax.plot(peaks[:, 0], peaks[:, 1], 'v', color='tab:red', label=f"Peaks ({len(peaks)})")
+    ax.plot(nulls[:, 0], nulls[:, 1], '^', color='tab:green', label=f"Nulls ({len(nulls)})")
+    level = features['cutoff_dB']
+    ax.axhline(level, color='gray', linewidth=0.8, linestyle=':')
+    for f in (features['f_low'], features['f_high']):
+        if np.isfinite(f):
+            ax.plot(f, level, 'o', color='black')
+            ax.annotate(f"{f:.4g} Hz", (f, level), textcoords='offset points', xytext=(5, 5))
+    ax.annotate(f"{features['peak_freq']:.4g} Hz, {features['peak_dB']:.2f} dB",
+                (features['peak_freq'], features['peak_dB']), textcoords='offset points', xytext=(5, 5))
+
+
+def plot_features(freqs, mags_dB, features, name, output):
+    """Writes a plot of one spectrum with its features marked, using the Agg backend."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    with stage('render', output):
+        fig = plt.figure(figsize=(10, 6))
+        ax = fig.gca()
+        ax.plot(freqs, mags_dB, label=name)
+        annotate_features(ax, features)
+        if freqs[0] > 0:
+            ax.set_xscale('log')
+        ax.set_xlabel("Frequency (Hz)")
+        ax.set_ylabel("Magnitude (dB)")
+        ax.set_title(f"Spectral Features: {os.path.basename(name)}")
+        ax.grid(True, which="both", ls="--")
+        ax.legend()
+        out_dir = os.path.dirname(output)
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+        fig.savefig(output)
+        plt.close(fig)
+
+
+def _source_features_args(args):
+    return source_features(*args)
+
+
+def batch_features(sources, processes=None, order=1, drop_dB=DEFAULT_DROP_DB, annotate_dir=None):
+    """
+    Extracts features from many sources on a pool of worker processes.
+
+    Parameters:
+        sources (list of dict): plotCore sources, see source_features.
+        processes (int): Number of worker processes; None uses every CPU, 1 works in
+            this process without a pool.
+        order (int): See extract_features.
+        drop_dB (float): See extract_features.
+        annotate_dir (str): Directory for annotated plots, or None.
+
+    Returns:
+        list of dict: One result per source (see source_features), in input order.
+    """
+    args = [(source, order, drop_dB, annotate_dir) for source in sources]
+    if processes == 1 or len(args) <= 1:
+        return [_source_features_args(a) for a in args]
+    from multiprocessing import Pool
+
+    with Pool(processes=processes) as pool:
+        return pool.map(_source_features_args, args, chunksize=1)
+
+
+def expand_paths(paths, pattern=DEFAULT_PATTERN):
+    """Replaces each directory in paths by the files in it matching pattern, sorted."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, pattern))))
+        else:
+            files.append(path)
+    return files
+
+
+def write_features_csv(filename, results):
+    """
+    Writes one row per feature: source, feature ('max', 'peak', 'null', 'f_low',
+    'f_high' or 'bandwidth'), frequency in Hz and level in dB.
+    """
+    with open(filename, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['source', 'feature', 'frequency_Hz', 'level_dB'])
+        for result in results:
+            feats = result['features']
+            if feats is None:
+                continue
+            name = result['name']
+            writer.writerow([name, 'max', repr(feats['peak_freq']), repr(feats['peak_dB'])])
+            for key in ('f_low', 'f_high'):
+                if np.isfinite(feats[key]):
+                    writer.writerow([name, key, repr(feats[key]), repr(feats['cutoff_dB'])])
+            if np.isfinite(feats['bandwidth']):
+                writer.writerow([name, 'bandwidth', repr(feats['bandwidth']), ''])
+            for kind in ('peaks', 'nulls'):
+                for freq, level in feats[kind].tolist():
+                    writer.writerow([name, kind[:-1], repr(freq), repr(level)])
+
+
+def print_features_table(results, wall_seconds):
+    """Prints the main features of each source and any failures."""
+    print(f"\n{'Source':<40} {'Peak (Hz)':>12} {'Peak (dB)':>10} {'-3 dB low':>12} {'-3 dB high':>12} "
+          f"{'Bandwidth':>12} {'Peaks':>6} {'Nulls':>6}")
+    for result in results:
+        feats = result['features']
+        if feats is None:
+            print(f"{result['name'][-40:]:<40} {result['error']}")
+            continue
+        print(f"{result['name'][-40:]:<40} {feats['peak_freq']:>12.6g} {feats['peak_dB']:>10.2f} "
+              f"{feats['f_low']:>12.6g} {feats['f_high']:>12.6g} {feats['bandwidth']:>12.6g} "
+              f"{len(feats['peaks']):>6} {len(feats['nulls']):>6}")
+    failed = sum(result['error'] is not None for result in results)
+    print(f"\nExtracted features from {len(results) - failed}/{len(results)} sources in {wall_seconds:.2f} s wall time.")
+
+
+def run_features(args):
+    """
+    Extracts, prints and writes features as parsed options ask (see main and plotCli).
+
+    Returns:
+        list of dict: Output of batch_features.
+    """
+    sources = [{'type': 'text', 'path': path} for path in expand_paths(args.paths, args.pattern)]
+    for model in args.equation:
+        source = {'type': 'equation', 'model': model}
+        if args.range:
+            source['range'] = (args.range[0], args.range[1], int(args.range[2]))
+        sources.append(source)
+    if not sources:
+        raise SystemExit("error: no FFT exports found and no --equation given")
+
+    start = time.perf_counter()
+    results = batch_features(sources, args.processes, args.order, args.drop, args.annotate)
+    print_features_table(results, time.perf_counter() - start)
+    write_features_csv(args.csv, results)
+    print(f"Features written to '{args.csv}'.")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Extract peaks, nulls and -3 dB points from FFT exports or equation curves.")
+    parser.add_argument('paths', nargs='*', help="FFT exports, or directories of them")
+    parser.add_argument('--pattern', default=DEFAULT_PATTERN, help="files picked up in a directory")
+    parser.add_argument('--equation', action='append', default=[], choices=['S2', 'pulse'],
+                        help="also analyse an equation curve")
+    parser.add_argument('--range', type=float, nargs=3, metavar=('MIN', 'MAX', 'POINTS'),
+                        help="frequency grid of the equation curves")
+    parser.add_argument('--order', type=int, default=1, help="neighbours compared on each side")
+    parser.add_argument('--drop', type=float, default=DEFAULT_DROP_DB, help="bandwidth level below the peak in dB")
+    parser.add_argument('--csv', default=DEFAULT_CSV, help="CSV file to write")
+    parser.add_argument('--annotate', metavar='DIR', help="write a plot of each source with its features to DIR")
+    parser.add_argument('-p', '--processes', type=int, default=None,
+                        help="number of worker processes (default: one per CPU)")
+    parser.add_argument('--trace', metavar='FILE', help="time each stage and write a Chrome trace to FILE")
+    args = parser.parse_args(argv)
+    if args.trace:
+        enable_trace(args.trace)
+    results = run_features(args)
+    if any(result['error'] is not None for result in results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
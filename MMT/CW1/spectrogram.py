@@ -0,0 +1,240 @@
+import numpy as np
+import matplotlib.pyplot as plt
+
+from plotCore import get_range, get_yes_no
+from spectrumAnalysis import (WINDOW_NAMES, is_uniform, iter_time_series_chunks, load_time_series,
+                              next_fast_len, rfft_plan, to_uniform)
+from sessionStore import SessionStore, choose_preset, save_preset
+
+# Number of frames transformed per rfft call
+BLOCK_FRAMES = 256
+
+
+def iter_stft(chunks, dt, frame_len, hop, window='hann', pad_to_fast=True, block_frames=BLOCK_FRAMES):
+    """
+    Short-time FFT over a stream of uniformly sampled chunks.
+
+    Frames are strided views into a small carry-over buffer, and at most block_frames
+    frames are windowed and transformed at a time, so memory stays bounded by the chunk
+    size no matter how long the recording is.
+
+    Parameters:
+        chunks (iterable of np.ndarray): Consecutive blocks of signal values.
+        dt (float): Sample step in seconds.
+        frame_len (int): Samples per frame.
+        hop (int): Samples between the starts of consecutive frames.
+        window (str): One of WINDOW_NAMES.
+        pad_to_fast (bool): Zero-pad each frame to the next 2/3/5-smooth length.
+        block_frames (int): Frames transformed per rfft call.
+
+    Yields:
+        np.ndarray: Frequencies of the bins in Hz (the same array every time).
+        np.ndarray: Centre time of each frame in the block, relative to the first sample.
+        np.ndarray: Magnitudes in dB, shape (frames in block, bins).
+    """
+    if frame_len < 2 or hop < 1:
+        raise ValueError("frame_len must be at least 2 and hop at least 1.")
+    nfft = next_fast_len(frame_len) if pad_to_fast else frame_len
+    win, freqs, scale = rfft_plan(frame_len, nfft, window, dt)
+
+    buffer = np.empty(0)
+    consumed = 0  # Sample index of buffer[0] in the whole stream
+    for chunk in chunks:
+        buffer = np.concatenate((buffer, np.asarray(chunk, dtype=float)))
+        if len(buffer) < frame_len:
+            continue
+        num_frames = (len(buffer) - frame_len) // hop + 1
+        frames = np.lib.stride_tricks.sliding_window_view(buffer, frame_len)[::hop]
+        for start in range(0, num_frames, block_frames):
+            block = frames[start:start + block_frames]
+            spectrum = np.abs(np.fft.rfft(block * win, n=nfft, axis=-1))
+            spectrum *= scale
+            np.add(spectrum, 1e-30, out=spectrum)
+            np.log10(spectrum, out=spectrum)
+            spectrum *= 20
+            frame_index = start + np.arange(len(block))
+            centres = (consumed + frame_index * hop + 0.5 * (frame_len - 1)) * dt
+            yield freqs, centres, spectrum
+        # Keep only the samples still needed by the next frame
+        drop = num_frames * hop
+        buffer = buffer[drop:]
+        consumed += drop
+
+
+def stft(times, values, frame_len, hop, window='hann', pad_to_fast=True):
+    """
+    Spectrogram of a loaded time series.
+
+    Parameters:
+        times (np.ndarray): Time values (resampled to a uniform grid if needed).
+        values (np.ndarray): Signal values.
+        frame_len, hop, window, pad_to_fast: See iter_stft.
+
+    Returns:
+        np.ndarray: Frame centre times in seconds.
+        np.ndarray: Bin frequencies in Hz.
+        np.ndarray: Magnitudes in dB, shape (bins, frames), ready for imshow.
+    """
+    times, values = to_uniform(np.asarray(times, dtype=float), np.asarray(values, dtype=float))
+    dt = float((times[-1] - times[0]) / (len(times) - 1))
+    return collect_stft([values], dt, frame_len, hop, window, pad_to_fast, t0=times[0])
+
+
+def collect_stft(chunks, dt, frame_len, hop, window='hann', pad_to_fast=True, t0=0.0):
+    """
+    Runs iter_stft over a stream and assembles the full spectrogram image.
+
+    Parameters:
+        chunks (iterable of np.ndarray): Consecutive blocks of signal values.
+        dt (float): Sample step in seconds.
+        frame_len, hop, window, pad_to_fast: See iter_stft.
+        t0 (float): Time of the first sample.
+
+    Returns:
+        np.ndarray: Frame centre times in seconds.
+        np.ndarray: Bin frequencies in Hz.
+        np.ndarray: Magnitudes in dB, shape (bins, frames).
+    """
+    freqs = None
+    time_blocks = []
+    mag_blocks = []
+    for freqs, centres, mags_dB in iter_stft(chunks, dt, frame_len, hop, window, pad_to_fast):
+        time_blocks.append(centres)
+        # float32 halves the size of the image without visible loss in dB
+        mag_blocks.append(mags_dB.astype(np.float32))
+    if freqs is None:
+        raise ValueError("The recording is shorter than one frame.")
+    return t0 + np.concatenate(time_blocks), freqs, np.concatenate(mag_blocks).T
+
+
+def uniform_stream(chunks, rtol=1e-6):
+    """
+    Checks a stream of (times, values) chunks for one constant time step, inside every
+    chunk and across the boundary with the previous chunk, and passes the values on.
+
+    Parameters:
+        chunks (iterator): (times, values) blocks, e.g. from iter_time_series_chunks.
+        rtol (float): Allowed relative deviation of any step from the first chunk's step.
+
+    Returns:
+        float: Time of the first sample.
+        float: Sample step in seconds.
+        generator: The value blocks; raises ValueError at the first chunk whose step
+            differs or that does not continue from the previous one (last t + dt).
+    """
+    first_times, first_values = next(chunks)
+    if len(first_times) < 2 or not is_uniform(first_times, rtol):
+        raise ValueError("the time step of the first chunk is not uniform")
+    dt = float((first_times[-1] - first_times[0]) / (len(first_times) - 1))
+
+    def values():
+        yield first_values
+        last_time = first_times[-1]
+        for times, chunk_values in chunks:
+            steps = np.diff(times, prepend=last_time)
+            if np.any(np.abs(steps - dt) > rtol * dt):
+                raise ValueError(f"the time step changes or jumps after t = {last_time:g} s")
+            last_time = times[-1]
+            yield chunk_values
+
+    return float(first_times[0]), dt, values()
+
+
+def get_positive_int(prompt, default):
+    """Asks for a positive integer, returning default on empty input."""
+    while True:
+        response = input(prompt).strip()
+        if not response:
+            return default
+        try:
+            value = int(response)
+            if value > 0:
+                return value
+            print("Please enter a positive integer.")
+        except ValueError:
+            print("Invalid input. Please enter a valid integer.")
+
+
+def main():
+    # Axis presets are kept on disk and restored on the next run
+    session = SessionStore('spectrogram')
+    session.print_summary()
+
+    while True:
+        filename = input("Enter the time-domain text file name/path: ").strip()
+        stream_choice = get_yes_no("Do you want to stream the file in chunks instead of loading it whole? [y/n]: ")
+
+        frame_len = get_positive_int("Enter frame length in samples [1024]: ", 1024)
+        hop = get_positive_int(f"Enter hop in samples [{max(1, frame_len // 4)}]: ", max(1, frame_len // 4))
+        while True:
+            window = input(f"Choose a window {WINDOW_NAMES} [hann]: ").strip().lower() or 'hann'
+            if window in WINDOW_NAMES:
+                break
+            print(f"Invalid input. Please enter one of {WINDOW_NAMES}.")
+
+        try:
+            streamed = False
+            if stream_choice == 'y':
+                try:
+                    t0, dt, value_chunks = uniform_stream(iter_time_series_chunks(filename))
+                    frame_times, freqs, mags_dB = collect_stft(value_chunks, dt, frame_len, hop, window, t0=t0)
+                    streamed = True
+                except ValueError as e:
+                    # Chunks cannot be resampled on their own; the whole file is loaded instead
+                    print(f"[INFO] Cannot stream '{filename}' ({e}); loading it whole and resampling.")
+            if not streamed:
+                times, values = load_time_series(filename)
+                if len(times) < 2:
+                    print(f"No valid data found in '{filename}'. Please check the file and try again.")
+                    continue
+                frame_times, freqs, mags_dB = stft(times, values, frame_len, hop, window)
+        except FileNotFoundError:
+            print(f"File '{filename}' not found. Please enter a valid file name/path.")
+            continue
+        except (StopIteration, ValueError) as e:
+            print(f"An error occurred while computing the spectrogram: {e}")
+            continue
+
+        log_choice = get_yes_no("Do you want the frequency axis to be logarithmic? [y/n]: ")
+        use_log_scale = (log_choice == 'y')
+
+        # If we have saved axis presets, ask if user wants to use one
+        preset = choose_preset(session, "\nDo you want to use previously saved time/frequency axis ranges? [y/n]: ")
+        if preset is not None:
+            x_min, x_max, y_min, y_max = preset
+        else:
+            x_min, x_max = get_range("Do you want to specify horizontal (time) axis range? [y/n]: ",
+                                     "horizontal (time)", "s")
+            y_min, y_max = get_range("Do you want to specify vertical (frequency) axis range? [y/n]: ",
+                                     "vertical (frequency)", "Hz")
+            if x_min is not None or y_min is not None:
+                save_settings = get_yes_no("\nDo you want to save these axis settings for future plotting? [y/n]: ")
+                if save_settings == 'y':
+                    save_preset(session, x_min, x_max, y_min, y_max)
+
+        plt.figure(figsize=(10, 6))
+        if use_log_scale:
+            # imshow cannot stretch rows onto a log axis; pcolormesh skips the DC row
+            plt.pcolormesh(frame_times, freqs[1:], mags_dB[1:], shading='auto')
+            plt.yscale('log')
+        else:
+            plt.imshow(mags_dB, aspect='auto', origin='lower',
+                       extent=[frame_times[0], frame_times[-1], freqs[0], freqs[-1]])
+        plt.colorbar(label="Magnitude (dB)")
+        if x_min is not None and x_max is not None:
+            plt.xlim([x_min, x_max])
+        if y_min is not None and y_max is not None:
+            plt.ylim([y_min, y_max])
+        plt.xlabel("Time (s)")
+        plt.ylabel("Frequency (Hz)")
+        plt.title(f"Spectrogram of {filename}")
+        plt.show()
+
+        cont_choice = get_yes_no("\nDo you want to plot again? [y/n]: ")
+        if cont_choice != 'y':
+            print("Exiting the plotting tool. Goodbye!")
+            break
+
+
+if __name__ == "__main__":
+    main()
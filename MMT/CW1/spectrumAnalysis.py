@@ -0,0 +1,475 @@
+import bz2
+import gzip
+import lzma
+from functools import lru_cache
+
+import numpy as np
+
+from resampleTransient import resample_uniform
+from stageTrace import traced
+
+# Windows that can be chosen for the spectrum stage
+WINDOW_NAMES = ['hann', 'hamming', 'blackman', 'rect']
+
+# Cached windows, plans and chirp kernels hold whole arrays as long as the trace, so
+# only the most recent few sizes are kept alive
+ARRAY_CACHE_SIZE = 2
+
+# Openers for compressed exports, keyed by the magic bytes the file starts with
+COMPRESSED_OPENERS = {b'\x1f\x8b': gzip.open, b'BZh': bz2.open, b'\xfd7zXZ\x00': lzma.open}
+
+# Lines starting with these (case-insensitive) are column titles, not data
+HEADER_PREFIXES = ('time',)
+
+# LTspice writes a 'Step Information' line before each run of a .step export; every run
+# restarts the x axis, so the runs are read one at a time
+STEP_PREFIX = 'step'
+
+
+def open_export(filename):
+    """
+    Opens an export for reading as text, decompressing gzip, bzip2 and xz files.
+
+    The compression is recognized from the first bytes of the file, so it does not
+    depend on the extension.
+
+    Parameters:
+        filename (str): Path to the export.
+
+    Returns:
+        file: Readable text file object.
+    """
+    with open(filename, 'rb') as f:
+        head = f.read(6)
+    for magic, opener in COMPRESSED_OPENERS.items():
+        if head.startswith(magic):
+            return opener(filename, 'rt')
+    return open(filename, 'r')
+
+
+def export_lines(f, filename, step=0):
+    """
+    Yields the stripped, non-empty lines of one run of an export. A .step export holds
+    several runs, each starting with a 'Step Information' line and restarting the x
+    axis; only the selected run is read, and reading stops where the next one begins.
+
+    Parameters:
+        f (file): Open export, e.g. from open_export.
+        filename (str): Name of the export, for the note about further runs.
+        step (int): Index of the run to read, 0 for the first.
+
+    Yields:
+        str: Lines of the selected run, headers included.
+    """
+    run = -1
+    for line in f:
+        line = line.strip()
+        if not line:
+            continue
+        if line.lower().startswith(STEP_PREFIX):
+            run += 1
+            if run > step:
+                print(f"[INFO] '{filename}' holds several .step runs; only run {step + 1} was read.")
+                return
+            continue
+        if max(run, 0) == step:
+            yield line
+    if run < step and step > 0:
+        raise ValueError(f"'{filename}' has no .step run {step + 1}.")
+
+
+def check_sorted(x, previous, filename):
+    """
+    Raises ValueError if x decreases, within the block or from the last value before it.
+
+    Parameters:
+        x (np.ndarray): Block of x values (time or frequency).
+        previous (float): Last x value before the block, or None.
+        filename (str): Name of the export, for the message.
+    """
+    if len(x) == 0:
+        return
+    steps = np.diff(x, prepend=x[0] if previous is None else previous)
+    if np.any(steps < 0):
+        at = x[int(np.argmax(steps < 0))]
+        raise ValueError(f"The x values in '{filename}' go backwards at {at:g}; the export is not sorted.")
+
+
+@traced('parse')
+def load_time_series(filename, step=0):
+    """
+    Loads a time-domain export (time and one value column) from a text file.
+
+    Header lines are skipped, and malformed lines with a warning. Of a .step export
+    only one run is read (see export_lines).
+
+    Parameters:
+        filename (str): Path to the text file, e.g. an LTspice transient export; a
+            gzip, bzip2 or xz compressed file is decompressed while reading.
+        step (int): Index of the .step run to read.
+
+    Returns:
+        np.ndarray: Array of time values.
+        np.ndarray: Array of signal values.
+    """
+    for times, values in iter_time_series_chunks(filename, chunk_rows=None, step=step):
+        return times, values
+    return np.array([]), np.array([])
+
+
+def iter_time_series_chunks(filename, chunk_rows=1 << 18, step=0):
+    """
+    Reads a time-domain export in chunks, so long recordings never have to be held in
+    memory at once. This is the parser behind load_time_series, which reads the whole
+    file as one chunk; lines are skipped the same way.
+
+    Parameters:
+        filename (str): Path to the text file (optionally compressed).
+        chunk_rows (int): Maximum number of data rows per chunk; None for no limit.
+        step (int): Index of the .step run to read.
+
+    Yields:
+        np.ndarray: Time values of the chunk.
+        np.ndarray: Signal values of the chunk.
+    """
+    times = []
+    values = []
+    last_time = None
+    with open_export(filename) as f:
+        for line in export_lines(f, filename, step):
+            if line.lower().startswith(HEADER_PREFIXES):
+                continue
+            parts = line.split()
+            if len(parts) < 2:
+                print(f"Warning: Skipping invalid data line: {line}")
+                continue
+            try:
+                time = float(parts[0])
+                value = float(parts[1])
+            except ValueError:
+                print(f"Warning: Skipping invalid data line: {line}")
+                continue
+            times.append(time)
+            values.append(value)
+            if chunk_rows and len(times) >= chunk_rows:
+                chunk_times = np.array(times)
+                check_sorted(chunk_times, last_time, filename)
+                last_time = chunk_times[-1]
+                yield chunk_times, np.array(values)
+                times = []
+                values = []
+    if times:
+        chunk_times = np.array(times)
+        check_sorted(chunk_times, last_time, filename)
+        yield chunk_times, np.array(values)
+
+
+@lru_cache(maxsize=None)
+def next_fast_len(n):
+    """
+    Returns the smallest length >= n whose only prime factors are 2, 3 and 5.
+
+    Parameters:
+        n (int): Minimum transform length.
+
+    Returns:
+        int: A length the FFT handles efficiently.
+    """
+    if n <= 1:
+        return 1
+    best = 1 << (n - 1).bit_length()
+    p5 = 1
+    while p5 < best:
+        p35 = p5
+        while p35 < best:
+            # Smallest power of two bringing p35 up to at least n
+            quotient = -(-n // p35)
+            candidate = p35 * (1 << (quotient - 1).bit_length())
+            if candidate < best:
+                best = candidate
+            p35 *= 3
+        p5 *= 5
+    return best
+
+
+@lru_cache(maxsize=ARRAY_CACHE_SIZE)
+def get_window(name, n):
+    """
+    Returns a periodic analysis window, cached per (name, length).
+
+    Parameters:
+        name (str): One of WINDOW_NAMES.
+        n (int): Window length.
+
+    Returns:
+        np.ndarray: Read-only window of length n.
+    """
+    if name == 'rect':
+        window = np.ones(n)
+    elif name == 'hann':
+        window = np.hanning(n + 1)[:-1]
+    elif name == 'hamming':
+        window = np.hamming(n + 1)[:-1]
+    elif name == 'blackman':
+        window = np.blackman(n + 1)[:-1]
+    else:
+        raise ValueError(f"Unknown window '{name}'. Choose one of {WINDOW_NAMES}.")
+    window.flags.writeable = False
+    return window
+
+
+@lru_cache(maxsize=ARRAY_CACHE_SIZE)
+def rfft_plan(seg_len, nfft, window, dt):
+    """
+    Everything about a transform that only depends on its size: the window, its
+    amplitude correction and the frequency vector. numpy's pocketfft keeps its own
+    twiddle-factor cache per length, so reusing nfft across traces reuses those too.
+
+    Parameters:
+        seg_len (int): Number of samples per transformed segment.
+        nfft (int): Transform length (seg_len plus zero-padding).
+        window (str): One of WINDOW_NAMES.
+        dt (float): Sample step in seconds.
+
+    Returns:
+        np.ndarray: Window of length seg_len.
+        np.ndarray: Frequencies of the rfft bins in Hz.
+        np.ndarray: Per-bin factor giving single-sided peak amplitude.
+    """
+    win = get_window(window, seg_len)
+    freqs = np.fft.rfftfreq(nfft, d=dt)
+    freqs.flags.writeable = False
+    # Single-sided peak amplitude: scale by 2 / sum(window), except DC and Nyquist
+    scale = np.full(len(freqs), 2.0 / win.sum())
+    scale[0] /= 2.0
+    if nfft % 2 == 0:
+        scale[-1] /= 2.0
+    scale.flags.writeable = False
+    return win, freqs, scale
+
+
+def is_uniform(times, rtol=1e-6):
+    """
+    Checks whether a time vector has a constant step.
+
+    Parameters:
+        times (np.ndarray): Sorted time values.
+        rtol (float): Allowed relative deviation of any step from the mean step.
+
+    Returns:
+        bool: True if the steps are uniform within rtol.
+    """
+    if len(times) < 3:
+        return True
+    steps = np.diff(times)
+    mean_step = (times[-1] - times[0]) / (len(times) - 1)
+    return bool(np.all(np.abs(steps - mean_step) <= rtol * abs(mean_step)))
+
+
+def to_uniform(times, values, method='linear'):
+    """
+    Resamples a trace onto a uniform grid with the same mean step.
+
+    Parameters:
+        times (np.ndarray): Sorted, possibly non-uniform, time values.
+        values (np.ndarray): Signal values.
+        method (str): Resampling method, see resampleTransient.RESAMPLE_METHODS.
+
+    Returns:
+        np.ndarray: Uniform time values.
+        np.ndarray: Resampled signal values.
+    """
+    if is_uniform(times):
+        return times, values
+    uniform_times, uniform_values, _ = resample_uniform(times, values, method=method)
+    return uniform_times, uniform_values
+
+
+def _spectra_uniform(values, dt, window, segment_len, overlap, pad_to_fast):
+    """
+    Amplitude spectra of one or more equal-length, uniformly sampled traces.
+    values has shape (num_traces, n); the result is complex, (num_traces, nfft//2 + 1).
+    """
+    n = values.shape[-1]
+    seg_len = n if segment_len is None else min(int(segment_len), n)
+    nfft = next_fast_len(seg_len) if pad_to_fast else seg_len
+    win, freqs, scale = rfft_plan(seg_len, nfft, window, dt)
+
+    if seg_len == n:
+        spectrum = np.fft.rfft(values * win, n=nfft, axis=-1)
+        spectrum *= scale
+        return freqs, spectrum, spectrum
+
+    # Welch averaging over overlapping segments; the segments are strided views
+    hop = max(1, int(round(seg_len * (1.0 - overlap))))
+    segments = np.lib.stride_tricks.sliding_window_view(values, seg_len, axis=-1)[:, ::hop]
+    seg_spectra = np.fft.rfft(segments * win, n=nfft, axis=-1)
+    seg_spectra *= scale
+    power = np.mean(np.abs(seg_spectra) ** 2, axis=1)
+    # Magnitude from the averaged power, phase from the coherent (complex) mean
+    return freqs, np.sqrt(power), seg_spectra.mean(axis=1)
+
+
+def _to_fft_data(freqs, magnitude, phase_source):
+    """Builds the freq/mag_dB/phase structure the FFT plotters consume."""
+    return {
+        'freqs': freqs,
+        'mags_dB': 20 * np.log10(np.abs(magnitude) + 1e-30),
+        'phases_deg': np.degrees(np.angle(phase_source)),
+    }
+
+
+def compute_spectrum(times, values, window='hann', segment_len=None, overlap=0.5, pad_to_fast=True):
+    """
+    Computes the single-sided spectrum of a time-domain trace.
+
+    The trace is resampled onto a uniform grid if its time step varies, windowed and
+    transformed with a real FFT padded to a fast length. If segment_len is given the
+    result is Welch-averaged over segments of that length.
+
+    Parameters:
+        times (np.ndarray): Time values in seconds.
+        values (np.ndarray): Signal values.
+        window (str): One of WINDOW_NAMES.
+        segment_len (int): Welch segment length in samples, or None for one segment.
+        overlap (float): Fraction of overlap between Welch segments (0 to <1).
+        pad_to_fast (bool): Zero-pad to the next 2/3/5-smooth length.
+
+    Returns:
+        dict: 'freqs' (Hz), 'mags_dB' and 'phases_deg', like load_text_file_data output.
+    """
+    return compute_spectra([(times, values)], window, segment_len, overlap, pad_to_fast)[0]
+
+
+def compute_spectra(traces, window='hann', segment_len=None, overlap=0.5, pad_to_fast=True):
+    """
+    Computes spectra for several traces, batching traces of the same size.
+
+    Traces that end up with the same length and time step after resampling are stacked
+    and transformed in one rfft call, sharing the cached window and frequency vector.
+
+    Parameters:
+        traces (list of tuple): (times, values) pairs.
+        window, segment_len, overlap, pad_to_fast: See compute_spectrum.
+
+    Returns:
+        list of dict: One spectrum dict per trace, in input order.
+    """
+    if not 0.0 <= overlap < 1.0:
+        raise ValueError("overlap must be in the range [0, 1).")
+
+    groups = {}
+    for idx, (times, values) in enumerate(traces):
+        times = np.asarray(times, dtype=float)
+        values = np.asarray(values, dtype=float)
+        if len(times) < 2:
+            raise ValueError("At least two samples are needed to compute a spectrum.")
+        times, values = to_uniform(times, values)
+        dt = float((times[-1] - times[0]) / (len(times) - 1))
+        groups.setdefault((len(values), dt), []).append((idx, values))
+
+    results = [None] * len(traces)
+    for (n, dt), members in groups.items():
+        stacked = np.vstack([values for _, values in members])
+        freqs, magnitude, phase_source = _spectra_uniform(stacked, dt, window, segment_len, overlap, pad_to_fast)
+        for row, (idx, _) in enumerate(members):
+            results[idx] = _to_fft_data(freqs, magnitude[row], phase_source[row])
+    return results
+
+
+def spectrum_from_normal_data(data, **kwargs):
+    """
+    Computes a spectrum from the (N, 2) time/voltage array returned by plotGraph9's
+    read_normal_file.
+
+    Parameters:
+        data (np.ndarray): Array with time in column 0 and the signal in column 1.
+        **kwargs: Passed on to compute_spectrum.
+
+    Returns:
+        dict: 'freqs', 'mags_dB' and 'phases_deg'.
+    """
+    data = np.asarray(data, dtype=float)
+    return compute_spectrum(data[:, 0], data[:, 1], **kwargs)
+
+
+@lru_cache(maxsize=ARRAY_CACHE_SIZE)
+def _czt_kernel(n, m, step_cycles):
+    """
+    Chirp and FFT of the Bluestein convolution kernel for an n-point input and m-point
+    output with bin spacing step_cycles (cycles per sample). Cached, so repeated zooms
+    with the same band and trace size skip rebuilding them.
+    """
+    fft_len = next_fast_len(n + m - 1)
+    k = np.arange(max(m, n), dtype=float)
+    # W^(k^2/2) with W = exp(-j*2*pi*step_cycles); reduce k^2 modulo the period first
+    chirp = np.exp(-1j * np.pi * np.mod(step_cycles * k * k, 2.0))
+    kernel = np.zeros(fft_len, dtype=complex)
+    kernel[:m] = np.conj(chirp[:m])
+    kernel[fft_len - n + 1:] = np.conj(chirp[1:n][::-1])
+    kernel_fft = np.fft.fft(kernel)
+    chirp.flags.writeable = False
+    kernel_fft.flags.writeable = False
+    return fft_len, chirp, kernel_fft
+
+
+def czt(x, m, start_cycles, step_cycles):
+    """
+    Chirp-Z transform on an arc of the unit circle (Bluestein's algorithm).
+
+    Computes X[k] = sum_n x[n] * exp(-j*2*pi*(start_cycles + k*step_cycles)*n) for
+    k = 0..m-1, i.e. m DFT bins at an arbitrary start and spacing, with three FFTs.
+
+    Parameters:
+        x (np.ndarray): Input samples (last axis is transformed).
+        m (int): Number of output bins.
+        start_cycles (float): First bin frequency in cycles per sample.
+        step_cycles (float): Bin spacing in cycles per sample.
+
+    Returns:
+        np.ndarray: Complex output, shape x.shape[:-1] + (m,).
+    """
+    n = x.shape[-1]
+    fft_len, chirp, kernel_fft = _czt_kernel(n, m, float(step_cycles))
+    samples = np.arange(n, dtype=float)
+    premult = chirp[:n] * np.exp(-2j * np.pi * np.mod(start_cycles * samples, 1.0))
+    y = np.fft.fft(x * premult, n=fft_len, axis=-1)
+    y *= kernel_fft
+    out = np.fft.ifft(y, axis=-1)[..., :m]
+    out *= chirp[:m]
+    return out
+
+
+def zoom_spectrum(times, values, f_start, f_stop, num_points=2000, window='hann'):
+    """
+    Computes the spectrum of a time-domain trace over a narrow band only.
+
+    The chirp-Z transform evaluates num_points bins between f_start and f_stop, so the
+    band can be resolved far more finely than the full FFT's bin spacing without
+    zero-padding the whole trace.
+
+    Parameters:
+        times (np.ndarray): Time values in seconds.
+        values (np.ndarray): Signal values.
+        f_start (float): Lower band edge in Hz.
+        f_stop (float): Upper band edge in Hz.
+        num_points (int): Number of frequency points in the band.
+        window (str): One of WINDOW_NAMES.
+
+    Returns:
+        dict: 'freqs', 'mags_dB' and 'phases_deg' over the band, scaled like
+            compute_spectrum so the two can be plotted together.
+    """
+    if f_stop <= f_start:
+        raise ValueError("The upper band edge must be greater than the lower band edge.")
+    if num_points < 2:
+        raise ValueError("At least two frequency points are needed.")
+    times, values = to_uniform(np.asarray(times, dtype=float), np.asarray(values, dtype=float))
+    dt = float((times[-1] - times[0]) / (len(times) - 1))
+    win = get_window(window, len(values))
+
+    df = (f_stop - f_start) / (num_points - 1)
+    spectrum = czt(values * win, num_points, f_start * dt, df * dt)
+    freqs = f_start + df * np.arange(num_points)
+    scale = np.where(freqs == 0, 1.0, 2.0) / win.sum()
+    return _to_fft_data(freqs, spectrum * scale, spectrum)
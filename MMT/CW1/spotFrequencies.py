@@ -0,0 +1,208 @@
+import csv
+import glob
+
+import numpy as np
+
+from plotCore import get_yes_no
+from spectrumAnalysis import load_time_series
+
+# Number of samples multiplied against the frequency kernel at a time
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+
+def _trapezoid_weights(times):
+    """Integration weights of each sample for the trapezoidal rule."""
+    weights = np.empty_like(times)
+    steps = np.diff(times)
+    weights[0] = 0.5 * steps[0]
+    weights[-1] = 0.5 * steps[-1]
+    weights[1:-1] = 0.5 * (steps[:-1] + steps[1:])
+    return weights
+
+
+def dft_at_frequencies(times, values, freqs, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Evaluates the single-sided amplitude spectrum of one or more traces at a few
+    chosen frequencies only.
+
+    Works directly on non-uniform time vectors: each sample is weighted by the time
+    span it covers, so no resampling is needed. Samples are processed in chunks, each
+    as one (traces x samples) @ (samples x frequencies) product.
+
+    Parameters:
+        times (np.ndarray): Sorted time values shared by all traces.
+        values (np.ndarray): Signal values, shape (n,) or (num_traces, n).
+        freqs (np.ndarray): Frequencies to evaluate in Hz.
+        chunk_size (int): Samples per chunk.
+
+    Returns:
+        np.ndarray: Complex amplitudes, shape (len(freqs),) or (num_traces, len(freqs)),
+            scaled like spectrumAnalysis.compute_spectrum with a rectangular window.
+    """
+    times = np.asarray(times, dtype=float)
+    values = np.asarray(values, dtype=float)
+    freqs = np.asarray(freqs, dtype=float)
+    single = values.ndim == 1
+    values = np.atleast_2d(values)
+    if len(times) < 2:
+        raise ValueError("At least two samples are needed.")
+
+    weights = _trapezoid_weights(times)
+    omega = -2j * np.pi * freqs
+    result = np.zeros((values.shape[0], len(freqs)), dtype=complex)
+    for start in range(0, len(times), chunk_size):
+        stop = min(start + chunk_size, len(times))
+        kernel = np.exp(np.outer(times[start:stop] - times[0], omega))
+        kernel *= weights[start:stop, None]
+        result += values[:, start:stop] @ kernel
+
+    duration = times[-1] - times[0]
+    result *= np.where(freqs == 0, 1.0, 2.0) / duration
+    return result[0] if single else result
+
+
+def spot_frequency_table(traces, freqs, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Evaluates a handful of frequencies across a batch of loaded time series.
+
+    Traces sharing the same time vector are stacked and evaluated together.
+
+    Parameters:
+        traces (list of tuple): (times, values) pairs.
+        freqs (list of float): Frequencies to evaluate in Hz.
+        chunk_size (int): Samples per chunk, see dft_at_frequencies.
+
+    Returns:
+        np.ndarray: Complex table of shape (len(traces), len(freqs)).
+    """
+    freqs = np.asarray(freqs, dtype=float)
+    table = np.empty((len(traces), len(freqs)), dtype=complex)
+
+    groups = {}
+    for idx, (times, values) in enumerate(traces):
+        times = np.asarray(times, dtype=float)
+        key = (len(times), float(times[0]), float(times[-1]))
+        for group_times, members in groups.get(key, []):
+            if group_times is times or np.array_equal(group_times, times):
+                members.append((idx, values))
+                break
+        else:
+            groups.setdefault(key, []).append((times, [(idx, values)]))
+
+    for group_list in groups.values():
+        for times, members in group_list:
+            stacked = np.vstack([np.asarray(values, dtype=float) for _, values in members])
+            rows = dft_at_frequencies(times, stacked, freqs, chunk_size)
+            for row, (idx, _) in enumerate(members):
+                table[idx] = rows[row]
+    return table
+
+
+def export_spot_table(filename, labels, freqs, table):
+    """
+    Writes a spot-frequency table to CSV: one row per file, magnitude (dB) and phase
+    (degrees) columns per frequency.
+
+    Parameters:
+        filename (str): Output CSV path.
+        labels (list of str): Name of each row.
+        freqs (list of float): Evaluated frequencies in Hz.
+        table (np.ndarray): Complex table from spot_frequency_table.
+    """
+    mags_dB = 20 * np.log10(np.abs(table) + 1e-30)
+    phases_deg = np.degrees(np.angle(table))
+    with open(filename, 'w', newline='') as f:
+        writer = csv.writer(f)
+        header = ['source']
+        for freq in freqs:
+            header += [f"mag_dB@{freq:g}Hz", f"phase_deg@{freq:g}Hz"]
+        writer.writerow(header)
+        for label, mag_row, phase_row in zip(labels, mags_dB, phases_deg):
+            row = [label]
+            for mag, phase in zip(mag_row, phase_row):
+                row += [f"{mag:.10g}", f"{phase:.10g}"]
+            writer.writerow(row)
+
+
+def plot_spot_table(labels, freqs, table):
+    """
+    Plots |X| in dB per file, one line per spot frequency.
+
+    Parameters:
+        labels (list of str): Name of each row.
+        freqs (list of float): Evaluated frequencies in Hz.
+        table (np.ndarray): Complex table from spot_frequency_table.
+    """
+    import matplotlib.pyplot as plt
+
+    mags_dB = 20 * np.log10(np.abs(table) + 1e-30)
+    positions = np.arange(len(labels))
+    plt.figure(figsize=(10, 6))
+    for k, freq in enumerate(freqs):
+        plt.plot(positions, mags_dB[:, k], marker='o', label=f"{freq:g} Hz")
+    plt.xticks(positions, labels, rotation=90)
+    plt.xlabel("Source")
+    plt.ylabel("Magnitude (dB)")
+    plt.title("Spot-Frequency Magnitudes")
+    plt.grid(True, which="both", ls="--")
+    plt.legend()
+    plt.tight_layout()
+    plt.show()
+
+
+def main():
+    while True:
+        pattern = input("Enter time-domain file paths or a glob pattern (comma separated): ").strip()
+        filenames = []
+        for part in pattern.split(','):
+            part = part.strip()
+            matches = sorted(glob.glob(part))
+            filenames.extend(matches if matches else [part])
+        traces = []
+        labels = []
+        for filename in filenames:
+            try:
+                times, values = load_time_series(filename)
+            except FileNotFoundError:
+                print(f"File '{filename}' not found. Skipping.")
+                continue
+            except ValueError as e:
+                print(f"{e} Skipping.")
+                continue
+            if len(times) < 2:
+                print(f"No valid data found in '{filename}'. Skipping.")
+                continue
+            traces.append((times, values))
+            labels.append(filename)
+        if traces:
+            break
+        print("No files could be loaded. Please try again.")
+
+    while True:
+        try:
+            freqs = [float(v) for v in input("Enter the frequencies to evaluate in Hz (comma separated): ").split(',')]
+            if any(freq < 0 for freq in freqs):
+                print("Frequencies must be non-negative.")
+                continue
+            break
+        except ValueError:
+            print("Invalid input. Please enter numerical values separated by commas.")
+
+    table = spot_frequency_table(traces, freqs)
+
+    print(f"\n{'Source':<40}" + "".join(f"{f'{freq:g} Hz (dB, deg)':>28}" for freq in freqs))
+    for label, row in zip(labels, table):
+        cells = "".join(f"{20 * np.log10(abs(val) + 1e-30):>16.4f}{np.degrees(np.angle(val)):>12.2f}" for val in row)
+        print(f"{label[-40:]:<40}{cells}")
+
+    if get_yes_no("\nDo you want to export the table to CSV? [y/n]: ") == 'y':
+        out_name = input("Enter the CSV file name/path: ").strip()
+        export_spot_table(out_name, labels, freqs, table)
+        print(f"Table written to '{out_name}'.")
+
+    if get_yes_no("Do you want to plot the table? [y/n]: ") == 'y':
+        plot_spot_table(labels, freqs, table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+# Setting this environment variable to a file path turns tracing on for every tool
+TRACE_ENV = 'PLOT_TRACE'
+# Setting this one as well (to anything but 0) adds per-stage memory accounting through tracemalloc
+MEMORY_ENV = 'PLOT_TRACE_MEMORY'
+
+# A stage whose peak allocation exceeds this multiple of its input size is reported;
+# overridden by the PLOT_TRACE_MEMORY_FACTOR environment variable
+MEMORY_WARN_FACTOR = 4.0
+
+# Pipeline stages in the order the summary table lists them
+STAGES = ['load', 'parse', 'wait', 'compute', 'normalize', 'render', 'show']
+
+_trace_path = None
+_trace_memory = False
+_warn_factor = MEMORY_WARN_FACTOR
+_events = []
+_lock = threading.Lock()
+_registered = False
+# Open memory-tracked stages per thread: [traced bytes at entry, highest peak seen in finished
+# inner stages]. tracemalloc's peak is process-wide, so stages overlapping on other threads
+# (background loads) share it.
+_memory_local = threading.local()
+
+
+def _memory_stack():
+    if not hasattr(_memory_local, 'stack'):
+        _memory_local.stack = []
+    return _memory_local.stack
+
+
+class _NullStage:
+    """Context manager that does nothing, handed out while tracing is off."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ('name', 'source', 'input_bytes', 'start', 'frame')
+
+    def __init__(self, name, source, input_bytes=None):
+        self.name = name
+        self.source = source
+        self.input_bytes = input_bytes
+
+    def __enter__(self):
+        if _trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            stack = _memory_stack()
+            if stack:
+                # The peak is about to be reset; keep what the enclosing stage reached so far
+                stack[-1][1] = max(stack[-1][1], peak)
+            self.frame = [current, 0]
+            stack.append(self.frame)
+            tracemalloc.reset_peak()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        stop = time.perf_counter()
+        memory = None
+        stack = _memory_stack() if _trace_memory else None
+        if stack and stack[-1] is self.frame:
+            current, peak = tracemalloc.get_traced_memory()
+            stack.pop()
+            peak = max(peak, self.frame[1])
+            if stack:
+                stack[-1][1] = max(stack[-1][1], peak)
+            memory = {'peak_bytes': peak - self.frame[0], 'net_bytes': current - self.frame[0],
+                      'input_bytes': self._input_bytes()}
+            _check_memory(self.name, self.source, memory)
+        record(self.name, self.source, self.start, stop, memory)
+        return False
+
+    def _input_bytes(self):
+        if self.input_bytes is not None:
+            return int(self.input_bytes)
+        if isinstance(self.source, str) and os.path.isfile(self.source):
+            return os.path.getsize(self.source)
+        return None
+
+
+def stage(name, source=None, input_bytes=None):
+    """
+    Times a pipeline stage as a context manager: with stage('compute', 'S2'): ...
+
+    While tracing is off this returns a shared no-op object, so the cost is one
+    function call and one comparison.
+
+    Parameters:
+        name (str): Stage name, one of STAGES.
+        source (str): File, model or output the stage works on, or None.
+        input_bytes (int): Size of the stage's input, used by the memory warning;
+            defaults to the size of source if it is a file.
+
+    Returns:
+        context manager: Records the stage's wall time (and memory) on exit.
+    """
+    if _trace_path is None:
+        return _NULL_STAGE
+    return _Stage(name, source, input_bytes)
+
+
+def _check_memory(name, source, memory):
+    """Warns when a stage's peak allocation is a large multiple of its input."""
+    input_bytes = memory['input_bytes']
+    if input_bytes and memory['peak_bytes'] > _warn_factor * input_bytes:
+        memory['warning'] = True
+        print(f"[WARNING] Stage '{name}' ({source}) allocated {memory['peak_bytes'] / 2 ** 20:.1f} MB at its peak, "
+              f"{memory['peak_bytes'] / input_bytes:.1f}x its {input_bytes / 2 ** 20:.1f} MB input.")
+
+
+def traced(name):
+    """
+    Decorator timing every call of a function as one stage. A string first argument
+    (e.g. a filename) is recorded as the source.
+
+    Parameters:
+        name (str): Stage name, one of STAGES.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _trace_path is None:
+                return func(*args, **kwargs)
+            source = args[0] if args and isinstance(args[0], str) else None
+            with _Stage(name, source):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def record(name, source, start, stop, memory=None):
+    """Stores one finished stage as a Chrome 'complete' trace event."""
+    event = {'name': name if source is None else f"{name}: {source}", 'cat': name, 'ph': 'X',
+             'ts': start * 1e6, 'dur': (stop - start) * 1e6, 'pid': os.getpid(),
+             'tid': threading.get_ident(), 'args': {'source': source, **(memory or {})}}
+    with _lock:
+        _events.append(event)
+
+
+def enabled():
+    """Tells whether tracing is on."""
+    return _trace_path is not None
+
+
+def enable(path, memory=False):
+    """
+    Turns tracing on. The trace is written to path, and a summary table printed, when
+    the main process exits. Child processes inherit the setting via PLOT_TRACE.
+
+    Memory accounting runs tracemalloc (which sees NumPy's buffers) for the whole
+    process, so it slows pure-Python stages such as the text parsers noticeably.
+
+    Parameters:
+        path (str): Chrome trace-event JSON file to write.
+        memory (bool): Also record each stage's peak and net allocation.
+    """
+    global _trace_path, _trace_memory, _warn_factor, _registered
+    _trace_path = path
+    os.environ[TRACE_ENV] = path
+    if memory:
+        _trace_memory = True
+        os.environ[MEMORY_ENV] = '1'
+        try:
+            _warn_factor = float(os.environ.get('PLOT_TRACE_MEMORY_FACTOR', MEMORY_WARN_FACTOR))
+        except ValueError:
+            _warn_factor = MEMORY_WARN_FACTOR
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+    if not _registered:
+        atexit.register(_finish)
+        _registered = True
+
+
+def take_events():
+    """Removes and returns the events recorded so far (used to hand them back from workers)."""
+    with _lock:
+        events = list(_events)
+        _events.clear()
+    return events
+
+
+def add_events(events):
+    """Adds events recorded in another process."""
+    with _lock:
+        _events.extend(events)
+
+
+def summary_rows(events):
+    """
+    Aggregates events per stage and source.
+
+    Returns:
+        list of dict: 'stage', 'source', 'calls', 'total_ms', 'max_ms', 'peak_bytes' (None
+            without memory accounting) and 'warning', in STAGES order and by decreasing
+            total time within a stage.
+    """
+    totals = {}
+    for event in events:
+        key = (event['cat'], event['args'].get('source'))
+        row = totals.setdefault(key, {'stage': key[0], 'source': key[1], 'calls': 0, 'total_ms': 0.0,
+                                      'max_ms': 0.0, 'peak_bytes': None, 'warning': False})
+        row['calls'] += 1
+        row['total_ms'] += event['dur'] / 1e3
+        row['max_ms'] = max(row['max_ms'], event['dur'] / 1e3)
+        if 'peak_bytes' in event['args']:
+            row['peak_bytes'] = max(row['peak_bytes'] or 0, event['args']['peak_bytes'])
+            row['warning'] = row['warning'] or event['args'].get('warning', False)
+    order = {name: i for i, name in enumerate(STAGES)}
+    return sorted(totals.values(), key=lambda r: (order.get(r['stage'], len(STAGES)), -r['total_ms']))
+
+
+def print_summary(events):
+    """Prints the per-stage, per-source timing table, with peak memory if it was recorded."""
+    rows = summary_rows(events)
+    with_memory = any(row['peak_bytes'] is not None for row in rows)
+    header = f"\n{'Stage':<10} {'Source':<40} {'Calls':>6} {'Total (ms)':>12} {'Max (ms)':>10}"
+    print(header + (f" {'Peak (MB)':>10}" if with_memory else ""))
+    for row in rows:
+        source = '-' if row['source'] is None else str(row['source'])[-40:]
+        line = f"{row['stage']:<10} {source:<40} {row['calls']:>6} {row['total_ms']:>12.2f} {row['max_ms']:>10.2f}"
+        if with_memory:
+            peak = '-' if row['peak_bytes'] is None else f"{row['peak_bytes'] / 2 ** 20:.2f}"
+            line += f" {peak:>10}" + ("  over input budget" if row['warning'] else "")
+        print(line)
+    print("(parse runs inside load, so their times and allocations overlap)")
+
+
+def write_trace(path, events):
+    """Writes events as Chrome trace-event JSON (open in chrome://tracing or Perfetto)."""
+    with open(path, 'w') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+
+def _finish():
+    import multiprocessing
+
+    # Pool workers hand their events back; only the main process writes the trace
+    if multiprocessing.parent_process() is not None or _trace_path is None:
+        return
+    events = take_events()
+    write_trace(_trace_path, events)
+    print_summary(events)
+    print(f"[INFO] Wrote {len(events)} trace events to '{_trace_path}'.")
+
+
+if os.environ.get(TRACE_ENV):
+    enable(os.environ[TRACE_ENV], memory=(os.environ.get(MEMORY_ENV) or '0') != '0')